@@ -0,0 +1,379 @@
+"""Contains classes for computer controlled battle opponents.
+
+:class:`BattleAI` picks moves with a depth-limited expectiminimax search. Each
+turn of the search is a max node for the moves of the AI, a min node for the
+replies of the opponent, and a chance node over whether each move fails to a
+status condition, hits, scores a critical hit and which damage roll it gets.
+Outcomes are worked out with :mod:`battle_effects`, so the search judges moves
+by the same rules a battle plays them by.
+
+The search only models the pokemon currently out on each side. Its state is
+the health and status of both of them and the weather; pokemon left on each
+side count towards the evaluation of a state but are never switched in. The
+chance of failing to a status condition, and the damage dealt by conditions at
+the end of each turn, are fixed averages rather than tracked turn by turn.
+"""
+import math
+import time
+
+import battle_effects
+from battle_effects import Category, EffectKind
+
+# chance of a pokemon failing to move due to its status condition
+FAIL_CHANCE = {"Paralysis": 0.25, "Sleep": 2 / 3, "Freeze": 0.8}
+# fraction of max HP lost at the end of each turn due to a status condition
+END_OF_TURN_DAMAGE = {"Burn": 1 / 16, "Poison": 1 / 8, "Toxic": 1 / 8}
+
+# transposition table entry bounds
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+
+class _Timeout(Exception):
+    """Raised within a search when its time budget runs out."""
+
+
+class BattleAI:
+    """A battle opponent that chooses moves by expectiminimax search."""
+
+    def __init__(self, side, depth=3, time_budget=0.05, rolls=(85, 93, 100),
+                 table_size=100000):
+        """Constructor for the BattleAI class.
+
+        :param side: The side of the battle the AI chooses moves for.
+        :type side: int
+        :param depth: The most turns ahead to search.
+        :type depth: int
+        :param time_budget: The most seconds to spend on each decision. Turns
+            are searched one deeper at a time, and the move found by the
+            deepest completed search is chosen. A search of 1 turn ahead is
+            always completed.
+        :type time_budget: float
+        :param rolls: The damage rolls, in percent, the chance nodes average
+            over. Fewer rolls give faster, coarser searches.
+        :type rolls: tuple of int
+        :param table_size: The most states kept in the transposition table
+            before it is cleared.
+        :type table_size: int
+        """
+        self.side = side
+        self.depth = depth
+        self.time_budget = time_budget
+        self.rolls = tuple(rolls)
+        self.table_size = table_size
+
+    def choose(self, battle, moves, opponent_moves):
+        """Choose the move for the active pokemon of the AI's side.
+
+        :param battle: The battle being played.
+        :type battle: :class:'battle.Battle'
+        :param moves: The moves of the AI's active pokemon.
+        :type moves: list of :class:'moves.Move'
+        :param opponent_moves: The moves the opponent's active pokemon is
+            expected to have.
+        :type opponent_moves: list of :class:'moves.Move'
+
+        :return: The chosen move, or None if no move has pp left.
+        :rtype: :class:'moves.Move'
+        """
+        usable = [move for move in moves if move.pp_cur > 0]
+        if not usable:
+            return None
+        opponent_usable = ([move for move in opponent_moves
+                            if move.pp_cur > 0] or list(opponent_moves))
+        if len(usable) == 1 or not opponent_usable:
+            return usable[0]
+        search = _Search(self, battle, usable, opponent_usable)
+        return usable[search.best_move()]
+
+
+class _Search:
+    """The state of the search for a single decision of a :class:`BattleAI`.
+    """
+
+    def __init__(self, ai, battle, moves, opponent_moves):
+        self._side = ai.side
+        self._depth = ai.depth
+        self._rolls = ai.rolls
+        self._roll_chance = 1 / len(ai.rolls)
+        self._table_size = ai.table_size
+        self._deadline = time.perf_counter() + ai.time_budget
+        # pokemon, moves, max HP and the value of the pokemon not out, indexed
+        # by side
+        self._pokemon = (battle.active(0), battle.active(1))
+        self._moves = [None, None]
+        self._moves[ai.side] = [move.move_info for move in moves]
+        self._moves[1 - ai.side] = [move.move_info for move in opponent_moves]
+        self._max_HP = tuple(pokemon.max_HP for pokemon in self._pokemon)
+        self._bench = tuple(
+            sum(pokemon.cur_HP / pokemon.max_HP for pokemon in battle.side(side)
+                if pokemon is not self._pokemon[side])
+            for side in (0, 1))
+        self._root_state = (self._pokemon[0].cur_HP, self._pokemon[1].cur_HP,
+                            self._pokemon[0].status, self._pokemon[1].status,
+                            battle.field.weather)
+        self._table = dict()
+        self._turn_cache = dict()
+        self._move_cache = dict()
+        self._damage_cache = dict()
+        self._timed = False
+
+    def best_move(self):
+        """Search deeper one turn at a time until out of depth or time.
+
+        :return: The index of the best move found.
+        """
+        best = 0
+        for depth in range(1, self._depth + 1):
+            # the first search is always completed
+            self._timed = depth > 1
+            try:
+                best = self._root(depth, best)
+            except _Timeout:
+                break
+        return best
+
+    def _check_time(self):
+        if self._timed and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+    def _root(self, depth, first):
+        """Internal method for searching the moves of the AI at the root."""
+        order = [first] + [index for index in range(len(self._moves[self._side]))
+                           if index != first]
+        best, alpha = first, -math.inf
+        for index in order:
+            value = self._min_value(self._root_state, depth, index, alpha,
+                                    math.inf)
+            if value > alpha:
+                best, alpha = index, value
+        return best
+
+    def _evaluate(self, state):
+        """Internal method for the value of a state to the AI."""
+        own, other = self._side, 1 - self._side
+        return ((state[own] / self._max_HP[own] + self._bench[own])
+                - (state[other] / self._max_HP[other] + self._bench[other]))
+
+    def _max_value(self, state, depth, alpha, beta):
+        """Internal method for the value of a state with the AI to move."""
+        if depth == 0 or state[0] == 0 or state[1] == 0:
+            return self._evaluate(state)
+        key = (state, depth)
+        entry = self._table.get(key)
+        if entry is not None:
+            value, bound = entry
+            if (bound == _EXACT or (bound == _LOWER and value >= beta)
+                    or (bound == _UPPER and value <= alpha)):
+                return value
+        self._check_time()
+
+        original_alpha = alpha
+        value = -math.inf
+        for index in range(len(self._moves[self._side])):
+            value = max(value, self._min_value(state, depth, index, alpha,
+                                               beta))
+            if value >= beta:
+                break
+            alpha = max(alpha, value)
+
+        if len(self._table) >= self._table_size:
+            self._table.clear()
+        if value <= original_alpha:
+            self._table[key] = (value, _UPPER)
+        elif value >= beta:
+            self._table[key] = (value, _LOWER)
+        else:
+            self._table[key] = (value, _EXACT)
+        return value
+
+    def _min_value(self, state, depth, own_move, alpha, beta):
+        """Internal method for the value of the opponent's best reply."""
+        value = math.inf
+        for index in range(len(self._moves[1 - self._side])):
+            moves = [None, None]
+            moves[self._side] = own_move
+            moves[1 - self._side] = index
+            expected = 0
+            for chance, outcome in self._turn_outcomes(state, *moves):
+                expected += chance * self._max_value(outcome, depth - 1,
+                                                     -math.inf, math.inf)
+            value = min(value, expected)
+            if value <= alpha:
+                break
+            beta = min(beta, value)
+        return value
+
+    def _turn_outcomes(self, state, move_0, move_1):
+        """Internal method for every outcome of a turn and its chance.
+
+        :return: A list of (chance, state) pairs.
+        """
+        key = (state, move_0, move_1)
+        try:
+            return self._turn_cache[key]
+        except KeyError:
+            pass
+        moves = (move_0, move_1)
+        first = self._first_side(state, moves)
+        outcomes = {state: 1.0}
+        for side in (first, 1 - first):
+            after_move = dict()
+            for before, chance in outcomes.items():
+                if before[0] == 0 or before[1] == 0:
+                    after_move[before] = after_move.get(before, 0) + chance
+                    continue
+                for move_chance, after in self._move_outcomes(
+                        before, side, moves[side]):
+                    after_move[after] = (after_move.get(after, 0)
+                                         + chance * move_chance)
+            outcomes = after_move
+        merged = dict()
+        for outcome, chance in outcomes.items():
+            outcome = self._end_of_turn(outcome)
+            merged[outcome] = merged.get(outcome, 0) + chance
+        result = [(chance, outcome) for outcome, chance in merged.items()]
+        self._turn_cache[key] = result
+        return result
+
+    def _first_side(self, state, moves):
+        """Internal method for the side that moves first in a turn.
+
+        Speed ties are given to the opponent of the AI.
+        """
+        keys = list()
+        for side in (0, 1):
+            speed = self._pokemon[side].speed
+            if state[2 + side] == "Paralysis":
+                speed //= 2
+            keys.append((self._moves[side][moves[side]]["priority"],
+                         speed, side != self._side))
+        return 0 if keys[0] > keys[1] else 1
+
+    def _end_of_turn(self, state):
+        """Internal method for applying status damage at the end of a turn."""
+        if state[2] is None and state[3] is None:
+            return state
+        hp = list(state[:2])
+        for side in (0, 1):
+            fraction = END_OF_TURN_DAMAGE.get(state[2 + side])
+            if fraction and hp[side]:
+                hp[side] = max(hp[side] - max(int(self._max_HP[side]
+                                                  * fraction), 1), 0)
+        return (hp[0], hp[1]) + state[2:]
+
+    def _move_outcomes(self, state, side, index):
+        """Internal method for every outcome of a single move and its chance.
+
+        :return: A list of (chance, state) pairs.
+        """
+        key = (state, side, index)
+        try:
+            return self._move_cache[key]
+        except KeyError:
+            pass
+        move_info = self._moves[side][index]
+        target = 1 - side
+        outcomes = dict()
+
+        def add(chance, hp=None, recoil=0, status=None, weather=None):
+            hp_list = list(state[:2])
+            status_list = list(state[2:4])
+            if hp is not None:
+                hp_list[target] = hp
+            hp_list[side] = max(hp_list[side] - recoil, 0)
+            if status is not None:
+                status_list[target] = status
+            after = (*hp_list, *status_list,
+                     state[4] if weather is None else weather)
+            outcomes[after] = outcomes.get(after, 0) + chance
+
+        fail = FAIL_CHANCE.get(state[2 + side], 0)
+        if fail:
+            add(fail)
+        go = 1 - fail
+        accuracy = move_info["accuracy"]
+        hit = 1 if accuracy is None else min(accuracy / 100, 1)
+        if hit < 1:
+            add(go * (1 - hit))
+        go *= hit
+
+        kind, value = move_info["effect"] or (None, None)
+        status, weather = None, None
+        effect_chance = 0
+        if (kind is EffectKind.STATUS
+                and value in battle_effects.STATUS_EFFECTS):
+            if (state[2 + target] is None and battle_effects.STATUS_EFFECTS[
+                    value].can_apply(self._pokemon[target])):
+                status = value
+                rate = move_info["effect_rate"]
+                effect_chance = 1 if rate is None else rate / 100
+        elif kind is EffectKind.WEATHER:
+            weather = value
+            effect_chance = 1
+
+        if move_info["category"] is Category.OTHER:
+            if effect_chance:
+                add(go, status=status, weather=weather)
+            else:
+                add(go)
+        else:
+            crit_ratio = move_info["cit_ratio"]
+            crit = 0 if crit_ratio is None else crit_ratio / 100
+            recoil_ratio = move_info["recoil"] or 0
+            for critical, crit_chance in ((False, 1 - crit), (True, crit)):
+                if not crit_chance:
+                    continue
+                for roll in self._rolls:
+                    chance = go * crit_chance * self._roll_chance
+                    dealt = self._damage(state, side, index, critical, roll)
+                    hp = max(state[target] - dealt, 0)
+                    recoil = int(dealt * recoil_ratio)
+                    if effect_chance and hp:
+                        add(chance * effect_chance, hp, recoil, status,
+                            weather)
+                        add(chance * (1 - effect_chance), hp, recoil)
+                    else:
+                        add(chance, hp, recoil)
+        result = [(chance, after) for after, chance in outcomes.items()
+                  if chance]
+        self._move_cache[key] = result
+        return result
+
+    def _damage(self, state, side, index, critical, roll):
+        """Internal method for the damage of a move in a state."""
+        weather = state[4]
+        key = (side, index, weather, critical, roll)
+        try:
+            dealt = self._damage_cache[key]
+        except KeyError:
+            dealt = battle_effects.damage(
+                self._moves[side][index], self._pokemon[side],
+                self._pokemon[1 - side], weather, critical, roll)
+            self._damage_cache[key] = dealt
+        # damage is worked out with the status the pokemon has in battle; a
+        # burn inflicted within the search halves physical damage as well
+        category = self._moves[side][index]["category"]
+        if (state[2 + side] == "Burn" and self._pokemon[side].status != "Burn"
+                and category is Category.PHYSICAL):
+            dealt = max(dealt // 2, 1)
+        return dealt
+
+
+def decisions_per_second(ai, battle, moves, opponent_moves, decisions=20):
+    """Measure how many decisions an AI makes each second.
+
+    The battle is not changed; the same decision is made repeatedly.
+
+    :param ai: The AI to measure.
+    :type ai: :class:'ai.BattleAI'
+    :param decisions: The number of decisions to time.
+    :type decisions: int
+
+    :rtype: float
+    """
+    start = time.perf_counter()
+    for _ in range(decisions):
+        ai.choose(battle, moves, opponent_moves)
+    return decisions / (time.perf_counter() - start)
@@ -0,0 +1,232 @@
+"""Contains classes for running battles between two sides of pokemon.
+
+A battle publishes everything that happens in it to an
+:class:`events.EventBus`. Nothing is printed; subscribe
+:func:`events.print_listener` to the bus of a battle to show battle messages
+on the console.
+"""
+import random
+
+import battle_effects
+from battle_effects import Field
+from events import EventBus
+import events
+from scheduler import TurnScheduler
+
+
+class Battle:
+    """A battle between two sides, each with one pokemon out at a time.
+
+    Sides are numbered 0 and 1. When the active pokemon of a side faints, the
+    next pokemon of that side that has not fainted is sent out. The battle is
+    over once every pokemon of a side has fainted. If the last pokemon of both
+    sides faint in the same turn, the battle is a draw.
+    """
+
+    def __init__(self, side_a, side_b, seed=None, bus=None, weather=None):
+        """Constructor for the Battle class.
+
+        :param side_a: The pokemon of side 0, in the order they are sent out.
+        :type side_a: list of :class:'pokemon.Pokemon'
+        :param side_b: The pokemon of side 1, in the order they are sent out.
+        :type side_b: list of :class:'pokemon.Pokemon'
+        :param seed: The seed for every random roll of the battle. Battles
+            with the same seed, pokemon and moves play out the same way.
+        :type seed: int, optional
+        :param bus: The bus to publish battle events to. If None, a new bus
+            with no listeners is used.
+        :type bus: :class:'events.EventBus', optional
+        :param weather: The weather at the start of the battle.
+        :type weather: str, optional
+        """
+        self._sides = (list(side_a), list(side_b))
+        if not all(self._sides):
+            raise ValueError("Each side of a battle needs at least 1 pokemon.")
+        self.events = EventBus() if bus is None else bus
+        self.field = Field(random.Random(seed), weather, self.events)
+        for side in self._sides:
+            for pokemon in side:
+                pokemon.events = self.events
+        self._active = [self._next_active(side, 0) for side in self._sides]
+        self._turn = 0
+        self._winner = None
+        self._over = False
+
+    @property
+    def turn_number(self):
+        """The number of turns played so far."""
+        return self._turn
+
+    @property
+    def winner(self):
+        """The side that won the battle, or None if it is not over or is a
+        draw.
+        """
+        return self._winner
+
+    @property
+    def over(self):
+        """True if the battle is over; otherwise false."""
+        return self._over
+
+    def side(self, number):
+        """A list of the pokemon of a side."""
+        return list(self._sides[number])
+
+    def active(self, number):
+        """The pokemon of a side that is currently out."""
+        return self._sides[number][self._active[number]]
+
+    def active_index(self, number):
+        """The index within its side of the pokemon of a side that is out."""
+        return self._active[number]
+
+    @staticmethod
+    def _next_active(side, start):
+        """Internal method for finding the next pokemon able to battle.
+
+        :return: The index of the pokemon in the side, or None if every
+            pokemon has fainted.
+        """
+        for index in range(start, len(side)):
+            if not side[index].fainted:
+                return index
+        for index in range(start):
+            if not side[index].fainted:
+                return index
+        return None
+
+    def order(self, choices):
+        """Sort the moves chosen for a turn into the order they are used.
+
+        Moves with a higher priority go first, then moves of faster pokemon.
+        Ties are broken randomly.
+
+        :param choices: (side, move) pairs for the turn.
+
+        :rtype: list of (side, move) pairs
+        """
+        scheduler = TurnScheduler(self.field.rng)
+        for side, move in choices:
+            scheduler.push((side, move), move.priority,
+                           battle_effects.effective_speed(self.active(side)))
+        return list(scheduler)
+
+    def turn(self, move_a, move_b):
+        """Play a single turn of the battle.
+
+        :param move_a: The move used by the active pokemon of side 0, or None
+            if it does not move.
+        :type move_a: :class:'moves.Move'
+        :param move_b: The move used by the active pokemon of side 1, or None
+            if it does not move.
+        :type move_b: :class:'moves.Move'
+
+        :return: (side, move name, status code) for each move used, in the
+            order used. See :meth:`moves.Move.execute` for status codes.
+        :rtype: list of tuples
+        """
+        if self.over:
+            raise ValueError("The battle is already over.")
+        self._turn += 1
+        if self.events:
+            self.events.emit(events.TURN, self, turn=self._turn)
+        choices = [(side, move) for side, move in enumerate((move_a, move_b))
+                   if move is not None]
+        results = list()
+        for side, move in self.order(choices):
+            source = self.active(side)
+            target = self.active(1 - side)
+            if source.fainted or target.fainted:
+                continue
+            results.append((side, move.name,
+                            move.execute(source, target, self.field)))
+        for side in (0, 1):
+            battle_effects.end_of_turn(self.active(side), self.field)
+        self._replace_fainted()
+        return results
+
+    def snapshot(self):
+        """Capture the state of the battle.
+
+        Only state that changes during a battle is captured: the turn, the
+        active pokemon, the weather, the random generator, and the health and
+        conditions of every pokemon. The snapshot only holds lists, dicts,
+        strings, numbers and None, so it can be stored as JSON.
+
+        :rtype: dict
+        """
+        version, internal_state, gauss = self.field.rng.getstate()
+        return {
+            "turn": self._turn,
+            "winner": self._winner,
+            "over": self._over,
+            "active": list(self._active),
+            "weather": self.field.weather,
+            "rng": [version, list(internal_state), gauss],
+            "pokemon": [[{"cur_HP": pokemon.cur_HP,
+                          "status": pokemon.status,
+                          "hidden_status": pokemon.hidden_status,
+                          "pokerus": pokemon.pokerus,
+                          "effect_counters": dict(pokemon.effect_counters)}
+                         for pokemon in side] for side in self._sides],
+        }
+
+    def restore(self, snapshot):
+        """Return the battle to the state captured by :meth:`snapshot`.
+
+        The battle must have the same pokemon, in the same order, as the
+        battle the snapshot was taken from. No events are published for the
+        changes made.
+
+        :param snapshot: A snapshot of the battle.
+        :type snapshot: dict
+        """
+        self._turn = snapshot["turn"]
+        self._winner = snapshot["winner"]
+        self._over = snapshot.get("over", self._winner is not None)
+        self._active = list(snapshot["active"])
+        self.field.weather = snapshot["weather"]
+        version, internal_state, gauss = snapshot["rng"]
+        self.field.rng.setstate((version, tuple(internal_state), gauss))
+        for side, states in zip(self._sides, snapshot["pokemon"]):
+            for pokemon, state in zip(side, states):
+                pokemon.events = None
+                pokemon.cur_HP = state["cur_HP"]
+                pokemon.status = state["status"]
+                pokemon.hidden_status = state["hidden_status"]
+                pokemon._set_pokerus(state["pokerus"])
+                pokemon.effect_counters = dict(state["effect_counters"])
+                if not self._over:
+                    pokemon.events = self.events
+
+    def _replace_fainted(self):
+        """Internal method for sending out pokemon to replace fainted ones."""
+        replacements = {}
+        for number, side in enumerate(self._sides):
+            if side[self._active[number]].fainted:
+                replacements[number] = self._next_active(
+                    side, self._active[number])
+        out = [number for number, index in replacements.items()
+               if index is None]
+        if out:
+            self._end(1 - out[0] if len(out) == 1 else None)
+            return
+        for number, index in replacements.items():
+            self._active[number] = index
+
+    def _end(self, winner):
+        """Internal method for ending the battle. A winner of None is a
+        draw.
+        """
+        self._winner = winner
+        self._over = True
+        for side in self._sides:
+            battle_effects.spread_pokerus(side, self.field.rng)
+            for pokemon in side:
+                battle_effects.cure_hidden_status(pokemon)
+        if self.events:
+            self.events.emit(events.BATTLE_END, self, winner=winner)
+        for side in self._sides:
+            for pokemon in side:
+                pokemon.events = None
@@ -1,18 +1,635 @@
 """Contains classes and methods used to create effects in battle.
 
 The effects created from this module can result from Pokemon's battle moves,
-abilities, or items."""
+abilities, or items.
+
+Status conditions are handled by :class:`StatusEffect` objects, registered by
+the name of the condition in STATUS_EFFECTS (for the status of a pokemon) and
+HIDDEN_STATUS_EFFECTS (for the hidden status of a pokemon). A battle calls the
+hooks of the effect a pokemon is affected by through the dispatch functions of
+this module, so new conditions only need a handler to be registered.
+
+Moves are compiled by :func:`compile_move` when they are loaded: every field
+of a move's csv row is validated and converted to a number, bool, enum member
+or :class:`Effect`, so nothing is parsed while a battle is played.
+"""
+from collections import namedtuple
+from enum import Enum
+import random
+
+import events
+
+# type effectiveness of an attacking type against a defending type. Match ups
+# not listed are normally effective
+TYPE_CHART = {
+    "Normal": {"Rock": 0.5, "Ghost": 0, "Steel": 0.5},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2,
+             "Rock": 0.5, "Dragon": 0.5, "Steel": 2},
+    "Water": {"Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2,
+              "Dragon": 0.5},
+    "Electric": {"Water": 2, "Electric": 0.5, "Grass": 0.5, "Ground": 0,
+                 "Flying": 2, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5,
+              "Ground": 2, "Flying": 0.5, "Bug": 0.5, "Rock": 2,
+              "Dragon": 0.5, "Steel": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2,
+            "Flying": 2, "Dragon": 2, "Steel": 0.5},
+    "Fighting": {"Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5,
+                 "Psychic": 0.5, "Bug": 0.5, "Rock": 2, "Ghost": 0,
+                 "Dark": 2, "Steel": 2, "Fairy": 0.5},
+    "Poison": {"Grass": 2, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5,
+               "Ghost": 0.5, "Steel": 0, "Fairy": 2},
+    "Ground": {"Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2,
+               "Flying": 0, "Bug": 0.5, "Rock": 2, "Steel": 2},
+    "Flying": {"Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2,
+               "Rock": 0.5, "Steel": 0.5},
+    "Psychic": {"Fighting": 2, "Poison": 2, "Psychic": 0.5, "Dark": 0,
+                "Steel": 0.5},
+    "Bug": {"Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 0.5,
+            "Flying": 0.5, "Psychic": 2, "Ghost": 0.5, "Dark": 2,
+            "Steel": 0.5, "Fairy": 0.5},
+    "Rock": {"Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5,
+             "Flying": 2, "Bug": 2, "Steel": 0.5},
+    "Ghost": {"Normal": 0, "Psychic": 2, "Ghost": 2, "Dark": 0.5},
+    "Dragon": {"Dragon": 2, "Steel": 0.5, "Fairy": 0},
+    "Dark": {"Fighting": 0.5, "Psychic": 2, "Ghost": 2, "Dark": 0.5,
+             "Fairy": 0.5},
+    "Steel": {"Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2,
+              "Rock": 2, "Steel": 0.5, "Fairy": 2},
+    "Fairy": {"Fire": 0.5, "Fighting": 2, "Poison": 0.5, "Dragon": 2,
+              "Dark": 2, "Steel": 0.5},
+}
+
+# damage multiplier of each weather for the types it affects
+WEATHER_BOOST = {
+    "Sun": {"Fire": 1.5, "Water": 0.5},
+    "HarshSun": {"Fire": 1.5, "Water": 0},
+    "Rain": {"Water": 1.5, "Fire": 0.5},
+    "HeavyRain": {"Water": 1.5, "Fire": 0},
+}
+
+
+
+class Category(Enum):
+    """The damage category of a move."""
+    PHYSICAL = "Physical"
+    SPECIAL = "Special"
+    OTHER = "Other"
+
+
+class Target(Enum):
+    """The pokemon a move can target."""
+    SELF = "self"
+    SINGLE_ADJACENT_FOE = "single_adjacent_foe"
+    SINGLE_ADJACENT_ANY = "single_adjacent_any"
+    SINGLE_ADJACENT_ALLY = "single_adjacent_ally"
+    SINGLE_ANY = "single_any"
+    USER_OR_ADJACENT_ALLY = "user_or_adjacent_ally"
+    ALL_ADJACENT_FOE = "all_adjacent_foe"
+    ALL_ADJACENT_ANY = "all_adjacent_any"
+    ALL_FOES = "all_foes"
+    FIELD = "field"
+    TEAM = "team"
+    SPECIAL = "special"
+
+
+class EffectKind(Enum):
+    """The kind of a move's effect."""
+    WEATHER = "Weather"
+    TERRAIN = "Terrain"
+    STATUS = "Status"
+    HIDDEN_STATUS = "HiddenStatus"
+    STAT_CHANGE = "StatChange"
+    ENTRY_HAZARD = "EntryHazard"
+    RATIO_DAMAGE = "RatioDamage"
+    RATIO_HEAL = "RatioHeal"
+    STUN = "Stun"
+    FLINCH = "Flinch"
+    TYPE_CHANGE = "TypeChange"
+
+
+Effect = namedtuple("Effect", ["kind", "value"])
+Effect.__doc__ = """The compiled effect of a move.
+
+kind  -- the kind of effect, an :class:`EffectKind`
+value -- the detail of the effect, such as the status inflicted or the
+         weather started
+"""
+
+STAB = 1.5
+CRITICAL_MULTIPLIER = 1.5
+# lowest and highest random damage rolls, in percent
+MIN_ROLL = 85
+MAX_ROLL = 100
+
+# status codes returned from apply_move
+SUCCESS = 0
+CRITICAL = 1
+SUPER_EFFECTIVE = 3
+NOT_VERY_EFFECTIVE = 4
+NO_EFFECT = 5
+MISSED = 6
+ALREADY_AFFECTED = 8
+PARALYZED = 9
+ASLEEP = 10
+CONFUSED = 11
+INFATUATED = 12
+FAILED = 15
+
+
+class Field:
+    """The state of a battle field shared by every pokemon in a battle.
+
+    rng     -- the random generator used for every random roll in battle
+    weather -- the current weather, or None for clear skies
+    events  -- the :class:`events.EventBus` battle events are published to,
+               or None
+    """
+
+    def __init__(self, rng=None, weather=None, events=None):
+        self.rng = random.Random() if rng is None else rng
+        self.weather = weather
+        self.events = events
+
+    def set_weather(self, weather):
+        """Change the weather of the field, publishing the change."""
+        if weather == "Clear":
+            weather = None
+        if weather != self.weather:
+            self.weather = weather
+            if self.events:
+                self.events.emit(events.WEATHER, self, weather=weather)
+
+
+class StatusEffect:
+    """Base handler for a status condition.
+
+    Each hook is given the affected pokemon and the :class:`Field` of the
+    battle. The base class has no effect; handlers override only the hooks
+    their condition needs.
+    """
+
+    # name of the status condition
+    name = None
+    # types of pokemon that cannot be affected
+    immune_types = ()
+
+    def can_apply(self, pokemon):
+        """True if the pokemon can be affected by this condition."""
+        return not any(poke_type in self.immune_types
+                       for poke_type in pokemon.types)
+
+    def on_apply(self, pokemon, field):
+        """Called when the pokemon becomes affected by this condition."""
+
+    def before_move(self, pokemon, field):
+        """Called before the pokemon uses a move.
+
+        :return: A status code for apply_move if the move fails, otherwise
+            None.
+        """
+        return None
+
+    def end_of_turn(self, pokemon, field):
+        """Called at the end of every turn the pokemon is in battle."""
+
+    def damage_multiplier(self, pokemon, move_info):
+        """Multiplier to the damage of a move used by the pokemon."""
+        return 1
+
+
+class Burn(StatusEffect):
+    """Burned pokemon lose 1/16 of their max HP every turn, and deal half
+    damage with physical moves."""
+
+    name = "Burn"
+    immune_types = ("Fire",)
+
+    def end_of_turn(self, pokemon, field):
+        pokemon.lose_health(max(pokemon.max_HP // 16, 1))
+
+    def damage_multiplier(self, pokemon, move_info):
+        return 0.5 if move_info["category"] is Category.PHYSICAL else 1
+
+
+class Poison(StatusEffect):
+    """Poisoned pokemon lose 1/8 of their max HP every turn."""
+
+    name = "Poison"
+    immune_types = ("Poison", "Steel")
+
+    def end_of_turn(self, pokemon, field):
+        pokemon.lose_health(max(pokemon.max_HP // 8, 1))
+
+
+class Toxic(Poison):
+    """Badly poisoned pokemon lose 1/16 of their max HP more every turn."""
+
+    name = "Toxic"
+
+    def on_apply(self, pokemon, field):
+        pokemon.effect_counters[self.name] = 0
+
+    def end_of_turn(self, pokemon, field):
+        turns = min(pokemon.effect_counters.get(self.name, 0) + 1, 15)
+        pokemon.effect_counters[self.name] = turns
+        pokemon.lose_health(max(pokemon.max_HP * turns // 16, 1))
+
+
+class Paralysis(StatusEffect):
+    """Paralyzed pokemon fail to move 1/4 of the time, and move at half
+    speed."""
+
+    name = "Paralysis"
+    immune_types = ("Electric",)
+
+    def before_move(self, pokemon, field):
+        if field.rng.random() < 0.25:
+            return PARALYZED
+        return None
+
+
+class Sleep(StatusEffect):
+    """Sleeping pokemon cannot move for 1 to 3 turns."""
+
+    name = "Sleep"
+
+    def on_apply(self, pokemon, field):
+        pokemon.effect_counters[self.name] = field.rng.randint(1, 3)
+
+    def before_move(self, pokemon, field):
+        turns = pokemon.effect_counters.get(self.name, 0)
+        if turns > 0:
+            pokemon.effect_counters[self.name] = turns - 1
+            return ASLEEP
+        cure_status(pokemon)
+        return None
+
+
+class Freeze(StatusEffect):
+    """Frozen pokemon cannot move, and thaw out 1/5 of the time."""
+
+    name = "Freeze"
+    immune_types = ("Ice",)
+
+    def before_move(self, pokemon, field):
+        if field.rng.random() < 0.2:
+            cure_status(pokemon)
+            return None
+        return FAILED
+
+
+class Confuse(StatusEffect):
+    """Confused pokemon hurt themselves instead of moving 1/3 of the time,
+    for 2 to 5 turns."""
+
+    name = "Confuse"
+    # base power of the typeless physical attack a confused pokemon hits
+    # itself with
+    SELF_HIT_POWER = 40
+
+    def on_apply(self, pokemon, field):
+        pokemon.effect_counters[self.name] = field.rng.randint(2, 5)
+
+    def before_move(self, pokemon, field):
+        turns = pokemon.effect_counters.get(self.name, 0) - 1
+        if turns < 0:
+            cure_hidden_status(pokemon)
+            return None
+        pokemon.effect_counters[self.name] = turns
+        if field.rng.random() < 1 / 3:
+            pokemon.lose_health(base_damage(
+                pokemon.level, self.SELF_HIT_POWER, pokemon.attack,
+                pokemon.defense))
+            return CONFUSED
+        return None
+
+
+class Attract(StatusEffect):
+    """Infatuated pokemon fail to move 1/2 of the time."""
+
+    name = "Attract"
+
+    def before_move(self, pokemon, field):
+        if field.rng.random() < 0.5:
+            return INFATUATED
+        return None
+
+
+STATUS_EFFECTS = {effect.name: effect
+                  for effect in (Burn(), Poison(), Toxic(), Paralysis(),
+                                 Sleep(), Freeze())}
+HIDDEN_STATUS_EFFECTS = {effect.name: effect
+                         for effect in (Confuse(), Attract())}
+NO_EFFECT_HANDLER = StatusEffect()
+
+
+def inflict_status(pokemon, status, field):
+    """Affect a pokemon with a status condition.
+
+    :param pokemon: The pokemon to affect.
+    :type pokemon: :class:'pokemon.Pokemon'
+    :param status: The name of the condition, a key of STATUS_EFFECTS.
+    :type status: str
+    :param field: The field of the battle.
+    :type field: :class:'battle_effects.Field'
+
+    :return: True if the pokemon was affected, or False if it already has a
+        status or is immune.
+    :rtype: bool
+    """
+    effect = STATUS_EFFECTS[status]
+    if pokemon.status is not None or not effect.can_apply(pokemon):
+        return False
+    pokemon.status = status
+    effect.on_apply(pokemon, field)
+    return True
+
+
+def inflict_hidden_status(pokemon, status, field):
+    """Affect a pokemon with a hidden status condition.
+
+    Works as :func:`inflict_status`, for keys of HIDDEN_STATUS_EFFECTS.
+    """
+    effect = HIDDEN_STATUS_EFFECTS[status]
+    if pokemon.hidden_status is not None or not effect.can_apply(pokemon):
+        return False
+    pokemon.hidden_status = status
+    effect.on_apply(pokemon, field)
+    return True
+
+
+def cure_status(pokemon):
+    """Cure a pokemon of its status condition."""
+    pokemon.effect_counters.pop(pokemon.status, None)
+    pokemon.status = None
+
+
+def cure_hidden_status(pokemon):
+    """Cure a pokemon of its hidden status condition."""
+    pokemon.effect_counters.pop(pokemon.hidden_status, None)
+    pokemon.hidden_status = None
+
+
+def _effects(pokemon):
+    """Internal function for the handlers of every condition of a pokemon."""
+    return (STATUS_EFFECTS.get(pokemon.status, NO_EFFECT_HANDLER),
+            HIDDEN_STATUS_EFFECTS.get(pokemon.hidden_status, NO_EFFECT_HANDLER))
+
+
+def before_move(pokemon, field):
+    """Run the before move hooks of the conditions of a pokemon.
+
+    :return: The status code of the first condition that stops the pokemon
+        moving, or None if it can move.
+    :rtype: int
+    """
+    for effect in _effects(pokemon):
+        code = effect.before_move(pokemon, field)
+        if code is not None:
+            return code
+    return None
+
+
+def end_of_turn(pokemon, field):
+    """Run the end of turn hooks of the conditions of a pokemon."""
+    for effect in _effects(pokemon):
+        if pokemon.fainted:
+            return
+        effect.end_of_turn(pokemon, field)
+
+
+def effective_speed(pokemon):
+    """The speed of a pokemon after its status condition is applied."""
+    if pokemon.status == "Paralysis":
+        return pokemon.speed // 2
+    return pokemon.speed
+
+
+def spread_pokerus(party, rng):
+    """Spread pokerus through a party after a battle.
+
+    Each infected pokemon has a 1/3 chance of infecting each pokemon next to
+    it in the party that has never been infected, and a 1/4 chance of being
+    cured.
+
+    :param party: The pokemon of the party, in party order.
+    :type party: list of :class:'pokemon.Pokemon'
+    :param rng: The random generator to roll with.
+    :type rng: :class:'random.Random'
+    """
+    infected = [index for index, pokemon in enumerate(party)
+                if pokemon.pokerus is True]
+    for index in infected:
+        for neighbour in party[max(index - 1, 0):index + 2]:
+            if neighbour.pokerus is None and rng.random() < 1 / 3:
+                neighbour.pokerus_infect()
+    for index in infected:
+        if rng.random() < 0.25:
+            party[index].pokerus_cure()
+
+
+def type_effectiveness(move_type, defending_types):
+    """The damage multiplier of a move type against the types of a pokemon.
+
+    :rtype: float
+    """
+    chart = TYPE_CHART.get(move_type, {})
+    multiplier = 1
+    for poke_type in defending_types:
+        multiplier *= chart.get(poke_type, 1)
+    return multiplier
+
+
+def base_damage(level, power, attack, defense):
+    """The damage of a move before any multipliers are applied.
+
+    :rtype: int
+    """
+    return int((2 * level / 5 + 2) * power * attack / defense) // 50 + 2
+
+
+def damage(move_info, source_pokemon, target_pokemon, weather=None,
+           critical=False, roll=MAX_ROLL):
+    """Calculate the damage of a move.
+
+    :param move_info: The compiled info of the move, as used by apply_move.
+    :param critical: True if the move is a critical hit.
+    :param roll: The random damage roll, in percent from MIN_ROLL to
+        MAX_ROLL.
+
+    :return: The damage the move would deal, or 0 if the move does no damage.
+    :rtype: int
+    """
+    if move_info["category"] is Category.PHYSICAL:
+        attack, defense = source_pokemon.attack, target_pokemon.defense
+    elif move_info["category"] is Category.SPECIAL:
+        attack, defense = source_pokemon.sp_attack, target_pokemon.sp_defense
+    else:
+        return 0
+    move_type = move_info["type"]
+    multiplier = type_effectiveness(move_type, target_pokemon.types)
+    if multiplier == 0:
+        return 0
+    if critical:
+        multiplier *= CRITICAL_MULTIPLIER
+    if move_type in source_pokemon.types:
+        multiplier *= STAB
+    multiplier *= WEATHER_BOOST.get(weather, {}).get(move_type, 1)
+    multiplier *= STATUS_EFFECTS.get(
+        source_pokemon.status, NO_EFFECT_HANDLER).damage_multiplier(
+            source_pokemon, move_info)
+    amount = base_damage(source_pokemon.level, move_info["base_power"],
+                         attack, defense)
+    return max(int(amount * roll // 100 * multiplier), 1)
+
+
+# values of the yes/no flag fields of a move
+_FLAGS = {"Yes": True, "No": False}
+_FLAG_FIELDS = ("contact", "sound", "punch", "biting", "snatchable",
+                "gravity", "defrost", "reflectable", "blockable", "copyable")
+
+
+def _move_error(move_info, field):
+    """Internal function for the error raised for a malformed move field."""
+    return ValueError(f"Error reading move information: "
+                      f"{move_info.get('name')!r}; {field}: "
+                      f"{move_info.get(field)!r}")
+
+
+def _number(move_info, field, number_type, low, high, optional=True):
+    """Internal function for compiling a number field of a move.
+
+    :return: The number, or None if the field is optional and "None".
+    """
+    value = move_info.get(field)
+    if optional and value == "None":
+        return None
+    try:
+        number = number_type(value)
+    except (TypeError, ValueError):
+        raise _move_error(move_info, field) from None
+    if not low <= number <= high:
+        raise _move_error(move_info, field)
+    return number
+
+
+def _enum(move_info, field, enum):
+    """Internal function for compiling an enum field of a move."""
+    try:
+        return enum(move_info.get(field))
+    except ValueError:
+        raise _move_error(move_info, field) from None
+
+
+def _effect(move_info):
+    """Internal function for compiling the effect field of a move."""
+    value = move_info.get("effect")
+    if value == "None":
+        return None
+    kind, separator, detail = (value or "").partition(":")
+    try:
+        kind = EffectKind(kind)
+    except ValueError:
+        raise _move_error(move_info, "effect") from None
+    if not separator or not detail:
+        raise _move_error(move_info, "effect")
+    if kind is EffectKind.STATUS and detail != "Heal" \
+            and detail not in STATUS_EFFECTS:
+        raise _move_error(move_info, "effect")
+    return Effect(kind, detail)
+
+
+def compile_move(move_info):
+    """Validate a move's csv row and convert it to compiled move info.
+
+    Numeric fields become ints or floats, with None for "None" values;
+    category and target become :class:`Category` and :class:`Target`
+    members; the effect becomes an :class:`Effect`; and yes/no flags become
+    bools. Fields not listed here are kept as they are.
+
+    :param move_info: A row of a move csv.
+    :type move_info: dict
+
+    :raises ValueError: If any field of the row is missing or malformed. The
+        error names the move and the field.
+
+    :return: A new dict of compiled move info.
+    :rtype: dict
+    """
+    if not move_info.get("name"):
+        raise _move_error(move_info, "name")
+    compiled = dict(move_info)
+    if move_info.get("type") not in TYPE_CHART:
+        raise _move_error(move_info, "type")
+    compiled["category"] = _enum(move_info, "category", Category)
+    compiled["target"] = _enum(move_info, "target", Target)
+    compiled["pp"] = _number(move_info, "pp", int, 1, 64, optional=False)
+    compiled["base_power"] = _number(move_info, "base_power", int, 0,
+                                     1000)
+    if (compiled["category"] is not Category.OTHER
+            and compiled["base_power"] is None):
+        raise _move_error(move_info, "base_power")
+    compiled["accuracy"] = _number(move_info, "accuracy", float, 0, 100)
+    compiled["effect"] = _effect(move_info)
+    compiled["effect_rate"] = _number(move_info, "effect_rate", float, 0,
+                                      100)
+    compiled["cit_ratio"] = _number(move_info, "cit_ratio", float, 0, 100)
+    compiled["priority"] = _number(move_info, "priority", int, -7, 5,
+                                   optional=False)
+    compiled["recoil"] = _number(move_info, "recoil", float, 0, 1)
+    compiled["crash"] = _number(move_info, "crash", float, 0, 1)
+    for field in ("condition", "unique_effect"):
+        if move_info.get(field) is None:
+            raise _move_error(move_info, field)
+        compiled[field] = None if move_info[field] == "None" \
+            else move_info[field]
+    for field in _FLAG_FIELDS:
+        try:
+            compiled[field] = _FLAGS[move_info.get(field)]
+        except KeyError:
+            raise _move_error(move_info, field) from None
+    return compiled
+
 
 def verify_move(move_info):
     """Check that the data passed by the info argument is a usable move.
 
     No effect is actually generated from this function, and no lasting
     operations are performed. A True return value means the move is verified.
+    Use :func:`compile_move` to find out why a move is not usable.
+    """
+    try:
+        compile_move(move_info)
+    except ValueError:
+        return False
+    return True
+
+
+def _apply_effect(effect, source_pokemon, target_pokemon, field):
+    """Internal function for applying the effect of a move.
+
+    :return: True if the effect was applied, or False if the target was
+        already affected.
     """
-    ###--TO DO--###
-    # add code to actualyl verify the move
+    kind, value = effect
+    if kind is EffectKind.STATUS:
+        if value == "Heal":
+            cure_status(target_pokemon)
+            return True
+        return inflict_status(target_pokemon, value, field)
+    elif kind is EffectKind.HIDDEN_STATUS:
+        if value == "Heal":
+            cure_hidden_status(target_pokemon)
+            return True
+        if value not in HIDDEN_STATUS_EFFECTS:
+            return True
+        return inflict_hidden_status(target_pokemon, value, field)
+    elif kind is EffectKind.WEATHER:
+        field.set_weather(value)
     return True
 
+
 def apply_move(move_info, source_pokemon, target_pokemon, field):
     """Perform the specified move on the target.
 
@@ -42,7 +659,52 @@ def apply_move(move_info, source_pokemon, target_pokemon, field):
     function, not a copy, in order to apply accurate changes to the current pp
     of the move due to various abilities or other effects on the field. As
     such, this function should only be called directly by a Move object.
+    The move_info must be compiled by :func:`compile_move`.
     """
-    ###--TO DO--###
-    # add code to apply the move
-    return 0
+    if source_pokemon.fainted or move_info["pp_cur"] <= 0:
+        return FAILED
+    code = before_move(source_pokemon, field)
+    if code is not None:
+        return code
+    move_info["pp_cur"] -= 1
+    if field.events:
+        field.events.emit(events.MOVE, source_pokemon,
+                          move=move_info["name"], target=target_pokemon)
+    rng = field.rng
+
+    accuracy = move_info["accuracy"]
+    if accuracy is not None and rng.random() * 100 >= accuracy:
+        return MISSED
+
+    effect = move_info["effect"]
+    if move_info["category"] is Category.OTHER:
+        if effect is None:
+            return SUCCESS
+        if not _apply_effect(effect, source_pokemon, target_pokemon, field):
+            return ALREADY_AFFECTED
+        return SUCCESS
+
+    effectiveness = type_effectiveness(move_info["type"], target_pokemon.types)
+    if effectiveness == 0:
+        return NO_EFFECT
+    cit_ratio = move_info["cit_ratio"]
+    critical = cit_ratio is not None and rng.random() * 100 < cit_ratio
+    dealt = damage(move_info, source_pokemon, target_pokemon, field.weather,
+                   critical, rng.randint(MIN_ROLL, MAX_ROLL))
+    target_pokemon.lose_health(dealt)
+    if move_info["recoil"] is not None:
+        recoil = int(dealt * move_info["recoil"])
+        if recoil:
+            source_pokemon.lose_health(recoil)
+    if effect is not None and not target_pokemon.fainted:
+        rate = move_info["effect_rate"]
+        if rate is None or rng.random() * 100 < rate:
+            _apply_effect(effect, source_pokemon, target_pokemon, field)
+
+    if critical:
+        return CRITICAL
+    elif effectiveness > 1:
+        return SUPER_EFFECTIVE
+    elif effectiveness < 1:
+        return NOT_VERY_EFFECTIVE
+    return SUCCESS
@@ -0,0 +1,4 @@
+"""Benchmark suite for dex loading and querying, moves and battle math.
+
+Run ``python -m benchmarks --help`` from the root of the repository.
+"""
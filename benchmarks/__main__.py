@@ -0,0 +1,105 @@
+"""Run the benchmark suite.
+
+Run from the root of the repository:
+
+    python -m benchmarks                      run every benchmark
+    python -m benchmarks --save               run, and save the results as
+                                              the baseline
+    python -m benchmarks --compare            run, and fail if any benchmark
+                                              is slower than the baseline by
+                                              more than the threshold
+    python -m benchmarks --sizes 1000 --only pokedex_load,damage_calc
+
+Baselines are specific to the machine they were saved on; save a baseline on
+the machine that will be compared against it.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from benchmarks.suite import BENCHMARKS
+
+SIZES = (1000, 10000, 100000)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "baseline.json")
+# a benchmark regresses when it is this fraction slower than its baseline
+THRESHOLD = 0.25
+REPEAT = 3
+
+
+def run(names, sizes, repeat=REPEAT):
+    """Run benchmarks, printing each result as it finishes.
+
+    :return: The fastest seconds per call of each benchmark, keyed by
+        "name@size".
+    :rtype: dict
+    """
+    results = dict()
+    for name in names:
+        for size in sizes:
+            timer = timeit.Timer(BENCHMARKS[name](size))
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat, number)) / number
+            results[f"{name}@{size}"] = best
+            print(f"{name + '@' + str(size):32} {best * 1000:12.3f} ms",
+                  flush=True)
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Compare results against a baseline.
+
+    :return: (key, baseline seconds, result seconds) of each regression.
+    :rtype: list of tuples
+    """
+    return [(key, baseline[key], seconds) for key, seconds in results.items()
+            if key in baseline and seconds > baseline[key] * (1 + threshold)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma separated dataset sizes")
+    parser.add_argument("--only", help="comma separated benchmark names")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="baseline file to save or compare with")
+    parser.add_argument("--save", action="store_true",
+                        help="save the results as the baseline")
+    parser.add_argument("--compare", action="store_true",
+                        help="exit with an error if any benchmark regressed")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before a regression, as a "
+                             "fraction of the baseline")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(names, sizes)
+
+    if args.save:
+        baseline = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as fh:
+                baseline = json.load(fh)
+        baseline.update(results)
+        with open(args.baseline, "w") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before * 1000:.3f} ms -> "
+                  f"{after * 1000:.3f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
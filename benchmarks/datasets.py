@@ -0,0 +1,171 @@
+"""Synthetic datasets for benchmarks.
+
+Each generator scales one of the csvs in ``resources/`` to any number of
+rows. Rows are copies of a real row of the csv, with their ids, names and
+the fields that are sorted, filtered or battled on replaced by seeded random
+values, so every dataset of the same size and seed is identical.
+"""
+import csv
+import io
+import os
+import random
+
+import battle_effects
+import experience
+from pokemon import Pokemon
+
+RESOURCES = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "resources")
+POKEDEX_FILE = os.path.join(RESOURCES, "pokedex", "Pokedex - national.csv")
+ITEMS_FILE = os.path.join(RESOURCES, "items", "items - pokeballs.csv")
+MOVES_FILE = os.path.join(RESOURCES, "moves", "moves - fire.csv")
+
+TYPES = tuple(sorted({poke_type.lower()
+                      for poke_type in Pokemon.VALID_TYPES}))
+STAT_NAMES = ("hp", "attack", "defense", "sp_attack", "sp_defense", "speed")
+
+
+def _template(path):
+    """Internal function for reading the rows and header of a csv."""
+    with open(path, newline="") as fh:
+        reader = csv.DictReader(fh)
+        return list(reader), reader.fieldnames
+
+
+def _to_csv(fieldnames, rows):
+    """Internal function for writing rows to csv text."""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def pokedex_csv(rows, seed=0):
+    """Generate the text of a Pokedex csv.
+
+    :param rows: The number of pokemon.
+    :type rows: int
+    :param seed: The seed of the random values.
+    :type seed: int
+
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    templates, fieldnames = _template(POKEDEX_FILE)
+    generated = list()
+    for index in range(rows):
+        row = dict(templates[index % len(templates)])
+        stats = {stat: rng.randint(5, 255) for stat in STAT_NAMES}
+        types = rng.sample(TYPES, rng.randint(1, 2))
+        # species with a single ability, a blank second ability, or a second
+        # ability and a hidden ability, as in the real data
+        abilities = rng.choice((["Levitate"], ["Overgrow", "", "Chlorophyll"],
+                                ["Overgrow", "Chlorophyll"],
+                                ["Pressure", "Unnerve", "Mirror Armor"]))
+        row.update(
+            name=f"[English:Mon{index:06d}]",
+            number=str(index + 1),
+            type="[" + ", ".join(types) + "]",
+            abilities="[" + ", ".join(f'"{ability}"' for ability
+                                      in abilities) + "]",
+            height=f"{rng.uniform(0.1, 20):.1f}m",
+            weight=f"{rng.uniform(0.1, 999):.1f}kg",
+            capture_rate=str(rng.randint(3, 255)),
+            base_egg_cycles=str(rng.choice((5, 10, 15, 20, 25, 30, 40))),
+            exp_yield=str(rng.randint(30, 340)),
+            experience_growth=rng.choice(experience.GROWTH_RATES),
+            base_happiness=str(rng.choice((0, 35, 50, 70, 100, 140))),
+            base_stats="[" + ",\n".join(f"{stat}:{value}" for stat, value
+                                        in stats.items()) + "]",
+            egg_groups=f"[{types[0]}]",
+            owned=rng.choice(("unknown", "seen", "caught")))
+        generated.append(row)
+    return _to_csv(fieldnames, generated)
+
+
+def items_csv(rows, seed=0):
+    """Generate the text of an item csv of pokeballs.
+
+    About one row in ten has no buying price, and one in five has no catch
+    rate, as in the real data.
+
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    templates, fieldnames = _template(ITEMS_FILE)
+    generated = list()
+    for index in range(rows):
+        row = dict(templates[index % len(templates)])
+        price = "" if rng.random() < 0.1 else rng.randrange(100, 10000, 50)
+        row.update(
+            name=f"Ball {index:06d}",
+            id=f"pb_{index + 1}",
+            purchase_price=str(price),
+            sale_price=str(price and price // 2),
+            catch_rate="" if rng.random() < 0.2
+            else f"{rng.uniform(0.1, 8):.2f}")
+        generated.append(row)
+    return _to_csv(fieldnames, generated)
+
+
+def moves_csv(rows, seed=0):
+    """Generate the text of a move csv.
+
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    templates, fieldnames = _template(MOVES_FILE)
+    damaging = [row for row in templates if row["category"] != "Other"]
+    move_types = list(battle_effects.TYPE_CHART)
+    generated = list()
+    for index in range(rows):
+        row = dict(damaging[index % len(damaging)])
+        row.update(
+            name=f"Move {index:06d}",
+            type=rng.choice(move_types),
+            category=rng.choice(("Physical", "Special")),
+            pp=str(rng.choice((5, 10, 15, 20, 25, 30, 35, 40))),
+            base_power=str(rng.randrange(20, 150, 5)),
+            accuracy=rng.choice(("None", "70", "80", "85", "90", "95", "100")),
+            priority=str(rng.choice((0, 0, 0, 0, 1, -1))))
+        generated.append(row)
+    return _to_csv(fieldnames, generated)
+
+
+def locations_csv(rows, seed=0):
+    """Generate the text of a PokeEarth locations csv.
+
+    Locations are scattered over a square map that grows with the number of
+    rows, so the density of locations is the same for every size.
+
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    side = 100 * max(rows, 1) ** 0.5
+    generated = [{"code": f"L{index:06d}", "name": f"Location {index}",
+                  "region": f"Region {index % 8}",
+                  "x": f"{rng.uniform(0, side):.1f}",
+                  "y": f"{rng.uniform(0, side):.1f}"}
+                 for index in range(rows)]
+    return _to_csv(("code", "name", "region", "x", "y"), generated)
+
+
+def encounters_csv(rows, seed=0, species=10):
+    """Generate the text of a PokeEarth encounters csv, with the given
+    number of species at each of the locations of :func:`locations_csv`.
+
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    generated = list()
+    for index in range(rows):
+        for number in rng.sample(range(1, 899), species):
+            low = rng.randint(2, 60)
+            generated.append({"location": f"L{index:06d}",
+                              "number": str(number),
+                              "weight": str(rng.choice((1, 5, 10, 20, 30))),
+                              "min_level": str(low),
+                              "max_level": str(low + rng.randint(0, 5))})
+    return _to_csv(("location", "number", "weight", "min_level",
+                    "max_level"), generated)
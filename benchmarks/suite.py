@@ -0,0 +1,274 @@
+"""The benchmarks of the suite.
+
+Each benchmark is a setup function registered with :func:`benchmark`. The
+setup function is called once for each dataset size with the size, and
+returns the function to time; only calls to the returned function are timed.
+"""
+import atexit
+import io
+import os
+import random
+import tempfile
+
+import ai
+from battle import Battle
+import battle_effects
+import dex_db
+from encounters import EncounterEngine
+from itemdex import Itemdex
+import moves
+from pokedex import Pokedex
+from pokeearth import PokeEarth
+from pokemon import Pokemon
+import shared_dex
+from wild import WildGenerator
+
+from benchmarks import datasets
+
+# setup functions, keyed by benchmark name
+BENCHMARKS = dict()
+
+
+def benchmark(name):
+    """Register a setup function as a benchmark of the given name."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _pokedex(size):
+    return Pokedex(io.StringIO(datasets.pokedex_csv(size)))
+
+
+def _itemdex(size):
+    return Itemdex(io.StringIO(datasets.items_csv(size)))
+
+
+@benchmark("pokedex_load")
+def pokedex_load(size):
+    text = datasets.pokedex_csv(size)
+    return lambda: Pokedex(io.StringIO(text))
+
+
+@benchmark("pokedex_sort_cold")
+def pokedex_sort_cold(size):
+    dex = _pokedex(size)
+
+    def run():
+        # drop the cached sort orders so each sort is computed from scratch
+        dex._entry_changed(None)
+        dex.sort(Pokedex.STATS_TOTAL)
+    return run
+
+
+@benchmark("pokedex_sort_cached")
+def pokedex_sort_cached(size):
+    dex = _pokedex(size)
+    dex.precompute_sort_orders((Pokedex.STATS_TOTAL,))
+    return lambda: dex.sort(Pokedex.STATS_TOTAL, reverse=True)
+
+
+@benchmark("pokedex_filter")
+def pokedex_filter(size):
+    dex = _pokedex(size)
+
+    def run():
+        dex.reset()
+        dex.filter(Pokedex.TYPE, "fire")
+    return run
+
+
+@benchmark("pokedex_results")
+def pokedex_results(size):
+    dex = _pokedex(size)
+    dex.sort(Pokedex.NAME)
+    return lambda: dex.results(size // 2, 50)
+
+
+@benchmark("itemdex_load")
+def itemdex_load(size):
+    text = datasets.items_csv(size)
+    return lambda: Itemdex(io.StringIO(text))
+
+
+@benchmark("itemdex_filter_range")
+def itemdex_filter_range(size):
+    dex = _itemdex(size)
+
+    def run():
+        dex.reset()
+        dex.filter_range(Itemdex.BUY, 1000, 5000)
+    return run
+
+
+@benchmark("itemdex_top_reverse")
+def itemdex_top_reverse(size):
+    dex = _itemdex(size)
+    # about one item in ten has no price, and must not come first
+    return lambda: dex.top(Itemdex.BUY, 10, reverse=True)
+
+
+@benchmark("moves_load")
+def moves_load(size):
+    text = datasets.moves_csv(size)
+    return lambda: moves.load_moves(io.StringIO(text))
+
+
+@benchmark("move_construct")
+def move_construct(size):
+    table = moves.load_moves(io.StringIO(datasets.moves_csv(size)))
+    infos = list(table.values())
+    return lambda: [moves.Move.from_info(info) for info in infos]
+
+
+@benchmark("stat_calc")
+def stat_calc(size):
+    rng = random.Random(0)
+    base_stats = {stat: 100 for stat in datasets.STAT_NAMES}
+    evs = dict.fromkeys(Pokemon.EV_NAMES.values(), 0)
+    rolls = [(Pokemon.unpack_ivs(rng.getrandbits(30)), rng.randint(1, 100),
+              rng.choice(Pokemon.NATURES)) for _ in range(size)]
+    return lambda: [Pokemon.calculate_stats(base_stats, ivs, evs, level,
+                                            nature)
+                    for ivs, level, nature in rolls]
+
+
+@benchmark("damage_calc")
+def damage_calc(size):
+    dex = _pokedex(2)
+    attacker, defender = (Pokemon.from_entry(dex[number], 50)
+                          for number in dex)
+    table = moves.load_moves(io.StringIO(datasets.moves_csv(size)))
+    infos = list(table.values())
+    return lambda: [battle_effects.damage(info, attacker, defender)
+                    for info in infos]
+
+
+@benchmark("ai_decision")
+def ai_decision(size):
+    # the search doesn't depend on the dataset size; every size times the
+    # same decision
+    dex = _pokedex(4)
+    team = [Pokemon.from_entry(dex[number], 50) for number in dex]
+    battle = Battle(team[:2], team[2:], seed=0)
+    infos = list(moves.load_moves(io.StringIO(datasets.moves_csv(8)))
+                 .values())
+    own_moves = [moves.Move.from_info(info) for info in infos[:4]]
+    opponent_moves = [moves.Move.from_info(info) for info in infos[4:]]
+    # a budget no decision comes near, so the depth decides the work done
+    bot = ai.BattleAI(0, depth=2, time_budget=60, rolls=(100,))
+    return lambda: ai.decisions_per_second(bot, battle, own_moves,
+                                           opponent_moves, decisions=1)
+
+
+def _earth(size):
+    return PokeEarth.from_csv(io.StringIO(datasets.locations_csv(size)),
+                              io.StringIO(datasets.encounters_csv(size)))
+
+
+@benchmark("earth_load")
+def earth_load(size):
+    locations = datasets.locations_csv(size)
+    encounters = datasets.encounters_csv(size)
+    return lambda: PokeEarth.from_csv(io.StringIO(locations),
+                                      io.StringIO(encounters))
+
+
+@benchmark("earth_nearest")
+def earth_nearest(size):
+    earth = _earth(size)
+    side = 100 * size ** 0.5
+    rng = random.Random(0)
+    points = [(rng.uniform(0, side), rng.uniform(0, side))
+              for _ in range(100)]
+    return lambda: [earth.nearest(x, y, 5) for x, y in points]
+
+
+@benchmark("earth_nearest_far")
+def earth_nearest_far(size):
+    earth = _earth(size)
+    side = 100 * size ** 0.5
+    # points far outside the map, where most rings are empty space
+    points = [(side * 60, side * 60), (-side * 60, side / 2)]
+    return lambda: [earth.nearest(x, y, 5) for x, y in points]
+
+
+@benchmark("earth_viewport")
+def earth_viewport(size):
+    earth = _earth(size)
+    side = 100 * size ** 0.5
+    rng = random.Random(0)
+    # a screen-sized view panned to 100 positions
+    views = [(x, y, x + 800, y + 600) for x, y in
+             ((rng.uniform(0, side), rng.uniform(0, side))
+              for _ in range(100))]
+    return lambda: [earth.in_viewport(*view) for view in views]
+
+
+@benchmark("encounter_counts")
+def encounter_counts(size):
+    engine = EncounterEngine(_earth(1), None, seed=0)
+    return lambda: engine.species_counts("L000000", size)
+
+
+@benchmark("encounter_generate")
+def encounter_generate(size):
+    earth = _earth(1)
+    dex = _pokedex(898)
+    engine = EncounterEngine(earth, WildGenerator(dex, seed=0), seed=0)
+    return lambda: engine.encounter("L000000", size)
+
+
+@benchmark("wild_pokemon")
+def wild_pokemon(size):
+    dex = _pokedex(size)
+    # every species, so every shape of abilities is created
+    population = WildGenerator(dex, seed=0).generate(list(dex), 5)
+    return lambda: list(population)
+
+
+# temporary folders of compiled databases, removed at exit
+_DATABASE_FOLDERS = list()
+
+
+def _pokedex_db(size):
+    folder = tempfile.TemporaryDirectory()
+    _DATABASE_FOLDERS.append(folder)
+    path = os.path.join(folder.name, "pokedex.sqlite")
+    dex_db.compile_pokedex(io.StringIO(datasets.pokedex_csv(size)), path)
+    return path
+
+
+@benchmark("pokedex_db_open")
+def pokedex_db_open(size):
+    path = _pokedex_db(size)
+    return lambda: dex_db.SQLitePokedex(path).close()
+
+
+@benchmark("pokedex_db_filter")
+def pokedex_db_filter(size):
+    dex = dex_db.SQLitePokedex(_pokedex_db(size))
+
+    def run():
+        dex.reset()
+        dex.filter(Pokedex.TYPE, "fire")
+    return run
+
+
+# published shared memory blocks, unlinked at exit
+_SHARED_BLOCKS = list()
+
+
+@atexit.register
+def _unlink_shared_blocks():
+    for data in _SHARED_BLOCKS:
+        data.close()
+        data.unlink()
+
+
+@benchmark("shared_attach")
+def shared_attach(size):
+    data = shared_dex.publish(_pokedex(size))
+    _SHARED_BLOCKS.append(data)
+    return lambda: shared_dex.attach(data.name).close()
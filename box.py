@@ -0,0 +1,486 @@
+"""Contains classes for compact storage of large numbers of pokemon.
+
+A :class:`PokemonBox` stores each pokemon as a row across a set of typed
+arrays, one array for each kind of value, rather than as a
+:class:`pokemon.Pokemon` object with its own attributes and dictionaries.
+Strings, such as names and moves, are stored once in a string table shared by
+the whole box and referenced by id.
+"""
+from array import array
+import heapq
+import struct
+import sys
+
+import experience
+from pokemon import Pokemon
+
+# order of the stats stored for each pokemon
+STAT_NAMES = ("max_HP", "cur_HP", "attack", "defense", "sp_attack",
+              "sp_defense", "speed")
+
+
+class PokemonBox:
+    """A storage box holding pokemon as rows of compact arrays."""
+
+    # start of every serialized box
+    MAGIC = b"PKBX"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHI")
+    _LENGTH = struct.Struct("<I")
+
+    # string id stored for a missing string
+    NO_STRING = 0
+    # value stored for a missing original trainer id
+    NO_TRAINER_ID = 0xFFFFFFFF
+
+    # bits of the flags column
+    OCCUPIED = 0x01
+    SHINY = 0x02
+    # two bits for the gender; 0 for genderless, then 1 for male, 2 for female
+    GENDER_SHIFT = 2
+    GENDERS = (None, "male", "female")
+    # two bits for pokerus; 0 for never infected, 1 for infected, 2 for cured
+    POKERUS_SHIFT = 4
+    POKERUS = (None, True, False)
+
+    # name, array typecode, and number of values per pokemon of every column
+    COLUMNS = (
+        ("species", "I", 1),
+        ("name", "I", 1),
+        ("types", "I", 2),
+        ("ability", "I", 1),
+        ("moves", "I", 4),
+        ("location", "I", 1),
+        ("ot", "I", 1),
+        ("ot_id", "I", 1),
+        ("status", "I", 1),
+        ("level", "B", 1),
+        ("exp", "I", 1),
+        ("growth_rate", "B", 1),
+        ("ivs", "I", 1),
+        ("evs", "B", len(Pokemon.IV_NAMES)),
+        ("stats", "H", len(STAT_NAMES)),
+        ("nature", "B", 1),
+        ("happiness", "B", 1),
+        ("flags", "B", 1),
+    )
+
+    def __init__(self):
+        """Constructor for an empty PokemonBox."""
+        self._columns = {name: array(typecode)
+                         for name, typecode, _ in self.COLUMNS}
+        self._widths = {name: width for name, _, width in self.COLUMNS}
+        # string table; id 0 is reserved for missing strings
+        self._strings = [None]
+        self._string_ids = dict()
+        # heap of emptied slots, reused lowest first before the box grows.
+        # Slots filled again by assignment are left in the heap and skipped
+        # when popped; the set of slots in the heap keeps a slot from being
+        # pushed twice, so the heap never outgrows the box.
+        self._free = list()
+        self._in_free = set()
+        self._count = 0
+
+    def __len__(self):
+        """The number of pokemon in the box."""
+        return self._count
+
+    def __iter__(self):
+        """Iterate over views of every pokemon in the box, in slot order."""
+        return (BoxedPokemon(self, slot) for slot in self.slots())
+
+    def __contains__(self, slot):
+        """True if the slot holds a pokemon; otherwise false."""
+        return (0 <= slot < self.capacity
+                and bool(self._columns["flags"][slot] & self.OCCUPIED))
+
+    def __getitem__(self, slot):
+        """Return a view of the pokemon in a slot.
+
+        :param slot: The slot of the pokemon.
+        :type slot: int
+
+        :rtype: :class:'box.BoxedPokemon'
+        """
+        if slot not in self:
+            raise IndexError(f"Box slot {slot} is empty.")
+        return BoxedPokemon(self, slot)
+
+    def __setitem__(self, slot, pokemon):
+        """Store a pokemon in a slot, replacing any pokemon already there.
+
+        :param slot: The slot to store the pokemon in. Must be less than the
+            capacity of the box.
+        :type slot: int
+        :param pokemon: The pokemon to store.
+        :type pokemon: :class:'pokemon.Pokemon'
+        """
+        if not 0 <= slot < self.capacity:
+            raise IndexError(f"Improper value for box slot: {slot}")
+        if slot not in self:
+            self._count += 1
+        self._write(slot, pokemon)
+
+    def __delitem__(self, slot):
+        """Remove the pokemon in a slot, leaving the slot empty."""
+        if slot not in self:
+            raise IndexError(f"Box slot {slot} is empty.")
+        self._columns["flags"][slot] = 0
+        if slot not in self._in_free:
+            heapq.heappush(self._free, slot)
+            self._in_free.add(slot)
+        self._count -= 1
+
+    @property
+    def capacity(self):
+        """The number of slots in the box, both filled and empty."""
+        return len(self._columns["flags"])
+
+    def slots(self):
+        """Return the slots holding a pokemon, in order.
+
+        :rtype: list of int
+        """
+        flags = self._columns["flags"]
+        return [slot for slot in range(len(flags))
+                if flags[slot] & self.OCCUPIED]
+
+    def add(self, pokemon):
+        """Store a pokemon in the first free slot of the box.
+
+        :param pokemon: The pokemon to store.
+        :type pokemon: :class:'pokemon.Pokemon'
+
+        :return: The slot the pokemon was stored in.
+        :rtype: int
+        """
+        # drop slots that were filled again since they were freed
+        while self._free and self._free[0] in self:
+            self._in_free.discard(heapq.heappop(self._free))
+        if self._free:
+            slot = heapq.heappop(self._free)
+            self._in_free.discard(slot)
+        else:
+            slot = self.capacity
+            for name, column in self._columns.items():
+                column.extend(bytes(self._widths[name]))
+        self._count += 1
+        self._write(slot, pokemon)
+        return slot
+
+    def _string_id(self, string):
+        """Internal method for looking up or adding a string to the table."""
+        if string is None:
+            return self.NO_STRING
+        try:
+            return self._string_ids[string]
+        except KeyError:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = string_id
+            return string_id
+
+    def _get(self, name, slot):
+        """Internal method for reading the values of a column for a slot.
+
+        :return: A single value for single width columns, otherwise an array
+            of the values.
+        """
+        width = self._widths[name]
+        if width == 1:
+            return self._columns[name][slot]
+        return self._columns[name][slot * width:(slot + 1) * width]
+
+    def _set(self, name, slot, values):
+        """Internal method for writing the values of a column for a slot."""
+        width = self._widths[name]
+        column = self._columns[name]
+        if width == 1:
+            column[slot] = values
+        else:
+            column[slot * width:(slot + 1) * width] = array(column.typecode,
+                                                            values)
+
+    def _write(self, slot, pokemon):
+        """Internal method for writing every value of a pokemon to a slot."""
+        string_id = self._string_id
+        types = list(pokemon.types) + [None] * (2 - len(pokemon.types))
+        moves = list(pokemon.moves) + [None] * (4 - len(pokemon.moves))
+        stats = pokemon.stats
+        ivs = pokemon.ivs
+        evs = pokemon.evs
+        ot_id = pokemon.original_trainer_id
+        self._set("species", slot, string_id(str(pokemon.natl_id)))
+        self._set("name", slot, string_id(pokemon.name))
+        self._set("types", slot, [string_id(poke_type) for poke_type in types])
+        self._set("ability", slot, string_id(pokemon.ability))
+        self._set("moves", slot, [string_id(move) for move in moves])
+        self._set("location", slot, string_id(pokemon.location))
+        self._set("ot", slot, string_id(pokemon.original_trainer))
+        self._set("ot_id", slot,
+                  self.NO_TRAINER_ID if ot_id is None else ot_id)
+        self._set("status", slot, string_id(pokemon.status))
+        self._set("level", slot, pokemon.level)
+        self._set("exp", slot, pokemon.exp)
+        self._set("growth_rate", slot,
+                  experience.GROWTH_RATES.index(pokemon.growth_rate))
+        self._set("ivs", slot, Pokemon.pack_ivs(ivs))
+        self._set("evs", slot, [evs["ev" + iv_name[2:]]
+                                for iv_name in Pokemon.IV_NAMES])
+        self._set("stats", slot, [stats[stat] for stat in STAT_NAMES])
+        self._set("nature", slot, Pokemon.NATURES.index(pokemon.nature))
+        self._set("happiness", slot, pokemon.happiness)
+        self._set("flags", slot, self._pack_flags(pokemon))
+
+    @classmethod
+    def _pack_flags(cls, pokemon):
+        """Internal method for packing the flags column of a stored pokemon.
+
+        :return: The flags, with the OCCUPIED bit set.
+        :rtype: int
+        """
+        flags = cls.OCCUPIED
+        if pokemon.shiny:
+            flags |= cls.SHINY
+        flags |= cls.GENDERS.index(pokemon.gender) << cls.GENDER_SHIFT
+        flags |= cls.POKERUS.index(pokemon.pokerus) << cls.POKERUS_SHIFT
+        return flags
+
+    @classmethod
+    def _unpack_flags(cls, flags):
+        """Internal method for unpacking the flags column of a stored pokemon.
+
+        :return: The shiny, gender and pokerus values of the pokemon.
+        :rtype: tuple of (bool, str, bool)
+        """
+        return (bool(flags & cls.SHINY),
+                cls.GENDERS[(flags >> cls.GENDER_SHIFT) & 0x03],
+                cls.POKERUS[(flags >> cls.POKERUS_SHIFT) & 0x03])
+
+    def serialize(self):
+        """Serialize the whole box into a single binary blob.
+
+        :return: The serialized box, which can be loaded again with
+            ``PokemonBox.deserialize``.
+        :rtype: bytes
+        """
+        parts = [self._HEADER.pack(self.MAGIC, self.VERSION, self.capacity),
+                 self._LENGTH.pack(len(self._strings) - 1)]
+        for string in self._strings[1:]:
+            encoded = string.encode()
+            parts.append(self._LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        for name, _, _ in self.COLUMNS:
+            column = self._columns[name]
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def deserialize(cls, blob):
+        """Load a box from a blob made by ``PokemonBox.serialize``.
+
+        :param blob: The serialized box.
+        :type blob: bytes-like object
+
+        :rtype: :class:'box.PokemonBox'
+        """
+        blob = memoryview(blob)
+        magic, version, capacity = cls._HEADER.unpack_from(blob)
+        if magic != cls.MAGIC:
+            raise ValueError("Data is not a serialized pokemon box.")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported pokemon box version: {version}")
+        offset = cls._HEADER.size
+        box = cls()
+        (string_count,) = cls._LENGTH.unpack_from(blob, offset)
+        offset += cls._LENGTH.size
+        for _ in range(string_count):
+            (length,) = cls._LENGTH.unpack_from(blob, offset)
+            offset += cls._LENGTH.size
+            box._string_id(bytes(blob[offset:offset + length]).decode())
+            offset += length
+        for name, typecode, width in cls.COLUMNS:
+            column = box._columns[name]
+            size = column.itemsize * width * capacity
+            column.frombytes(blob[offset:offset + size])
+            if sys.byteorder == "big":
+                column.byteswap()
+            offset += size
+        # a sorted list is already a heap
+        box._free = [slot for slot in range(capacity)
+                     if not box._columns["flags"][slot] & cls.OCCUPIED]
+        box._in_free = set(box._free)
+        box._count = capacity - len(box._free)
+        return box
+
+
+class BoxedPokemon:
+    """A lightweight view of a single pokemon stored in a PokemonBox.
+
+    Every property reads directly from the box, so a view costs nothing to
+    create and always reflects the current contents of its slot. Use
+    ``to_pokemon`` to create a full, independent :class:`pokemon.Pokemon`.
+    """
+
+    __slots__ = ("_box", "_slot")
+
+    def __init__(self, box, slot):
+        """Constructor for a view of a single box slot.
+
+        :param box: The box the pokemon is stored in.
+        :type box: :class:'box.PokemonBox'
+        :param slot: The slot the pokemon is stored in.
+        :type slot: int
+        """
+        self._box = box
+        self._slot = slot
+
+    def _string(self, name):
+        return self._box._strings[self._box._get(name, self._slot)]
+
+    def _flags(self):
+        return PokemonBox._unpack_flags(self._box._get("flags", self._slot))
+
+    @property
+    def slot(self):
+        """The slot of the box this pokemon is stored in."""
+        return self._slot
+
+    @property
+    def natl_id(self):
+        """The national pokedex id of the pokemon, as a string."""
+        return self._string("species")
+
+    @property
+    def name(self):
+        """The name of the pokemon, or nickname if it has one."""
+        return self._string("name")
+
+    @name.setter
+    def name(self, name):
+        self._box._set("name", self._slot, self._box._string_id(name))
+
+    @property
+    def types(self):
+        """The type(s) of the pokemon."""
+        strings = self._box._strings
+        return [strings[type_id] for type_id in
+                self._box._get("types", self._slot) if type_id]
+
+    @property
+    def ability(self):
+        """The ability of the pokemon."""
+        return self._string("ability")
+
+    @property
+    def moves(self):
+        """A list of the usable moves of the pokemon."""
+        strings = self._box._strings
+        return [strings[move_id] for move_id in
+                self._box._get("moves", self._slot) if move_id]
+
+    @property
+    def location(self):
+        """Where the pokemon was first encountered by its original trainer."""
+        return self._string("location")
+
+    @property
+    def original_trainer(self):
+        """The name of the trainer who originally caught the pokemon."""
+        return self._string("ot")
+
+    @property
+    def original_trainer_id(self):
+        """The id number of the trainer who originally caught the pokemon."""
+        ot_id = self._box._get("ot_id", self._slot)
+        return None if ot_id == PokemonBox.NO_TRAINER_ID else ot_id
+
+    @property
+    def status(self):
+        """The current status condition of the pokemon."""
+        return self._string("status")
+
+    @property
+    def level(self):
+        """The current level of the pokemon."""
+        return self._box._get("level", self._slot)
+
+    @property
+    def exp(self):
+        """The total experience points of the pokemon."""
+        return self._box._get("exp", self._slot)
+
+    @property
+    def growth_rate(self):
+        """The experience growth rate of the pokemon species."""
+        return experience.GROWTH_RATES[self._box._get("growth_rate",
+                                                      self._slot)]
+
+    @property
+    def ivs(self):
+        """A dictionary containing the individual values of the pokemon."""
+        return Pokemon.unpack_ivs(self._box._get("ivs", self._slot))
+
+    @property
+    def evs(self):
+        """A dictionary containing the effort values of the pokemon."""
+        return {"ev" + iv_name[2:]: ev for iv_name, ev in
+                zip(Pokemon.IV_NAMES, self._box._get("evs", self._slot))}
+
+    @property
+    def stats(self):
+        """A dictionary containing the current stats of the pokemon."""
+        return dict(zip(STAT_NAMES, self._box._get("stats", self._slot)))
+
+    @property
+    def max_HP(self):
+        """The maximum health value of the pokemon."""
+        return self._box._columns["stats"][self._slot * len(STAT_NAMES)]
+
+    @property
+    def cur_HP(self):
+        """The current health value of the pokemon."""
+        return self._box._columns["stats"][self._slot * len(STAT_NAMES) + 1]
+
+    @property
+    def nature(self):
+        """The nature of the pokemon."""
+        return Pokemon.NATURES[self._box._get("nature", self._slot)]
+
+    @property
+    def happiness(self):
+        """The happiness value of the pokemon."""
+        return self._box._get("happiness", self._slot)
+
+    @property
+    def shiny(self):
+        """Determine if the pokemon is shiny."""
+        return self._flags()[0]
+
+    @property
+    def gender(self):
+        """The gender of the pokemon; "male", "female", or None if genderless."""
+        return self._flags()[1]
+
+    @property
+    def pokerus(self):
+        """The pokerus state of the pokemon; see ``Pokemon.pokerus``."""
+        return self._flags()[2]
+
+    def to_pokemon(self):
+        """Create an independent pokemon with the values of this view.
+
+        :rtype: :class:'pokemon.Pokemon'
+        """
+        pokemon = Pokemon(
+            self.natl_id, self.location, self.name, self.types, self.stats,
+            self.moves, self.ability, happiness=self.happiness, ivs=self.ivs,
+            shiny=self.shiny, level=self.level, ot=self.original_trainer,
+            ot_id=self.original_trainer_id, growth_rate=self.growth_rate,
+            exp=self.exp, nature=self.nature, gender=self.gender,
+            evs=self.evs, pokerus=self.pokerus)
+        pokemon.status = self.status
+        return pokemon
@@ -0,0 +1,207 @@
+"""Contains classes and functions for calculating the chance of catching a
+wild pokemon.
+
+Capture chances follow the generation V and later formula. For a pokemon with
+the capture rate ``rate``, caught with a ball with the catch rate ``ball`` at
+``hp_fraction`` of its max HP and with a status condition giving ``bonus``:
+
+    a = (1 - 2/3 * hp_fraction) * rate * ball * bonus
+
+The pokemon is caught outright if ``a`` is at least 255, otherwise it must
+pass four shake checks, for an overall chance of ``(a / 255) ** (3/4)``.
+"""
+from array import array
+
+# multiplier to the capture chance for each status condition
+STATUS_BONUS = {
+    None: 1.0,
+    "Sleep": 2.5,
+    "Freeze": 2.5,
+    "Paralysis": 1.5,
+    "Poison": 1.5,
+    "Burn": 1.5,
+    "Toxic": 1.5,
+}
+
+# the default number of HP fractions in a capture table; 21 covers every 5%
+# from 0% to 100%
+HP_STEPS = 21
+
+
+def capture_probability(capture_rate, ball_rate, hp_fraction=1.0, status=None):
+    """Calculate the chance of catching a single pokemon.
+
+    :param capture_rate: The capture rate of the pokemon species, from 0-255.
+    :type capture_rate: int
+    :param ball_rate: The catch rate of the ball used.
+    :type ball_rate: float
+    :param hp_fraction: The current HP of the pokemon as a fraction of its
+        max HP, from 0-1.
+    :type hp_fraction: float, optional
+    :param status: The status condition of the pokemon, or None.
+    :type status: str, optional
+
+    :return: The chance of the pokemon being caught, from 0-1.
+    :rtype: float
+    """
+    if not 0 <= hp_fraction <= 1:
+        raise ValueError(f"Improper value for HP fraction: {hp_fraction}")
+    a = (1 - 2 / 3 * hp_fraction) * capture_rate * ball_rate
+    a *= STATUS_BONUS[status]
+    return min(1.0, (a / 255) ** 0.75)
+
+
+class CaptureTable:
+    """A precomputed table of capture chances.
+
+    The table holds the capture chance for every combination of species from
+    a Pokedex, pokeball from an Itemdex, HP fraction, and status condition
+    bonus. Since the chance factors into a product of one term per axis, each
+    term is raised to the 3/4 power once per axis value, and every cell of the
+    table costs a single multiplication to fill.
+    """
+
+    def __init__(self, pokedex, itemdex, hp_steps=HP_STEPS):
+        """Constructor for the CaptureTable class.
+
+        :param pokedex: The Pokedex with the species to include.
+        :type pokedex: :class:'pokedex.Pokedex'
+        :param itemdex: An Itemdex including pokeballs. Only balls with a
+            fixed catch rate are included.
+        :type itemdex: :class:'itemdex.Itemdex'
+        :param hp_steps: The number of evenly spaced HP fractions from 0-1 to
+            include. Must be at least 2.
+        :type hp_steps: int, optional
+        """
+        if hp_steps < 2:
+            raise ValueError(f"Improper value for HP steps: {hp_steps}")
+        self._species = tuple(pokedex._entry_ids)
+        self._balls = tuple(item_id for item_id in itemdex._entry_ids
+                            if itemdex[item_id]["type"] == "pokeballs"
+                            and itemdex[item_id]["catch_rate"] is not None)
+        self._hp_steps = hp_steps
+        self._bonuses = tuple(sorted(set(STATUS_BONUS.values())))
+        self._species_index = {number: index
+                               for index, number in enumerate(self._species)}
+        self._ball_index = {item_id: index
+                            for index, item_id in enumerate(self._balls)}
+        self._bonus_index = {status: self._bonuses.index(bonus)
+                             for status, bonus in STATUS_BONUS.items()}
+
+        # each axis term, already divided by 255 and raised to the 3/4 power
+        species_terms = [(pokedex[number]["capture_rate"] / 255) ** 0.75
+                         for number in self._species]
+        ball_terms = [itemdex[item_id]["catch_rate"] ** 0.75
+                      for item_id in self._balls]
+        hp_terms = [(1 - 2 / 3 * step / (hp_steps - 1)) ** 0.75
+                    for step in range(hp_steps)]
+        bonus_terms = [bonus ** 0.75 for bonus in self._bonuses]
+
+        # laid out as [species][hp][bonus][ball], so that every ball for a
+        # single situation is contiguous
+        self._table = array("d")
+        for species_term in species_terms:
+            for hp_term in hp_terms:
+                for bonus_term in bonus_terms:
+                    term = species_term * hp_term * bonus_term
+                    self._table.extend(
+                        [min(1.0, term * ball_term)
+                         for ball_term in ball_terms])
+
+    @property
+    def species(self):
+        """The Pokedex numbers of the species in this table, in table order."""
+        return self._species
+
+    @property
+    def balls(self):
+        """The Itemdex ids of the balls in this table, in table order."""
+        return self._balls
+
+    @property
+    def hp_fractions(self):
+        """The HP fractions in this table, in table order."""
+        return tuple(step / (self._hp_steps - 1)
+                     for step in range(self._hp_steps))
+
+    def __len__(self):
+        """The number of capture chances in this table."""
+        return len(self._table)
+
+    def _offset(self, number, hp_fraction, status):
+        """Internal method for finding the start of a row of ball chances.
+
+        :return: The offset into the table of the chance for the first ball
+            with the given species, HP fraction and status condition.
+        :rtype: int
+        """
+        if not 0 <= hp_fraction <= 1:
+            raise ValueError(f"Improper value for HP fraction: {hp_fraction}")
+        hp_step = round(hp_fraction * (self._hp_steps - 1))
+        row = self._species_index[number] * self._hp_steps + hp_step
+        row = row * len(self._bonuses) + self._bonus_index[status]
+        return row * len(self._balls)
+
+    def probability(self, number, ball_id, hp_fraction=1.0, status=None):
+        """Look up the chance of catching a pokemon.
+
+        :param number: The Pokedex number of the species.
+        :type number: str
+        :param ball_id: The Itemdex id of the ball used.
+        :type ball_id: str
+        :param hp_fraction: The current HP of the pokemon as a fraction of its
+            max HP. Rounded to the nearest fraction in the table.
+        :type hp_fraction: float, optional
+        :param status: The status condition of the pokemon, or None.
+        :type status: str, optional
+
+        :return: The chance of the pokemon being caught, from 0-1.
+        :rtype: float
+        """
+        offset = self._offset(number, hp_fraction, status)
+        return self._table[offset + self._ball_index[ball_id]]
+
+    def best_ball(self, number, hp_fraction=1.0, status=None, balls=None):
+        """Find the ball with the best chance of catching a pokemon.
+
+        :param number: The Pokedex number of the species.
+        :type number: str
+        :param hp_fraction: The current HP of the pokemon as a fraction of its
+            max HP. Rounded to the nearest fraction in the table.
+        :type hp_fraction: float, optional
+        :param status: The status condition of the pokemon, or None.
+        :type status: str, optional
+        :param balls: The Itemdex ids of the balls to choose from. If None,
+            every ball in the table is considered.
+        :type balls: iterable, optional
+
+        :return: A tuple of the id of the best ball, and its capture chance.
+            When balls are tied, the one listed first is chosen.
+        :rtype: tuple of (str, float)
+        """
+        offset = self._offset(number, hp_fraction, status)
+        if balls is None:
+            candidates = range(len(self._balls))
+        else:
+            candidates = [self._ball_index[ball_id] for ball_id in balls]
+        best = max(candidates, key=lambda index: self._table[offset + index])
+        return self._balls[best], self._table[offset + best]
+
+    def heatmap(self, number, status=None):
+        """Return the capture chances of a species for drawing a heatmap.
+
+        :param number: The Pokedex number of the species.
+        :type number: str
+        :param status: The status condition of the pokemon, or None.
+        :type status: str, optional
+
+        :return: A list with a row for each HP fraction in ``hp_fractions``,
+            each row holding the capture chance for each ball in ``balls``.
+        :rtype: list of list
+        """
+        ball_count = len(self._balls)
+        rows = list()
+        for hp_fraction in self.hp_fractions:
+            offset = self._offset(number, hp_fraction, status)
+            rows.append(self._table[offset:offset + ball_count].tolist())
+        return rows
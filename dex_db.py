@@ -0,0 +1,445 @@
+"""Contains SQLite storage for the Pokedex and Itemdex.
+
+A dex csv can be compiled once into a SQLite database with
+:func:`compile_pokedex` or :func:`compile_itemdex`. Opening the database with
+:class:`SQLitePokedex` or :class:`SQLiteItemdex` gives a dex with the same
+``sort``/``filter``/``results`` API as one loaded from the csv, but entries
+are only read from the database when they are used, and sort orders, numeric
+ranges and most filters are answered by indexed queries rather than by
+checking every entry. Any number of processes can open the same database
+read-only and share its pages through the operating system's page cache,
+instead of each parsing the csv into its own memory.
+
+Entries read from a database are read-only copies: changes to them are not
+saved, and may be lost once the entry leaves the entry cache.
+"""
+from array import array
+from contextlib import closing, nullcontext
+import csv
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+from dex_view import DexView
+import experience
+from itemdex import Itemdex, ItemEntry
+from pokedex import Pokedex, PokeEntry
+
+# entries kept in memory by each open database
+ENTRY_CACHE_SIZE = 1024
+
+_STATS = ("hp", "attack", "defense", "sp_attack", "sp_defense", "speed")
+
+_POKEDEX_SCHEMA = f"""
+    CREATE TABLE entries (
+        position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE,
+        row TEXT NOT NULL, name TEXT, number_int INTEGER, number_tag TEXT,
+        classification TEXT, height REAL, weight REAL, capture_rate INTEGER,
+        egg_cycles INTEGER, exp_yield INTEGER, experience_growth TEXT,
+        growth_order INTEGER, happiness INTEGER, owned TEXT,
+        ability_1 TEXT, ability_2 TEXT, ability_3 TEXT, stats_total INTEGER,
+        {", ".join(f"{stat} INTEGER" for stat in _STATS)}, ev_total INTEGER,
+        {", ".join(f"ev_{stat} INTEGER" for stat in _STATS)});
+    CREATE TABLE entry_lists (
+        field INTEGER, value TEXT, position INTEGER);
+    CREATE INDEX entry_lists_value ON entry_lists (field, value, position);
+    CREATE TABLE learnsets (
+        move TEXT, method TEXT, level TEXT, position INTEGER);
+    CREATE INDEX learnsets_move ON learnsets (move, position);
+"""
+
+_ITEMDEX_SCHEMA = """
+    CREATE TABLE entries (
+        position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE,
+        row TEXT NOT NULL, name TEXT, type TEXT, purchase_price INTEGER,
+        sale_price INTEGER, catch_rate REAL, effect TEXT, flavor_text TEXT);
+"""
+
+
+def _write_database(path, schema, columns, rows, indexed):
+    """Internal function for writing a compiled dex database.
+
+    The database is written beside path and moved into place once complete,
+    so processes with the old database open are never shown a partial one.
+
+    :param columns: The columns of the entries table, in order.
+    :param rows: (entries row, extra statements) of each entry, where extra
+        statements are (sql, parameters) pairs for the other tables.
+    :param indexed: The columns of the entries table to index.
+    """
+    partial = f"{path}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    with closing(sqlite3.connect(partial)) as db:
+        db.executescript(schema)
+        insert = (f"INSERT INTO entries ({', '.join(columns)}) VALUES "
+                  f"({', '.join('?' * len(columns))})")
+        with db:
+            for values, extra in rows:
+                db.execute(insert, values)
+                for sql, parameters in extra:
+                    db.executemany(sql, parameters)
+            for column in indexed:
+                db.execute(f"CREATE INDEX entries_{column} ON entries "
+                           f"({column}, position)")
+        db.execute("ANALYZE")
+    os.replace(partial, path)
+
+
+def _read_rows(dex_file):
+    """Internal function for reading the rows of a dex csv."""
+    try:
+        # assume dex_file is a string, the path to the file
+        fh = open(dex_file, newline="")
+    except TypeError:
+        # dex_file is a file-like object
+        fh = nullcontext(dex_file)
+    with fh as source:
+        return list(csv.DictReader(source))
+
+
+def compile_pokedex(dex_file, path):
+    """Compile a Pokedex csv into a SQLite database.
+
+    :param dex_file: The path to the Pokedex csv, or a file-like object of it.
+    :type dex_file: str or file-like object
+    :param path: The path of the database to write. An existing database is
+        replaced.
+    :type path: str
+    """
+    columns = ("position", "id", "row", "name", "number_int", "number_tag",
+               "classification", "height", "weight", "capture_rate",
+               "egg_cycles", "exp_yield", "experience_growth", "growth_order",
+               "happiness", "owned", "ability_1", "ability_2", "ability_3",
+               "stats_total", *_STATS, "ev_total",
+               *(f"ev_{stat}" for stat in _STATS))
+
+    def rows():
+        for position, row in enumerate(_read_rows(dex_file)):
+            entry = PokeEntry(dict(row))
+            stats = entry["base_stats"]
+            evs = entry["evs"]
+            # missing and blank abilities are stored as NULL
+            abilities = [Pokedex._ability(entry, slot) for slot in range(3)]
+            number_int, number_tag = Pokedex._number_key(entry["number"])
+            values = (
+                position, entry["number"], json.dumps(row),
+                entry["name"]["English"], number_int, number_tag,
+                entry["classification"], entry["height"], entry["weight"],
+                entry["capture_rate"], entry["base_egg_cycles"],
+                entry["exp_yield"], entry["experience_growth"],
+                experience.growth_order(entry["experience_growth"]),
+                entry["base_happiness"], entry["owned"], *abilities,
+                sum(stats.values()), *(stats.get(stat) for stat in _STATS),
+                sum(evs.values()), *(evs.get(stat) for stat in _STATS))
+            lists = [(field, value, position)
+                     for field, name in SQLitePokedex._LIST_FIELDS.items()
+                     for value in entry[name]]
+            learnset = [(move, "level", str(level), position)
+                        for level, moves in entry["move_set_level"].items()
+                        for move in moves]
+            for method in ("machine", "egg", "tutor"):
+                learnset.extend((move, method, None, position)
+                                for move in entry[f"move_set_{method}"])
+            yield values, (
+                ("INSERT INTO entry_lists VALUES (?, ?, ?)", lists),
+                ("INSERT INTO learnsets VALUES (?, ?, ?, ?)", learnset))
+
+    indexed = [column for column in columns if column not in ("id", "row")]
+    _write_database(path, _POKEDEX_SCHEMA, columns, rows(), indexed[1:])
+
+
+def compile_itemdex(dex_file, path):
+    """Compile an Itemdex csv into a SQLite database.
+
+    :param dex_file: The path to the Itemdex csv, or a file-like object of it.
+    :type dex_file: str or file-like object
+    :param path: The path of the database to write. An existing database is
+        replaced.
+    :type path: str
+    """
+    columns = ("position", "id", "row", "name", "type", "purchase_price",
+               "sale_price", "catch_rate", "effect", "flavor_text")
+
+    def rows():
+        for position, row in enumerate(_read_rows(dex_file)):
+            entry = ItemEntry(dict(row))
+            info = entry._dex_info
+            yield (position, info["id"], json.dumps(row), info["name"],
+                   info["type"], info["purchase_price"], info["sale_price"],
+                   info.get("catch_rate"), info["effect"],
+                   info["flavor_text"]), ()
+
+    _write_database(path, _ITEMDEX_SCHEMA, columns, rows(),
+                    ("name", "type", "purchase_price", "sale_price",
+                     "catch_rate"))
+
+
+# ORDER BY columns of each Pokedex sort key, and column and type of each
+# Pokedex filter field, that are answered in SQL
+_POKEDEX_SORT_COLUMNS = {
+    Pokedex.NAME: "name", Pokedex.NUMBER: "number_int, number_tag",
+    Pokedex.CLASSIFICATION: "classification", Pokedex.HEIGHT: "height",
+    Pokedex.WEIGHT: "weight", Pokedex.CAPTURE_RATE: "capture_rate",
+    Pokedex.EGG_CYCLES: "egg_cycles", Pokedex.EXP_YIELD: "exp_yield",
+    Pokedex.EXP_GROWTH_RATE: "growth_order",
+    Pokedex.HAPPINESS: "happiness", Pokedex.OWNED: "owned",
+    # species without the ability sort last in either direction
+    Pokedex.ABILITIES_FIRST: "ability_1 IS NULL, ability_1",
+    Pokedex.ABILITIES_SECOND: "ability_2 IS NULL, ability_2",
+    Pokedex.ABILITIES_HIDDEN: "ability_3 IS NULL, ability_3",
+    Pokedex.STATS_TOTAL: "stats_total", Pokedex.STATS_HP: "hp",
+    Pokedex.STATS_ATK: "attack", Pokedex.STATS_DEF: "defense",
+    Pokedex.STATS_SP_ATK: "sp_attack", Pokedex.STATS_SP_DEF: "sp_defense",
+    Pokedex.STATS_SPD: "speed", Pokedex.EV_TOTAL: "ev_total",
+    Pokedex.EV_HP: "ev_hp", Pokedex.EV_ATK: "ev_attack",
+    Pokedex.EV_DEF: "ev_defense", Pokedex.EV_SP_ATK: "ev_sp_attack",
+    Pokedex.EV_SP_DEF: "ev_sp_defense", Pokedex.EV_SPD: "ev_speed",
+}
+_POKEDEX_FILTER_COLUMNS = {
+    Pokedex.NAME: ("name", str), Pokedex.NUMBER: ("id", str),
+    Pokedex.CLASSIFICATION: ("classification", str),
+    Pokedex.EXP_GROWTH_RATE: ("experience_growth", str),
+    Pokedex.OWNED: ("owned", str),
+    Pokedex.ABILITIES_FIRST: ("ability_1", str),
+    Pokedex.ABILITIES_SECOND: ("ability_2", str),
+    Pokedex.ABILITIES_HIDDEN: ("ability_3", str),
+    **{key: (_POKEDEX_SORT_COLUMNS[key], float) for key in (
+        Pokedex.HEIGHT, Pokedex.WEIGHT, Pokedex.CAPTURE_RATE,
+        Pokedex.EGG_CYCLES, Pokedex.EXP_YIELD, Pokedex.HAPPINESS,
+        *range(Pokedex.STATS_TOTAL, Pokedex.EV_SPD + 1))},
+}
+
+
+class LazyEntryMap:
+    """A mapping of entry ids to entries that are only read on access,
+    standing in for the entry dict of an in-memory dex.
+
+    The dex must provide ``_entry_ids``, a dict ``_entry_positions`` of the
+    position of each entry id, and ``_read_entry``, called with an entry id
+    to read the entry.
+    """
+
+    def __init__(self, dex):
+        self._dex = dex
+
+    def __getitem__(self, entry_id):
+        return self._dex._read_entry(entry_id)
+
+    def __iter__(self):
+        return iter(self._dex._entry_ids)
+
+    def __len__(self):
+        return len(self._dex._entry_ids)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._dex._entry_positions
+
+
+class _SQLiteDex:
+    """Internal base of dexes stored in a SQLite database.
+
+    Subclasses also inherit from the in-memory dex they store, and set
+    _ENTRY_TYPE to its entry class, _SORT_COLUMNS to the ORDER BY columns of
+    each sort key that can be sorted in SQL, and _FILTER_COLUMNS to the
+    column and type (str or float) of each field that can be filtered in SQL.
+    Keys and fields without a column are handled by the in-memory dex.
+    """
+
+    _ENTRY_TYPE = None
+    _SORT_COLUMNS = dict()
+    _FILTER_COLUMNS = dict()
+
+    def __init__(self, path, entry_cache_size=ENTRY_CACHE_SIZE):
+        """Constructor for a dex stored in a SQLite database.
+
+        :param path: The path of a database written by the compile function
+            of the dex.
+        :type path: str
+        :param entry_cache_size: The most entries kept in memory.
+        :type entry_cache_size: int
+        """
+        self._path = path
+        self._entry_cache_size = entry_cache_size
+        # the database is only read, so a connection can be shared between
+        # threads as long as only one of them uses it at a time
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True,
+                                   check_same_thread=False)
+        self._lock = threading.Lock()
+        self._entry_ids = tuple(entry_id for entry_id, in self._query(
+            "SELECT id FROM entries ORDER BY position"))
+        self._entry_positions = {entry_id: position for position, entry_id
+                                 in enumerate(self._entry_ids)}
+        self._dex_dict = LazyEntryMap(self)
+        self._read_entry = functools.lru_cache(entry_cache_size)(
+            self._load_entry)
+        self._sort_orders = dict()
+        self._sort_ranks = dict()
+        self._numeric_indexes = dict()
+        self._view = DexView(self)
+
+    def __reduce__(self):
+        # connections can't be sent to other processes; a copy opens the
+        # database again instead
+        return type(self), (self._path, self._entry_cache_size)
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def _query(self, sql, parameters=()):
+        """Internal method for running a query.
+
+        :return: Every row of the result.
+        :rtype: list of tuples
+        """
+        with self._lock:
+            return self._db.execute(sql, parameters).fetchall()
+
+    def _load_entry(self, entry_id):
+        """Internal method for reading a single entry from the database."""
+        rows = self._query("SELECT row FROM entries WHERE id = ?", (entry_id,))
+        if not rows:
+            raise KeyError(entry_id)
+        return self._ENTRY_TYPE(json.loads(rows[0][0]))
+
+    def _positions(self, sql, parameters=()):
+        """Internal method for an array of the positions a query returns."""
+        return array(DexView.INDEX_TYPE,
+                     (position for position, in self._query(sql, parameters)))
+
+    def _sort_order(self, key, reverse=False):
+        try:
+            return self._sort_orders[key, reverse]
+        except KeyError:
+            pass
+        columns = self._SORT_COLUMNS.get(key)
+        if columns is None:
+            return super()._sort_order(key, reverse)
+        if reverse:
+            # entries with equal values stay in position order, and entries
+            # without a value stay last
+            columns = ", ".join(
+                column if column.endswith(" IS NULL") else f"{column} DESC"
+                for column in columns.split(", "))
+        order = self._positions(
+            f"SELECT position FROM entries ORDER BY {columns}, position")
+        self._sort_orders[key, reverse] = order
+        return order
+
+    def _filter_positions(self, field, criteria):
+        """Internal method for finding the entries matching a filter.
+
+        :return: The positions of the matching entries, or None if the filter
+            can't be answered in SQL.
+        """
+        try:
+            column, value_type = self._FILTER_COLUMNS[field]
+        except (KeyError, TypeError):
+            return None
+        if value_type is str and isinstance(criteria, str):
+            # matches the substring check of an in-memory filter
+            return self._positions(
+                f"SELECT position FROM entries WHERE instr({column}, ?) > 0",
+                (criteria,))
+        if (value_type is float and isinstance(criteria, (int, float))
+                and not isinstance(criteria, bool)):
+            return self._positions(
+                f"SELECT position FROM entries WHERE {column} = ?",
+                (criteria,))
+        return None
+
+
+class SQLitePokedex(_SQLiteDex, Pokedex):
+    """A Pokedex stored in a SQLite database written by
+    :func:`compile_pokedex`."""
+
+    _ENTRY_TYPE = PokeEntry
+    # entry list of each field stored in the entry_lists table
+    _LIST_FIELDS = {Pokedex.TYPE: "type", Pokedex.ABILITIES: "abilities",
+                    Pokedex.EGG_GROUPS: "egg_groups",
+                    Pokedex.EVOLUTION: "evolve_to"}
+    _SORT_COLUMNS = _POKEDEX_SORT_COLUMNS
+    _FILTER_COLUMNS = _POKEDEX_FILTER_COLUMNS
+
+    def __init__(self, path, entry_cache_size=ENTRY_CACHE_SIZE):
+        """Constructor for the SQLitePokedex class.
+
+        :param path: The path of a database written by
+            :func:`compile_pokedex`.
+        :type path: str
+        :param entry_cache_size: The most entries kept in memory.
+        :type entry_cache_size: int
+        """
+        super().__init__(path, entry_cache_size)
+
+    def _filter_positions(self, field, criteria):
+        if field in self._LIST_FIELDS:
+            if not isinstance(criteria, str):
+                return None
+            # lists only match whole values
+            return self._positions(
+                "SELECT DISTINCT position FROM entry_lists WHERE field = ? "
+                "AND value = ?", (field, criteria))
+        return super()._filter_positions(field, criteria)
+
+    def learners(self, move):
+        entries = self._dex_dict
+        return [entries[self._entry_ids[position]]
+                for position in self._positions(
+                    "SELECT DISTINCT position FROM learnsets WHERE move = ? "
+                    "ORDER BY position", (move,))]
+
+
+class SQLiteItemdex(_SQLiteDex, Itemdex):
+    """An Itemdex stored in a SQLite database written by
+    :func:`compile_itemdex`."""
+
+    _ENTRY_TYPE = ItemEntry
+    _SORT_COLUMNS = {
+        Itemdex.NAME: "name", Itemdex.TYPE: "type", Itemdex.ID: "id",
+        Itemdex.EFFECT: "effect", Itemdex.FLAVOR_TEXT: "flavor_text",
+        # items without a value sort last in either direction
+        Itemdex.BUY: "purchase_price IS NULL, purchase_price",
+        Itemdex.SELL: "sale_price IS NULL, sale_price",
+        Itemdex.CATCH_RATE: "catch_rate IS NULL, catch_rate",
+    }
+    _FILTER_COLUMNS = {
+        Itemdex.NAME: ("name", str), Itemdex.TYPE: ("type", str),
+        Itemdex.ID: ("id", str), Itemdex.EFFECT: ("effect", str),
+        Itemdex.FLAVOR_TEXT: ("flavor_text", str),
+        Itemdex.BUY: ("purchase_price", float),
+        Itemdex.SELL: ("sale_price", float),
+        Itemdex.CATCH_RATE: ("catch_rate", float),
+    }
+    _NUMERIC_COLUMNS = {Itemdex.BUY: "purchase_price",
+                        Itemdex.SELL: "sale_price",
+                        Itemdex.CATCH_RATE: "catch_rate"}
+
+    def __init__(self, path, entry_cache_size=ENTRY_CACHE_SIZE):
+        """Constructor for the SQLiteItemdex class.
+
+        :param path: The path of a database written by
+            :func:`compile_itemdex`.
+        :type path: str
+        :param entry_cache_size: The most entries kept in memory.
+        :type entry_cache_size: int
+        """
+        super().__init__(path, entry_cache_size)
+
+    def _numeric_index(self, key):
+        try:
+            return self._numeric_indexes[key]
+        except KeyError:
+            pass
+        if key not in self.NUMERIC_KEYS:
+            raise ValueError(f"Field is not numeric: {key}")
+        column = self._NUMERIC_COLUMNS[key]
+        rows = self._query(f"SELECT {column}, position FROM entries WHERE "
+                           f"{column} IS NOT NULL ORDER BY {column}, position")
+        values = array("d", (value for value, _ in rows))
+        positions = array(DexView.INDEX_TYPE, (index for _, index in rows))
+        self._numeric_indexes[key] = values, positions
+        return values, positions
@@ -1,4 +1,5 @@
 from copy import copy
+import re
 
 class DexEntry:
     """A single entry for an item in a Dex-like collection."""
@@ -10,9 +11,28 @@ class DexEntry:
         :type info: dict
         """
         self._dex_info = info
+        # called with this entry whenever its info is changed
+        self._on_change = None
         # convert data to internal list in subclasses
         # convert data to internal dicts in subclasses
-        
+
+    # a single item of a list/dict string; commas inside quotes do not split
+    _ITEM_PATTERN = re.compile(r'(?:[^,"]|"[^"]*")+')
+
+    @staticmethod
+    def _split_items(string):
+        """Split a list/dict string into its items.
+
+        :param string: The string to split.
+        :type string: str
+
+        :return: The non-empty items of the string, with surrounding
+            whitespace removed.
+        :rtype: list
+        """
+        items = DexEntry._ITEM_PATTERN.findall(string.strip().strip("[]"))
+        return [item.strip() for item in items if not item.isspace()]
+
     @staticmethod
     def _str_to_dict(string, key_type=None, value_type=None):
         """Convert a string to a dictionary.
@@ -29,10 +49,11 @@ class DexEntry:
         :return: The converted dict object.
         :rtype: dict
         """
-        string = string.strip("[]").split(",")
-        temp_list = [item.split(":") for item in string]
         results = dict()
-        for key, value in temp_list:
+        for item in DexEntry._split_items(string):
+            key, _, value = item.partition(":")
+            key = key.strip()
+            value = value.strip().strip('"')
             if key_type:
                 key = key_type(key)
             if value_type:
@@ -53,10 +74,16 @@ class DexEntry:
         :return: The converted list object.
         :rtype: list
         """
+        items = [item.strip('"') for item in DexEntry._split_items(string)]
         if value_type:
-            return [value_type(item) for item in string.strip("[]").split(",")]
+            return [value_type(item) for item in items]
         else:
-            return string.strip("[]").split(",")
+            return items
+
+    def _changed(self):
+        """Notify the owner of this entry that its info has changed."""
+        if self._on_change is not None:
+            self._on_change(self)
 
     def __getitem__(self, key):
         """Return a single property from this DexEntry.
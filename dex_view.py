@@ -0,0 +1,333 @@
+"""Contains classes for independent sorted/filtered views over a Dex-like
+collection.
+
+A dex (such as :class:`pokedex.Pokedex`) holds the entries themselves and is
+shared; a view holds only an array of entry positions into that dex along with
+the sort and filter state that produced it. Any number of views can be created
+against the same dex, and sorting or filtering one view never affects another
+view or the dex itself.
+"""
+from array import array
+import heapq
+from zlib import crc32
+
+
+class DexView:
+    """A lightweight sorted and filtered view over a Dex-like collection."""
+
+    # typecode used for all arrays of entry positions
+    INDEX_TYPE = "L"
+    # views smaller than 1/RANK_SORT_RATIO of the dex are sorted by looking up
+    # the rank of each of their entries rather than walking the whole order
+    RANK_SORT_RATIO = 16
+    # default number of entries in a page of results
+    PAGE_SIZE = 20
+
+    def __init__(self, dex, indices=None, sort_key=None, reverse=False,
+                 filters=()):
+        """Constructor for the DexView class.
+
+        Views are normally created with the ``view()`` method of a dex rather
+        than by calling this constructor directly.
+
+        :param dex: The dex this view is over. The dex must provide the
+            ``_entry_ids``, ``_dex_dict``, ``_sort_orders``, ``_sort_ranks``,
+            ``_search_key``, ``_sort_value``, ``_sort_order`` and
+            ``_sort_rank`` members used by :class:`pokedex.Pokedex`.
+        :param indices: Positions of the entries in this view, in order. None
+            means every entry of the dex, in the order they were loaded.
+        :type indices: class:'array.array', optional
+        :param sort_key: The key this view was last sorted on.
+        :param reverse: Whether ``indices`` is sorted in reverse order.
+        :type reverse: bool, optional
+        :param filters: The (field, criteria) pairs applied to this view.
+        :type filters: tuple, optional
+        """
+        self._dex = dex
+        # index arrays are never modified in place once created, so they can be
+        # shared between views and replaced on the first sort or filter
+        self._indices = indices
+        self._sort_key = sort_key
+        self._reverse = reverse
+        self._filters = tuple(filters)
+
+    @property
+    def sort_key(self):
+        """The key this view was last sorted on, or None if unsorted."""
+        return self._sort_key
+
+    @property
+    def reverse(self):
+        """Whether this view was last sorted in reverse order."""
+        return self._reverse
+
+    @property
+    def filters(self):
+        """A tuple of the (field, criteria) pairs applied to this view."""
+        return self._filters
+
+    def __len__(self):
+        """The number of entries in this view."""
+        if self._indices is None:
+            return len(self._dex._entry_ids)
+        return len(self._indices)
+
+    def __iter__(self):
+        """Iterate over the entries of this view, in order."""
+        entry_ids = self._dex._entry_ids
+        dex_dict = self._dex._dex_dict
+        return (dex_dict[entry_ids[index]] for index in self._positions())
+
+    def _positions(self):
+        """The positions of the entries in this view.
+
+        :return: The positions of the entries in the dex, in view order.
+        :rtype: iterable
+        """
+        if self._indices is None:
+            return range(len(self._dex._entry_ids))
+        return self._indices
+
+    def copy(self):
+        """Return an independent view with the same sorting and filtering.
+
+        The copy shares its position array with this view until either one of
+        them is sorted or filtered.
+
+        :rtype: :class:'dex_view.DexView'
+        """
+        return DexView(self._dex, self._indices, self._sort_key,
+                       self._reverse, self._filters)
+
+    def sort(self, key, reverse=False):
+        """Sort the entries of this view based on the given sort key.
+
+        :param key: Specifies on what criteria to sort the view. Identity
+            values are supplied as constants in the dex class.
+        :param reverse: A boolean value. If set to True, then the
+            elements are sorted in reverse order. Entries that compare equal
+            keep their relative order either way.
+        :type reverse: bool, optional
+        """
+        order = self._dex._sort_order(key, reverse)
+        if self._indices is None:
+            indices = order
+        elif len(self._indices) * self.RANK_SORT_RATIO < len(order):
+            rank = self._dex._sort_rank(key, reverse)
+            indices = array(self.INDEX_TYPE,
+                            sorted(self._indices, key=rank.__getitem__))
+        else:
+            # walk the cached order of the whole dex, keeping only the
+            # entries that are part of this view
+            member = bytearray(len(order))
+            for index in self._indices:
+                member[index] = 1
+            indices = array(self.INDEX_TYPE,
+                            (index for index in order if member[index]))
+        self._indices = indices
+        self._sort_key = key
+        self._reverse = reverse
+
+    def top(self, key, count, reverse=False):
+        """Return the first entries of this view if it were sorted on a key.
+
+        The view itself is not sorted, and only ``count`` entries are ever
+        kept, so this is much cheaper than sorting when ``count`` is small.
+
+        :param key: Specifies on what criteria to rank the entries.
+        :param count: The number of entries to return.
+        :type count: int
+        :param reverse: A boolean value. If set to True, then the entries
+            ranked highest are returned instead, highest first.
+        :type reverse: bool, optional
+
+        :return: Up to ``count`` entries, in sorted order.
+        :rtype: list
+        """
+        entry_ids = self._dex._entry_ids
+        dex_dict = self._dex._dex_dict
+        # ranks are positions within the order, reversed or not, so the
+        # lowest ranks always come first
+        select = heapq.nsmallest
+        if self._indices is None and (key, reverse) in self._dex._sort_orders:
+            # the whole sort order is already known
+            order = self._dex._sort_orders[key, reverse]
+            return [dex_dict[entry_ids[index]] for index in order[:count]]
+        elif (key, reverse) in self._dex._sort_ranks:
+            rank = self._dex._sort_ranks[key, reverse].__getitem__
+        else:
+            sort_value = self._dex._sort_value(key, reverse)
+            if sort_value is None:
+                # key can only be compared pairwise; use the full sort order
+                rank = self._dex._sort_rank(key, reverse).__getitem__
+            else:
+                rank = lambda index: sort_value(dex_dict[entry_ids[index]])
+                if reverse:
+                    select = heapq.nlargest
+        if self._indices is None:
+            indices = range(len(entry_ids))
+        else:
+            indices = self._indices
+        return [dex_dict[entry_ids[index]]
+                for index in select(count, indices, key=rank)]
+
+    def filter(self, field, criteria):
+        """Filter this view based on the given set of rules.
+
+        :param field: The field to check for filtering.
+        :param criteria: The data that is compared against the dex entries
+            for filtering.
+        """
+        entry_ids = self._dex._entry_ids
+        # dexes backed by a database, such as :class:`dex_db.SQLitePokedex`,
+        # can find the matching entries with an indexed query
+        find = getattr(self._dex, "_filter_positions", None)
+        found = None if find is None else find(field, criteria)
+        if found is not None:
+            if self._indices is None:
+                indices = array(self.INDEX_TYPE, sorted(found))
+            else:
+                member = bytearray(len(entry_ids))
+                for index in found:
+                    member[index] = 1
+                indices = array(self.INDEX_TYPE, (index for index
+                                                  in self._indices
+                                                  if member[index]))
+            self._indices = indices
+            self._filters += ((field, criteria),)
+            return
+        extractor = self._dex._search_key(field)
+        dex_dict = self._dex._dex_dict
+
+        def matches(index):
+            value = extractor(dex_dict[entry_ids[index]])
+            try:
+                # check if field is iterable
+                return criteria in value
+            except TypeError:
+                # field is not iterable, assume primative type
+                return criteria == value
+
+        if self._indices is None:
+            indices = range(len(entry_ids))
+        else:
+            indices = self._indices
+        self._indices = array(self.INDEX_TYPE, filter(matches, indices))
+        self._filters += ((field, criteria),)
+
+    def filter_range(self, field, minimum=None, maximum=None):
+        """Filter this view to the entries within a range of numeric values.
+
+        Only supported by dexes with numeric indexes, such as
+        :class:`itemdex.Itemdex`, which find the entries in the range by
+        binary search.
+
+        :param field: The numeric field to check for filtering.
+        :param minimum: The lowest value to keep, or None for no lower bound.
+        :param maximum: The lowest value to filter out, or None for no upper
+            bound.
+        """
+        in_range = self._dex._range_positions(field, minimum, maximum)
+        if self._indices is None:
+            indices = array(self.INDEX_TYPE, sorted(in_range))
+        else:
+            member = bytearray(len(self._dex._entry_ids))
+            for index in in_range:
+                member[index] = 1
+            indices = array(self.INDEX_TYPE,
+                            (index for index in self._indices if member[index]))
+        self._indices = indices
+        self._filters += ((field, slice(minimum, maximum)),)
+
+    def _slice(self, offset, limit):
+        """The positions of a contiguous run of entries in this view.
+
+        :param offset: The index in the view of the first entry.
+        :type offset: int
+        :param limit: The maximum number of entries, or None for all
+            remaining entries.
+        :type limit: int
+
+        :return: The positions of the entries in the dex, in view order.
+        :rtype: iterable
+        """
+        size = len(self)
+        stop = size if limit is None else min(offset + limit, size)
+        if self._indices is None:
+            return range(offset, stop)
+        return self._indices[offset:stop]
+
+    def results(self, offset=0, limit=None):
+        """Return the current state of this view, with sorting and filtering.
+
+        Only the requested entries are looked up, so a small page of a large
+        view is cheap.
+
+        :param offset: The number of entries of the view to skip.
+        :type offset: int, optional
+        :param limit: The maximum number of entries to return. If None, every
+            entry after ``offset`` is returned.
+        :type limit: int, optional
+
+        :return: The entries of this view. Changes to it do not reflect to the
+            view, and vice-versa.
+        :rtype: list
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Offset and limit cannot be negative.")
+        entry_ids = self._dex._entry_ids
+        dex_dict = self._dex._dex_dict
+        return [dex_dict[entry_ids[index]]
+                for index in self._slice(offset, limit)]
+
+    def _state_tag(self):
+        """A checksum of the sort and filter state of this view.
+
+        Views over the same dex with the same state are in the same order, so
+        the tag is the same for all of them.
+
+        :rtype: int
+        """
+        state = (self._sort_key, self._reverse, self._filters)
+        return crc32(repr(state).encode())
+
+    def page(self, cursor=None, limit=PAGE_SIZE):
+        """Return a single page of the results of this view.
+
+        The cursor returned with each page fetches the page after it. A cursor
+        stays valid for any view over the same dex with the same sorting and
+        filtering, so a new view can be created for each request.
+
+        :param cursor: The cursor returned with the previous page, or None
+            for the first page.
+        :type cursor: str, optional
+        :param limit: The maximum number of entries in the page.
+        :type limit: int, optional
+
+        :return: A tuple of the entries in the page, and the cursor for the
+            next page or None if this is the last page.
+        :rtype: tuple of (list, str)
+        """
+        state_tag = self._state_tag()
+        if cursor is None:
+            offset = 0
+        else:
+            try:
+                offset, tag = (int(part, 16) for part in cursor.split("-"))
+            except ValueError:
+                raise ValueError(f"Improper value for cursor: {cursor}")
+            if tag != state_tag:
+                raise ValueError("Cursor is not valid for the current sorting "
+                                 "and filtering.")
+        entries = self.results(offset, limit)
+        offset += len(entries)
+        if offset >= len(self):
+            return entries, None
+        return entries, f"{offset:x}-{state_tag:x}"
+
+    def reset(self):
+        """Reset any sorting and filtering done on this view."""
+        self._indices = None
+        self._sort_key = None
+        self._reverse = False
+        self._filters = ()
@@ -0,0 +1,259 @@
+"""Contains an engine for simulating wild encounters at PokeEarth locations.
+
+The species met at a location are sampled from its encounter table with a
+Walker alias table, which picks a weighted species in constant time however
+many species the table has. An alias table is built once for each location,
+time of day and weather, and reused for every encounter there.
+
+Encounters are simulated in batches: the random state of a batch is drawn as
+a few large blocks of random bytes, and the sampled species and levels are
+handed to :class:`wild.WildGenerator` as whole columns, so no
+:class:`pokemon.Pokemon` is created unless a pokemon of the batch is
+accessed.
+"""
+from array import array
+from collections import Counter
+import random
+
+# random integers drawn for sampling are 32 bits wide
+_WORD_BITS = 32
+_WORD_RANGE = 1 << _WORD_BITS
+
+
+class AliasTable:
+    """A Walker alias table for sampling indexes by weight in constant time.
+
+    The table has a column for each index. Sampling picks a column uniformly,
+    then keeps the column's own index or switches to its alias, by comparing
+    a second random number to the column's threshold.
+    """
+
+    def __init__(self, weights):
+        """Constructor for the AliasTable class.
+
+        :param weights: The relative chance of each index being sampled.
+        :type weights: sequence of float
+
+        :raises ValueError: If there are no weights, or any weight is
+            negative, or every weight is 0.
+        """
+        size = len(weights)
+        total = sum(weights)
+        if not size or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive "
+                             "total.")
+        # chance of each column keeping its own index, scaled so the average
+        # column has a chance of 1
+        scaled = [weight * size / total for weight in weights]
+        self._alias = array("I", range(size))
+        small = [index for index, chance in enumerate(scaled) if chance < 1]
+        large = [index for index, chance in enumerate(scaled) if chance >= 1]
+        # Vose's method: fill each short column from a tall one
+        while small and large:
+            short, tall = small.pop(), large[-1]
+            self._alias[short] = tall
+            scaled[tall] -= 1 - scaled[short]
+            if scaled[tall] < 1:
+                small.append(large.pop())
+        # columns left over are full, up to rounding error
+        for index in small + large:
+            scaled[index] = 1
+        # chances as thresholds for random 32-bit integers
+        self._thresholds = array("Q", [min(round(chance * _WORD_RANGE),
+                                           _WORD_RANGE)
+                                       for chance in scaled])
+
+    def __len__(self):
+        """The number of indexes the table samples from."""
+        return len(self._alias)
+
+    def sample(self, rng):
+        """Sample a single index.
+
+        :param rng: The random generator to sample with.
+        :type rng: :class:'random.Random'
+
+        :rtype: int
+        """
+        column = rng.randrange(len(self._alias))
+        if rng.getrandbits(_WORD_BITS) < self._thresholds[column]:
+            return column
+        return self._alias[column]
+
+    def sample_many(self, rng, count):
+        """Sample many indexes at once.
+
+        :param rng: The random generator to sample with.
+        :type rng: :class:'random.Random'
+        :param count: The number of indexes to sample.
+        :type count: int
+
+        :rtype: :class:'array.array'
+        """
+        columns = _random_words(rng, count)
+        coins = _random_words(rng, count)
+        size = len(self._alias)
+        thresholds = self._thresholds
+        alias = self._alias
+        # the top bits of a 32-bit integer scaled to the number of columns
+        # pick a column without modulo bias beyond 1 in 2**32
+        samples = array("I")
+        samples.extend(
+            column if coin < thresholds[column] else alias[column]
+            for column, coin in zip(((word * size) >> _WORD_BITS
+                                     for word in columns), coins))
+        return samples
+
+
+def _random_words(rng, count):
+    """Internal function for drawing an array of random 32-bit integers."""
+    words = array("I")
+    words.frombytes(rng.randbytes(words.itemsize * count))
+    return words
+
+
+class EncounterTable:
+    """The encounters possible at a location at one time of day and weather,
+    ready for sampling."""
+
+    def __init__(self, encounters):
+        """Constructor for the EncounterTable class.
+
+        :param encounters: The encounters of the table.
+        :type encounters: sequence of :class:'pokeearth.Encounter'
+
+        :raises ValueError: If there are no encounters.
+        """
+        if not encounters:
+            raise ValueError("An encounter table needs at least 1 encounter.")
+        self.encounters = tuple(encounters)
+        self._alias = AliasTable([encounter.weight
+                                  for encounter in self.encounters])
+
+    def __len__(self):
+        return len(self.encounters)
+
+    def sample(self, rng, count):
+        """Sample the encounters of many wild pokemon.
+
+        :return: The index in :attr:`encounters` of each encounter.
+        :rtype: :class:'array.array'
+        """
+        return self._alias.sample_many(rng, count)
+
+    def levels(self, rng, samples):
+        """Draw a level for each sampled encounter, uniformly between the
+        encounter's lowest and highest level.
+
+        :param samples: Indexes in :attr:`encounters`, as returned by
+            :meth:`sample`.
+
+        :rtype: :class:'array.array'
+        """
+        spans = [(encounter.min_level,
+                  encounter.max_level - encounter.min_level + 1)
+                 for encounter in self.encounters]
+        levels = array("B")
+        levels.extend(low + ((word * span) >> _WORD_BITS)
+                      for (low, span), word in
+                      zip((spans[index] for index in samples),
+                          _random_words(rng, len(samples))))
+        return levels
+
+
+class EncounterEngine:
+    """A seeded simulator of wild encounters across PokeEarth."""
+
+    def __init__(self, earth, generator, seed=None):
+        """Constructor for the EncounterEngine class.
+
+        :param earth: The world whose encounter tables are used.
+        :type earth: :class:'pokeearth.PokeEarth'
+        :param generator: The generator of the encountered pokemon. Its
+            Pokedex must have every species of the encounter tables.
+        :type generator: :class:'wild.WildGenerator'
+        :param seed: The seed for the random generator of the species and
+            levels encountered. If None, the generator is seeded from the
+            operating system.
+        :type seed: int, optional
+        """
+        self._earth = earth
+        self._generator = generator
+        self._rng = random.Random(seed)
+        # encounter tables, keyed by (location code, time, weather)
+        self._tables = dict()
+
+    def table(self, code, time=None, weather=None):
+        """The encounter table of a location at a time of day and weather.
+
+        Tables are built on first use and kept; call :meth:`clear` after
+        changing the encounters of the world.
+
+        :param code: The location code.
+        :type code: str
+        :param time: The time of day. If None, only encounters not limited to
+            a time of day are possible.
+        :type time: str, optional
+        :param weather: The weather. If None, only encounters not limited to
+            a weather are possible.
+        :type weather: str, optional
+
+        :raises ValueError: If nothing can be encountered at the location at
+            that time and weather.
+
+        :rtype: :class:'encounters.EncounterTable'
+        """
+        key = (code, time, weather)
+        try:
+            return self._tables[key]
+        except KeyError:
+            pass
+        possible = [encounter for encounter in self._earth.encounters(code)
+                    if encounter.time in (None, time)
+                    and encounter.weather in (None, weather)]
+        if not possible:
+            raise ValueError(f"Nothing can be encountered at {code} "
+                             f"(time: {time}, weather: {weather}).")
+        table = self._tables[key] = EncounterTable(possible)
+        return table
+
+    def clear(self):
+        """Drop every built encounter table."""
+        self._tables.clear()
+
+    def encounter(self, code, count, time=None, weather=None):
+        """Simulate encounters with wild pokemon at a location.
+
+        :param code: The location code.
+        :type code: str
+        :param count: The number of encounters.
+        :type count: int
+        :param time: The time of day. See :meth:`table`.
+        :type time: str, optional
+        :param weather: The weather. See :meth:`table`.
+        :type weather: str, optional
+
+        :return: The encountered pokemon.
+        :rtype: :class:'wild.WildPopulation'
+        """
+        table = self.table(code, time, weather)
+        samples = table.sample(self._rng, count)
+        numbers = [encounter.number for encounter in table.encounters]
+        return self._generator.generate(
+            [numbers[index] for index in samples],
+            table.levels(self._rng, samples), count)
+
+    def species_counts(self, code, count, time=None, weather=None):
+        """Count the species met over many encounters at a location, without
+        generating the pokemon.
+
+        :return: The number of encounters with each species, keyed by
+            Pokedex number.
+        :rtype: :class:'collections.Counter'
+        """
+        table = self.table(code, time, weather)
+        counts = Counter(table.sample(self._rng, count))
+        species = Counter()
+        for index, times in counts.items():
+            species[table.encounters[index].number] += times
+        return species
@@ -0,0 +1,125 @@
+"""Contains classes for publishing battle events to listeners.
+
+Battle state changes, such as a pokemon taking damage or being inflicted with
+a status condition, are published to an :class:`EventBus` as :class:`Event`
+objects. Publishers check the truth value of a bus before building an event, so
+when a bus has no listeners, or a pokemon has no bus at all, publishing costs
+a single attribute check.
+"""
+from collections import namedtuple
+
+# Event kinds
+DAMAGE = "damage"
+HEAL = "heal"
+FAINT = "faint"
+REVIVE = "revive"
+STATUS = "status"
+STATUS_CURED = "status_cured"
+HIDDEN_STATUS = "hidden_status"
+HIDDEN_STATUS_CURED = "hidden_status_cured"
+POKERUS = "pokerus"
+MOVE = "move"
+WEATHER = "weather"
+TURN = "turn"
+BATTLE_END = "battle_end"
+
+Event = namedtuple("Event", ["kind", "source", "data"])
+Event.__doc__ = """A single battle event.
+
+kind   -- the kind of event, one of the event kind constants
+source -- the object the event happened to, usually a pokemon
+data   -- a dict of further details, dependent on the kind of event
+"""
+
+
+class EventBus:
+    """A registry of listeners for battle events."""
+
+    def __init__(self):
+        """Constructor for an EventBus with no listeners."""
+        # listeners keyed by event kind; None holds listeners for every kind
+        self._listeners = dict()
+
+    def __bool__(self):
+        """True if any listener is subscribed; otherwise false."""
+        return bool(self._listeners)
+
+    def subscribe(self, listener, kind=None):
+        """Subscribe a listener to events.
+
+        :param listener: A single argument function called with each
+            :class:`events.Event`.
+        :param kind: The kind of event to listen for. If None, the listener is
+            called for every event.
+        :type kind: str, optional
+        """
+        self._listeners.setdefault(kind, []).append(listener)
+
+    def unsubscribe(self, listener, kind=None):
+        """Unsubscribe a listener, given the same arguments it subscribed with.
+        """
+        listeners = self._listeners[kind]
+        listeners.remove(listener)
+        if not listeners:
+            del self._listeners[kind]
+
+    def emit(self, kind, source, **data):
+        """Publish an event to every listener subscribed to it.
+
+        :param kind: The kind of event.
+        :type kind: str
+        :param source: The object the event happened to.
+        :param data: Further details of the event.
+        """
+        event = Event(kind, source, data)
+        for listener in self._listeners.get(kind, ()):
+            listener(event)
+        for listener in self._listeners.get(None, ()):
+            listener(event)
+
+
+def describe(event):
+    """Return a human readable description of an event.
+
+    :param event: The event to describe.
+    :type event: :class:'events.Event'
+
+    :rtype: str
+    """
+    name = getattr(event.source, "name", event.source)
+    data = event.data
+    if event.kind == DAMAGE:
+        return (f"{name} has taken {data['amount']} points of damage. "
+                f"Current HP is {data['cur_HP']}")
+    elif event.kind == HEAL:
+        return (f"{name} has been restored {data['amount']} points of health. "
+                f"Current HP is {data['cur_HP']}")
+    elif event.kind == FAINT:
+        return f"{name} has fainted."
+    elif event.kind == REVIVE:
+        return f"{name} has been revived."
+    elif event.kind in (STATUS, HIDDEN_STATUS):
+        return f"{name} is now affected by {data['status']}."
+    elif event.kind in (STATUS_CURED, HIDDEN_STATUS_CURED):
+        return f"{name} is no longer affected by {data['status']}."
+    elif event.kind == POKERUS:
+        return f"{name} has been infected with pokerus."
+    elif event.kind == MOVE:
+        return f"{name} used {data['move']}."
+    elif event.kind == WEATHER:
+        return f"The weather is now {data['weather']}."
+    elif event.kind == TURN:
+        return f"Turn {data['turn']}."
+    elif event.kind == BATTLE_END:
+        if data["winner"] is None:
+            return "The battle is over. It is a draw."
+        return f"The battle is over. Winner: side {data['winner']}."
+    return f"{event.kind}: {name} {data}"
+
+
+def print_listener(event):
+    """A listener that prints a description of every event it is called with.
+
+    Subscribe this to a bus to show battle messages on the console.
+    """
+    print(describe(event))
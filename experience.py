@@ -0,0 +1,195 @@
+"""Contains functions relating to experience points and levelling.
+
+Every pokemon species belongs to one of six experience growth groups, which
+determine the total experience a pokemon needs to reach each level. The totals
+for every level of every group are computed once, at import, and held in
+compact arrays; converting between experience and levels is a binary search
+over these arrays.
+"""
+from array import array
+from bisect import bisect_right
+
+MIN_LEVEL = 1
+MAX_LEVEL = 100
+
+# growth groups, from the least to the most experience needed at level 100
+GROWTH_RATES = ("Erratic", "Fast", "Medium Fast", "Medium Slow", "Slow",
+                "Fluctuating")
+
+
+def _erratic(n):
+    if n < 50:
+        return n ** 3 * (100 - n) // 50
+    elif n < 68:
+        return n ** 3 * (150 - n) // 100
+    elif n < 98:
+        return n ** 3 * ((1911 - 10 * n) // 3) // 500
+    return n ** 3 * (160 - n) // 100
+
+
+def _fluctuating(n):
+    if n < 15:
+        return n ** 3 * ((n + 1) // 3 + 24) // 50
+    elif n < 36:
+        return n ** 3 * (n + 14) // 50
+    return n ** 3 * (n // 2 + 32) // 50
+
+
+# total experience needed to reach level n, for each growth group
+_FORMULAS = {
+    "Erratic": _erratic,
+    "Fast": lambda n: 4 * n ** 3 // 5,
+    "Medium Fast": lambda n: n ** 3,
+    "Medium Slow": lambda n: 6 * n ** 3 // 5 - 15 * n ** 2 + 100 * n - 140,
+    "Slow": lambda n: 5 * n ** 3 // 4,
+    "Fluctuating": _fluctuating,
+}
+
+# total experience needed for each level, indexed by level - 1. Every group
+# starts at 0 experience for level 1.
+EXP_TABLES = {
+    growth_rate: array("L", [0] + [formula(level) for level in
+                                   range(MIN_LEVEL + 1, MAX_LEVEL + 1)])
+    for growth_rate, formula in _FORMULAS.items()
+}
+
+
+def _table(growth_rate):
+    try:
+        return EXP_TABLES[growth_rate]
+    except KeyError:
+        raise ValueError(f"{growth_rate} is not a valid growth rate.") from None
+
+
+def growth_order(growth_rate):
+    """Return a sort key for a growth rate.
+
+    Growth rates are ordered by the experience needed to reach level 100,
+    rather than alphabetically.
+
+    :param growth_rate: The name of the growth rate, e.g. "Medium Slow".
+    :type growth_rate: str
+
+    :rtype: int
+    """
+    return _table(growth_rate)[-1]
+
+
+def exp_for_level(growth_rate, level):
+    """Return the total experience needed to reach a level.
+
+    :param growth_rate: The name of the growth rate, e.g. "Medium Slow".
+    :type growth_rate: str
+    :param level: The level, between 1 and 100.
+    :type level: int
+
+    :rtype: int
+    """
+    if level > MAX_LEVEL or level < MIN_LEVEL:
+        raise ValueError("Pokemon's level must be between 1 and 100.")
+    return _table(growth_rate)[level - 1]
+
+
+def level_for_exp(growth_rate, exp):
+    """Return the level reached with a total amount of experience.
+
+    :param growth_rate: The name of the growth rate, e.g. "Medium Slow".
+    :type growth_rate: str
+    :param exp: The total experience, at least 0.
+    :type exp: int
+
+    :rtype: int
+    """
+    if exp < 0:
+        raise ValueError(f"Improper value for experience: {exp}")
+    return bisect_right(_table(growth_rate), exp)
+
+
+def levels_for_exp(growth_rate, exps):
+    """Return the levels reached with each of many totals of experience.
+
+    :param growth_rate: The name of the growth rate, e.g. "Medium Slow".
+    :type growth_rate: str
+    :param exps: The total experience of each pokemon.
+    :type exps: iterable of int
+
+    :return: The level of each pokemon, in the same order.
+    :rtype: class:'array.array'
+    """
+    table = _table(growth_rate)
+    return array("B", [bisect_right(table, exp) for exp in exps])
+
+
+def gain_exp(growth_rate, exps, gains):
+    """Add experience to many pokemon of the same growth rate at once.
+
+    Experience is capped at the amount needed for level 100.
+
+    :param growth_rate: The name of the growth rate, e.g. "Medium Slow".
+    :type growth_rate: str
+    :param exps: The total experience of each pokemon.
+    :type exps: iterable of int
+    :param gains: The experience gained by each pokemon, or a single amount
+        gained by every pokemon.
+    :type gains: iterable of int or int
+
+    :return: A tuple of the new total experience of each pokemon, and the new
+        level of each pokemon.
+    :rtype: tuple of (class:'array.array', class:'array.array')
+    """
+    table = _table(growth_rate)
+    cap = table[-1]
+    if isinstance(gains, int):
+        new_exps = array("L", [min(exp + gains, cap) for exp in exps])
+    else:
+        new_exps = array("L", [min(exp + gain, cap)
+                               for exp, gain in zip(exps, gains)])
+    levels = array("B", [bisect_right(table, exp) for exp in new_exps])
+    return new_exps, levels
+
+
+def exp_yield(entry, level):
+    """Return the experience gained by defeating a pokemon.
+
+    :param entry: The Pokedex entry of the defeated pokemon's species.
+    :type entry: :class:'pokedex.PokeEntry'
+    :param level: The level of the defeated pokemon.
+    :type level: int
+
+    :rtype: int
+    """
+    return entry["exp_yield"] * level // 7
+
+
+def award(pokemon, entry, level):
+    """Award experience and effort values to pokemon for a defeated pokemon.
+
+    Pokemon are grouped by growth rate so that each group gains experience in
+    a single batch.
+
+    :param pokemon: The pokemon gaining experience.
+    :type pokemon: iterable of :class:'pokemon.Pokemon'
+    :param entry: The Pokedex entry of the defeated pokemon's species.
+    :type entry: :class:'pokedex.PokeEntry'
+    :param level: The level of the defeated pokemon.
+    :type level: int
+
+    :return: The number of levels gained by each pokemon, in the same order.
+    :rtype: list of int
+    """
+    pokemon = list(pokemon)
+    gain = exp_yield(entry, level)
+    evs = entry["evs"]
+    groups = dict()
+    for index, mon in enumerate(pokemon):
+        groups.setdefault(mon.growth_rate, []).append(index)
+    levels_gained = [0] * len(pokemon)
+    for growth_rate, indices in groups.items():
+        new_exps, levels = gain_exp(
+            growth_rate, [pokemon[index].exp for index in indices], gain)
+        for index, exp, new_level in zip(indices, new_exps, levels):
+            mon = pokemon[index]
+            levels_gained[index] = new_level - mon.level
+            mon._set_exp(exp, new_level)
+            mon.gain_evs(evs)
+    return levels_gained
@@ -1,5 +1,8 @@
 import tkinter as tk
 
+from gui_worker import TkExecutor
+from sprites import SpriteCache
+
 ## MAIN APP FEATURES ##
 # Pokedex
 # Custom Pokemon teams
@@ -10,19 +13,171 @@ import tkinter as tk
 # IV Calculator
 # Pokemon news feed
 
-def main():
+# open feature windows, keyed by title. Each window is only built the first
+# time its feature is opened
+_windows = dict()
+# memory the cached sprite images may use, in bytes
+SPRITE_BYTES = 8 * 1024 * 1024
+
+
+class VirtualList(tk.Frame):
+    """A scrollable list that only creates widgets for its visible rows.
+
+    Rows are not stored in the list; the text of a row is asked for when the
+    row scrolls into view. A list of any length creates only as many labels
+    as fit in its height.
+    """
+
+    # height of each row, in pixels
+    ROW_HEIGHT = 20
+
+    def __init__(self, master, on_select=None, on_view=None, **kwargs):
+        """Constructor for the VirtualList class.
+
+        :param master: The parent widget.
+        :param on_select: Called with the index of a row when it is clicked.
+        :type on_select: callable, optional
+        :param on_view: Called with the index of the first visible row and
+            the number of visible rows whenever they change.
+        :type on_view: callable, optional
+        """
+        super().__init__(master, **kwargs)
+        self._count = 0
+        self._get_row = None
+        self._get_image = None
+        self._on_select = on_select
+        self._on_view = on_view
+        self._viewed = None
+        # index of the row shown at the top
+        self._first = 0
+        self._labels = list()
+        self._frm_rows = tk.Frame(master=self)
+        self._scrollbar = tk.Scrollbar(master=self, command=self._scroll)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._frm_rows.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._frm_rows.bind("<Configure>", self._resize)
+        self._bindWheel(self._frm_rows)
+
+    def set_rows(self, count, get_row, get_image=None):
+        """Show a new set of rows, scrolled to the top.
+
+        :param count: The number of rows.
+        :type count: int
+        :param get_row: Called with the index of a row; returns its text.
+        :type get_row: callable
+        :param get_image: Called with the index of a row; returns the image
+            shown next to its text, or None.
+        :type get_image: callable, optional
+        """
+        self._count = count
+        self._get_row = get_row
+        self._get_image = get_image
+        self._first = 0
+        self._viewed = None
+        self._refresh()
+
+    def refresh(self):
+        """Show the visible rows again, such as once their images load."""
+        self._refresh()
+
+    def _bindWheel(self, widget):
+        widget.bind("<MouseWheel>", self._wheel)
+        widget.bind("<Button-4>", lambda event: self._scroll("scroll", -1,
+                                                             "units"))
+        widget.bind("<Button-5>", lambda event: self._scroll("scroll", 1,
+                                                             "units"))
+
+    def _resize(self, event):
+        """Create or destroy labels to fill the height of the list."""
+        visible = max(event.height // self.ROW_HEIGHT, 1)
+        while len(self._labels) < visible:
+            position = len(self._labels)
+            lbl_row = tk.Label(master=self._frm_rows, anchor=tk.W,
+                               compound=tk.LEFT)
+            lbl_row.place(x=0, y=position * self.ROW_HEIGHT, relwidth=1,
+                          height=self.ROW_HEIGHT)
+            lbl_row.bind("<Button-1>",
+                         lambda event, position=position:
+                         self._select(position))
+            self._bindWheel(lbl_row)
+            self._labels.append(lbl_row)
+        while len(self._labels) > visible:
+            self._labels.pop().destroy()
+        self._refresh()
+
+    def _wheel(self, event):
+        self._scroll("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def _scroll(self, action, amount, unit=None):
+        """Scrollbar command; moves the first visible row."""
+        visible = len(self._labels)
+        if action == "moveto":
+            first = int(float(amount) * self._count)
+        elif unit == "pages":
+            first = self._first + int(amount) * visible
+        else:
+            first = self._first + int(amount)
+        self._first = max(min(first, self._count - visible), 0)
+        self._refresh()
+
+    def _select(self, position):
+        index = self._first + position
+        if self._on_select is not None and index < self._count:
+            self._on_select(index)
+
+    def _refresh(self):
+        """Show the text of the visible rows."""
+        for position, lbl_row in enumerate(self._labels):
+            index = self._first + position
+            lbl_row["text"] = (self._get_row(index) if index < self._count
+                               else "")
+            image = None
+            if self._get_image is not None and index < self._count:
+                image = self._get_image(index)
+            lbl_row["image"] = "" if image is None else image
+        if self._count:
+            self._scrollbar.set(self._first / self._count,
+                                min((self._first + len(self._labels))
+                                    / self._count, 1))
+        else:
+            self._scrollbar.set(0, 1)
+        view = (self._first, len(self._labels))
+        if self._on_view is not None and view != self._viewed:
+            self._viewed = view
+            self._on_view(*view)
+
+
+def main(subsystems=None):
+    """Show the main window and run the Tk main loop.
+
+    :param subsystems: The lazily loaded subsystems of the app, keyed by
+        name. If None, the subsystems of the subsystems module are used.
+    :type subsystems: dict of :class:'subsystems.Subsystem'
+    """
+    if subsystems is None:
+        from subsystems import SUBSYSTEMS as subsystems
     window = tk.Tk()
     window.columnconfigure([0, 1], weight=1, minsize=75)
     window.rowconfigure([0, 1, 2, 3], weight=1, minsize=50)
-    buildMenu(window)
-    
+    # dex loading and queries run on worker threads, so the window never
+    # waits on them
+    executor = TkExecutor(window)
+    # sprites are loaded on first use, not at startup
+    subsystems = dict(subsystems,
+                      sprites=SpriteCache(executor, max_bytes=SPRITE_BYTES))
+    buildMenu(window, subsystems, executor)
+
     window.mainloop()
+    executor.shutdown()
 
-def buildMenu(window):
-    print("Building widgets")
+def buildMenu(window, subsystems, executor):
     frm_menu = tk.Frame(master=window)
-    btn_pokedex = tk.Button(master=frm_menu, text="Pokedex")
-    btn_items = tk.Button(master=frm_menu, text="Itemdex")
+    btn_pokedex = tk.Button(master=frm_menu, text="Pokedex",
+        command=lambda: openWindow(window, "Pokedex", buildPokedex,
+                                   subsystems, executor))
+    btn_items = tk.Button(master=frm_menu, text="Itemdex",
+        command=lambda: openWindow(window, "Itemdex", buildItemdex,
+                                   subsystems, executor))
     btn_teams = tk.Button(master=frm_menu, text="Pokemon Teams")
     btn_sim = tk.Button(master=frm_menu, text="Battle Simulator")
     btn_network = tk.Button(master=frm_menu, text="Network")
@@ -30,7 +185,6 @@ def buildMenu(window):
     btn_news = tk.Button(master=frm_menu, text="Pokemon News Feed")
     btn_iv = tk.Button(master=frm_menu, text="Iv Calculator")
 
-    print("Pakcing widgets")
     frm_menu.pack()
     btn_pokedex.grid(row=0, column=0)
     btn_items.grid(row=0, column=1)
@@ -41,5 +195,112 @@ def buildMenu(window):
     btn_news.grid(row=3, column=0)
     btn_iv.grid(row=3, column=1)
 
+def openWindow(window, title, build, subsystems, executor):
+    """Show the window of a feature, building it if it is not open."""
+    top = _windows.get(title)
+    if top is not None and top.winfo_exists():
+        top.lift()
+        return
+    top = tk.Toplevel(master=window)
+    top.title(title)
+    _windows[title] = top
+    build(top, subsystems, executor)
+
+def buildSearchList(top, executor, query, noun, get_image=None,
+                    on_view=None):
+    """Build a search box over a virtual list of query results.
+
+    query is called on a worker thread with the search text, and returns the
+    text of every matching row. Each key press replaces the running query, so
+    only the results for the latest text are shown.
+
+    get_image and on_view are called with the rows of the latest results
+    followed by the arguments of the virtual list callbacks of the same name.
+
+    :return: The virtual list.
+    :rtype: :class:'gui.VirtualList'
+    """
+    ent_search = tk.Entry(master=top)
+    lbl_status = tk.Label(master=top, text="Loading...", anchor=tk.W)
+    shown = [[]]
+    lst_entries = VirtualList(
+        master=top, on_view=None if on_view is None
+        else lambda first, visible: on_view(shown[0], first, visible))
+    ent_search.pack(fill=tk.X)
+    lbl_status.pack(fill=tk.X)
+    lst_entries.pack(fill=tk.BOTH, expand=True)
+
+    def show(rows):
+        shown[0] = rows
+        lst_entries.set_rows(len(rows), lambda index: str(rows[index]),
+                             None if get_image is None
+                             else lambda index: get_image(rows, index))
+        lbl_status["text"] = f"{len(rows)} {noun}"
+
+    def showError(error):
+        lbl_status["text"] = f"Error: {error}"
+
+    def search(event=None):
+        if not ent_search.winfo_exists():
+            return
+        executor.submit(query, ent_search.get(), callback=show,
+                        errback=showError, key=(noun, "search"))
+
+    ent_search.bind("<KeyRelease>", search)
+    search()
+    return lst_entries
+
+class PokedexRow(str):
+    """The text of a row of the Pokedex list, with the national id of its
+    pokemon."""
+
+    def __new__(cls, natl_id, name):
+        row = super().__new__(cls, f"{natl_id} {name}")
+        row.natl_id = natl_id
+        return row
+
+def buildPokedex(top, subsystems, executor):
+    sprites = subsystems["sprites"]
+    lst_entries = None
+
+    def getImage(rows, index):
+        return sprites.request(rows[index].natl_id,
+                               callback=lambda image: lst_entries.refresh())
+
+    def prefetch(rows, first, visible):
+        # load the sprites a page above and below the visible rows, so they
+        # are ready by the time they scroll into view
+        start = max(first - visible, 0)
+        sprites.prefetch(row.natl_id
+                         for row in rows[start:first + 2 * visible])
+
+    lst_entries = buildSearchList(
+        top, executor,
+        lambda text: queryDex(subsystems["pokedex"], text,
+                              lambda entry: PokedexRow(
+                                  entry["number"], entry["name"]["English"])),
+        "pokemon", get_image=getImage, on_view=prefetch)
+
+def buildItemdex(top, subsystems, executor):
+    buildSearchList(top, executor,
+                    lambda text: queryDex(subsystems["itemdex"], text,
+                                          lambda entry: entry["name"]),
+                    "items")
+
+def queryDex(subsystem, text, row_text):
+    """Find the entries of a dex with the search text in their names.
+
+    Runs on a worker thread: loads the dex if needed, and filters a view of
+    it, leaving the dex's own default view untouched.
+
+    :return: The row text of each matching entry.
+    :rtype: list of str
+    """
+    dex = subsystem.get()
+    view = dex.view()
+    if text:
+        view.filter(dex.NAME, text)
+    return [row_text(entry) for entry in view.results()]
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,127 @@
+"""Contains an executor for running GUI work off the Tk main loop.
+
+Tk widgets may only be used from the thread running the Tk main loop. A
+:class:`TkExecutor` runs slow work, such as loading or querying a dex, in
+worker threads, and calls the callback of each task back on the Tk thread
+with the result. Worker threads never call into Tk: finished tasks are put on
+a queue that the Tk thread polls with ``after()``.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import queue
+
+
+class TkExecutor:
+    """Runs functions in worker threads and delivers results to Tk."""
+
+    # milliseconds between checks for finished tasks
+    POLL_INTERVAL = 25
+
+    def __init__(self, root, max_workers=2):
+        """Constructor for the TkExecutor class.
+
+        :param root: Any widget of the Tk application the callbacks are run
+            on.
+        :type root: :class:'tkinter.Misc'
+        :param max_workers: The number of worker threads.
+        :type max_workers: int
+        """
+        self._root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="gui-worker")
+        self._done = queue.SimpleQueue()
+        # latest task submitted under each key, and its future
+        self._latest = dict()
+        self._futures = dict()
+        self._generation = 0
+        # tasks submitted whose results have not been delivered or dropped
+        self._pending = 0
+        self._polling = None
+        self._closed = False
+
+    def submit(self, function, *args, callback=None, errback=None, key=None):
+        """Run a function in a worker thread.
+
+        :param function: The function to run. It must not use any widgets.
+        :param args: The arguments to call the function with.
+        :param callback: Called on the Tk thread with the result of the
+            function.
+        :type callback: callable, optional
+        :param errback: Called on the Tk thread with the exception if the
+            function raises one.
+        :type errback: callable, optional
+        :param key: Tasks submitted with the same key replace each other:
+            submitting a task cancels the earlier task with that key, and an
+            earlier task that already started has its callback skipped. Use a
+            key for queries where only the latest result matters, such as a
+            search box the user is typing into.
+        :type key: hashable, optional
+
+        :return: The id of the task.
+        :rtype: int
+        """
+        if self._closed:
+            raise RuntimeError("The executor is shut down.")
+        self._generation += 1
+        task_id = self._generation
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = task_id
+
+        def run():
+            try:
+                result = (True, function(*args))
+            except Exception as error:
+                result = (False, error)
+            self._done.put((task_id, key, callback, errback, result))
+
+        future = self._pool.submit(run)
+        self._pending += 1
+        if key is not None:
+            self._futures[key] = future
+        if self._polling is None:
+            self._polling = self._root.after(self.POLL_INTERVAL, self._poll)
+        return task_id
+
+    def cancel(self, key):
+        """Cancel the latest task submitted with a key.
+
+        A task that has not started is never run; a task that has started
+        runs to the end, but its callback is skipped.
+        """
+        future = self._futures.pop(key, None)
+        if future is not None and future.cancel():
+            # a cancelled task never reaches the queue of finished tasks
+            self._pending -= 1
+        self._latest.pop(key, None)
+
+    def _poll(self):
+        """Internal method run on the Tk thread to deliver finished tasks."""
+        self._polling = None
+        while True:
+            try:
+                task_id, key, callback, errback, (ok, value) = \
+                    self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if key is not None:
+                if self._latest.get(key) != task_id:
+                    # a newer task with the same key replaced this one
+                    continue
+                del self._latest[key]
+                self._futures.pop(key, None)
+            if ok and callback is not None:
+                callback(value)
+            elif not ok and errback is not None:
+                errback(value)
+        if not self._closed and self._pending:
+            self._polling = self._root.after(self.POLL_INTERVAL, self._poll)
+
+    def shutdown(self):
+        """Stop the executor. Tasks not yet started are cancelled and no
+        further callbacks are run."""
+        self._closed = True
+        if self._polling is not None:
+            self._root.after_cancel(self._polling)
+            self._polling = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
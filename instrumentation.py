@@ -0,0 +1,221 @@
+"""Contains an opt-in registry of timing and counting metrics.
+
+Metrics are kept in a :class:`Registry`. :func:`enable` wraps each of the hot
+paths listed in HOT_PATHS so every call is counted and timed into a histogram
+of the registry; :func:`disable` puts the original functions back. While
+disabled, the hot paths are the original functions, so instrumentation costs
+nothing unless it is turned on.
+
+Metrics can be read with :meth:`Registry.snapshot`, or dumped in the
+Prometheus text format with :func:`prometheus_text`.
+"""
+from bisect import bisect_left
+import functools
+import importlib
+import time
+
+# upper bounds of the default histogram buckets, in seconds
+DEFAULT_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+# (module, class or None for a module function, attribute, metric name) of
+# each hot path timed while instrumentation is enabled
+HOT_PATHS = (
+    ("pokedex", "Pokedex", "_parse_info", "pokedex_parse_info_seconds"),
+    ("pokedex", "Pokedex", "sort", "pokedex_sort_seconds"),
+    ("pokedex", "Pokedex", "filter", "pokedex_filter_seconds"),
+    ("dex_entry", "DexEntry", "__getitem__", "dex_entry_getitem_seconds"),
+    ("moves", "Move", "__init__", "move_init_seconds"),
+    ("battle_effects", None, "apply_move", "apply_move_seconds"),
+)
+
+
+class Counter:
+    """A metric counting how many times something happened."""
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add to the counter."""
+        self.value += amount
+
+
+class Histogram:
+    """A metric counting observed values, such as durations, in buckets."""
+
+    __slots__ = ("name", "help", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # observations in each bucket, plus one for values above every bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record a single value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """A collection of metrics, keyed by name."""
+
+    def __init__(self):
+        self._metrics = dict()
+
+    def __iter__(self):
+        """Iterate over the metrics of the registry, in name order."""
+        return iter([self._metrics[name] for name in sorted(self._metrics)])
+
+    def _metric(self, metric_type, name, *args):
+        """Internal method for getting a metric, creating it if needed."""
+        try:
+            metric = self._metrics[name]
+        except KeyError:
+            metric = self._metrics[name] = metric_type(name, *args)
+        if not isinstance(metric, metric_type):
+            raise ValueError(f"Metric {name} is not a {metric_type.__name__}")
+        return metric
+
+    def counter(self, name, help=""):
+        """Get the counter of the given name, creating it if needed.
+
+        :rtype: :class:'instrumentation.Counter'
+        """
+        return self._metric(Counter, name, help)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS):
+        """Get the histogram of the given name, creating it if needed.
+
+        :rtype: :class:'instrumentation.Histogram'
+        """
+        return self._metric(Histogram, name, help, buckets)
+
+    def clear(self):
+        """Remove every metric."""
+        self._metrics.clear()
+
+    def snapshot(self):
+        """The current value of every metric.
+
+        :return: The value of each counter, and a dict with the count, sum
+            and bucket counts of each histogram, keyed by metric name.
+        :rtype: dict
+        """
+        values = dict()
+        for metric in self:
+            if isinstance(metric, Counter):
+                values[metric.name] = metric.value
+            else:
+                values[metric.name] = {
+                    "count": metric.count, "sum": metric.sum,
+                    "buckets": dict(zip(metric.buckets + (float("inf"),),
+                                        metric.counts))}
+        return values
+
+
+REGISTRY = Registry()
+
+# original attributes of the hot paths, keyed by (owner, attribute), while
+# instrumentation is enabled
+_originals = dict()
+
+
+def _timed(function, histogram):
+    """Internal function for wrapping a function to time its calls."""
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return timed
+
+
+def _owner(module_name, class_name):
+    """Internal function for finding the object a hot path belongs to."""
+    module = importlib.import_module(module_name)
+    return module if class_name is None else getattr(module, class_name)
+
+
+def enable(registry=REGISTRY):
+    """Start timing every hot path into histograms of a registry.
+
+    :param registry: The registry to record into.
+    :type registry: :class:'instrumentation.Registry'
+    """
+    for module_name, class_name, attribute, name in HOT_PATHS:
+        owner = _owner(module_name, class_name)
+        if (owner, attribute) in _originals:
+            continue
+        original = vars(owner)[attribute]
+        histogram = registry.histogram(
+            name, f"Seconds spent in {module_name}."
+                  f"{class_name + '.' if class_name else ''}{attribute}")
+        if isinstance(original, (staticmethod, classmethod)):
+            wrapped = type(original)(_timed(original.__func__, histogram))
+        else:
+            wrapped = _timed(original, histogram)
+        _originals[owner, attribute] = original
+        setattr(owner, attribute, wrapped)
+
+
+def disable():
+    """Stop timing the hot paths, restoring the original functions.
+
+    Metrics already recorded are kept.
+    """
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+
+def enabled():
+    """True if the hot paths are being timed; otherwise false."""
+    return bool(_originals)
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(registry=REGISTRY, prefix="pokemon_"):
+    """Dump the metrics of a registry in the Prometheus text format.
+
+    :param registry: The registry to dump.
+    :type registry: :class:'instrumentation.Registry'
+    :param prefix: A prefix added to the name of every metric.
+    :type prefix: str
+
+    :rtype: str
+    """
+    lines = list()
+    for metric in registry:
+        name = prefix + metric.name
+        if metric.help:
+            lines.append(f"# HELP {name} {metric.help}")
+        if isinstance(metric, Counter):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}_total {_format_number(metric.value)}")
+            continue
+        lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(metric.buckets + (float("inf"),),
+                                metric.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{_format_number(bound)}"}} '
+                         f"{cumulative}")
+        lines.append(f"{name}_sum {_format_number(metric.sum)}")
+        lines.append(f"{name}_count {metric.count}")
+    return "\n".join(lines) + "\n"
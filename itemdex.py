@@ -1,6 +1,11 @@
+from array import array
+from bisect import bisect_left
+from contextlib import nullcontext
 from csv import DictReader
 
 from dex_entry import DexEntry
+from dex_view import DexView
+
 class Itemdex:
     """Interface for an encyclopedia of items"""
     ###--TO DO--###
@@ -13,6 +18,13 @@ class Itemdex:
     SELL = 4
     EFFECT = 5
     FLAVOR_TEXT = 6
+    CATCH_RATE = 7
+
+    # every sort key, in order
+    SORT_KEYS = tuple(range(NAME, CATCH_RATE + 1))
+
+    # keys of fields with numeric values, which support range queries
+    NUMERIC_KEYS = (BUY, SELL, CATCH_RATE)
 
     def __init__(self, dex_file):
         """Constructor for the Itemdex class.
@@ -26,12 +38,24 @@ class Itemdex:
         """
         try:
             # assume dex_file is a string, the path to the file
-            with open(dex_file, newline="") as fh:
-                reader = DictReader(fh)
+            fh = open(dex_file, newline="")
         except TypeError:
             # dex_file is a file-like object
-            reader = DictReader(dex_file)
-        self._dex_dict, self._dex_view = self._parse_info(reader)
+            fh = nullcontext(dex_file)
+        with fh as source:
+            self._dex_dict, dex_view = self._parse_info(DictReader(source))
+        # the itemdex itself is never reordered; sorting and filtering is done
+        # on views holding positions into this tuple
+        self._entry_ids = tuple(dex_view)
+        # cached sort orders of the whole itemdex and their inverses, keyed by
+        # (sort key, reverse)
+        self._sort_orders = dict()
+        self._sort_ranks = dict()
+        # sorted numeric values and the positions of their entries, keyed by
+        # sort key
+        self._numeric_indexes = dict()
+        # default view used by sort(), filter(), results() and reset()
+        self._view = DexView(self)
 
     def _parse_info(self, reader):
         """Parser to read an Itemdex File.
@@ -39,7 +63,7 @@ class Itemdex:
         :param reader: the DictReader that contains the info on the Itemdex.
         :type reader: class:'csv.DictReader'
 
-        :return: A tuple of a dict of id keys and :class:'itemdex.DexEntry'
+        :return: A tuple of a dict of id keys and :class:'itemdex.ItemEntry'
             object values containing all the Itemdex info from the file,
             and a list containing only the id numbers of each entry.
         :rtype: tuple of (dict, list)
@@ -49,7 +73,7 @@ class Itemdex:
         # list view for filtering and sorting
         dex_view = list()
         for row in reader:
-            dex_dict[row["id"]] = DexEntry(row)
+            dex_dict[row["id"]] = ItemEntry(row)
             dex_view.append(row["id"])
         return dex_dict, dex_view
 
@@ -64,7 +88,7 @@ class Itemdex:
         :type key: str
 
         :return: The requested Itemdex entry.
-        :rtype: :class:'itemdex.DexEntry'
+        :rtype: :class:'itemdex.ItemEntry'
         """
         return self._dex_dict[key]
 
@@ -98,12 +122,145 @@ class Itemdex:
             return lambda entry: entry["effect"]
         elif field == self.FLAVOR_TEXT:
             return lambda entry: entry["flavor_text"]
+        elif field == self.CATCH_RATE:
+            return lambda entry: entry["catch_rate"]
         else:  # specific/unknown field name
             try:  # check name
                 return lambda entry: entry[field.lower()]
             except:  # default sort order
                 return lambda entry: entry["name"]
 
+    def _sort_value(self, key, reverse=False):
+        """Internal method for building a sort key.
+
+        :param key: The sort key to build the function for.
+        :param reverse: Whether the values are sorted in reverse order.
+        :type reverse: bool, optional
+
+        :return: A single argument function that takes in one
+            :class:'itemdex.ItemEntry' object and returns the value to compare
+            it by.
+        """
+        search_key = self._search_key(key)
+        if key in self.NUMERIC_KEYS:
+            # items without a value, such as unbuyable items, sort last in
+            # either direction
+            def sort_value(entry):
+                value = search_key(entry)
+                if reverse:
+                    return (value is not None, value or 0)
+                return (value is None, value or 0)
+            return sort_value
+        return search_key
+
+    def _numeric_index(self, key):
+        """Internal method for retrieving the numeric index of a field.
+
+        Indexes are built on first use and cached.
+
+        :param key: The sort key of a numeric field.
+
+        :return: A tuple of the sorted values of the field, and the positions
+            of the entries with each value. Entries without a value for the
+            field are not included.
+        :rtype: tuple of (class:'array.array', class:'array.array')
+        """
+        try:
+            return self._numeric_indexes[key]
+        except KeyError:
+            pass
+        if key not in self.NUMERIC_KEYS:
+            raise ValueError(f"Field is not numeric: {key}")
+        search_key = self._search_key(key)
+        pairs = list()
+        for index, item_id in enumerate(self._entry_ids):
+            value = search_key(self._dex_dict[item_id])
+            if value is not None:
+                pairs.append((value, index))
+        pairs.sort()
+        values = array("d", (value for value, _ in pairs))
+        positions = array(DexView.INDEX_TYPE, (index for _, index in pairs))
+        self._numeric_indexes[key] = values, positions
+        return values, positions
+
+    def _range_positions(self, key, minimum=None, maximum=None):
+        """Internal method for looking up the entries within a numeric range.
+
+        :param key: The sort key of a numeric field.
+        :param minimum: The lowest value included, or None for no lower bound.
+        :param maximum: The lowest value excluded, or None for no upper bound.
+
+        :return: The positions of the entries in the range, ordered by value.
+        :rtype: class:'array.array'
+        """
+        values, positions = self._numeric_index(key)
+        start = 0 if minimum is None else bisect_left(values, minimum)
+        stop = len(values) if maximum is None else bisect_left(values, maximum)
+        return positions[start:stop]
+
+    def _sort_order(self, key, reverse=False):
+        """Internal method for retrieving the sort order of the whole Itemdex.
+
+        Orders are computed on first use and cached, so every view sorting on
+        the same key shares a single order.
+
+        :param key: The sort key the order is for.
+        :param reverse: Whether the order is reversed. Entries with equal
+            values stay in the order they were loaded either way.
+        :type reverse: bool, optional
+
+        :return: The positions of every entry in this Itemdex, sorted on
+            ``key``. The returned array must not be modified.
+        :rtype: class:'array.array'
+        """
+        try:
+            return self._sort_orders[key, reverse]
+        except KeyError:
+            pass
+        sort_value = self._sort_value(key, reverse)
+        keys = [sort_value(self._dex_dict[item_id])
+                for item_id in self._entry_ids]
+        order = array(DexView.INDEX_TYPE,
+                      sorted(range(len(keys)), key=keys.__getitem__,
+                             reverse=reverse))
+        self._sort_orders[key, reverse] = order
+        return order
+
+    def _sort_rank(self, key, reverse=False):
+        """Internal method for retrieving the rank of each entry for a sort key.
+
+        :param key: The sort key the ranks are for.
+        :param reverse: Whether the ranks are for the reversed order.
+        :type reverse: bool, optional
+
+        :return: For each entry position in this Itemdex, the position of that
+            entry within the sort order of ``key``. The returned array must not
+            be modified.
+        :rtype: class:'array.array'
+        """
+        try:
+            return self._sort_ranks[key, reverse]
+        except KeyError:
+            pass
+        order = self._sort_order(key, reverse)
+        rank = array(DexView.INDEX_TYPE, bytes(order.itemsize * len(order)))
+        for position, index in enumerate(order):
+            rank[index] = position
+        self._sort_ranks[key, reverse] = rank
+        return rank
+
+    def view(self):
+        """Create a new view over this Itemdex.
+
+        Views can be sorted and filtered independently of each other and of
+        this Itemdex, while sharing the entries of this Itemdex. Creating a
+        view is a constant time operation.
+
+        :return: A view of every entry in this Itemdex, unsorted.
+        :rtype: :class:'dex_view.DexView'
+        """
+        return DexView(self)
+
     def sort(self, key, reverse=False):
         """Sort the entries of this Itemdex based on the given sort key.
         After sorting, the results can be retrieved with
@@ -116,8 +273,7 @@ class Itemdex:
             elements are sorted in reverse order.
         :type reverse: bool, optional
         """
-        sort_key = self._search_key(key)
-        self._dex_view.sort(key=sort_key,  reverse=reverse)
+        self._view.sort(key, reverse)
 
     def filter(self, field, criteria):
         """Filter the Itemdex based on the given set of rules.
@@ -126,31 +282,74 @@ class Itemdex:
         :param criteria: The data that is compared against the Itemdex
             for filtering.
         """
-        extractor = self._search_key(field)
-        for index, entry_number in enumerate(self._dex_view):
-                entry = self._dex_dict[entry_number]
-                try:
-                    # check if field is iterable
-                    if criteria not in extractor(entry):
-                        del self._dex_view[index]
-                except TypeError:
-                    # field is not iterable, assume primative type
-                    if criteria != extractor(entry):
-                        del self._dex_view[index]
-
-    def results(self):
+        self._view.filter(field, criteria)
+
+    def filter_range(self, field, minimum=None, maximum=None):
+        """Filter the Itemdex to the entries within a range of numeric values.
+
+        Entries are found by binary search over a sorted index of the field,
+        rather than by checking every entry. Entries without a value for the
+        field are always filtered out.
+
+        :param field: The numeric field to check for filtering. Must be one of
+            ``Itemdex.NUMERIC_KEYS``.
+        :param minimum: The lowest value to keep, or None for no lower bound.
+        :param maximum: The lowest value to filter out, or None for no upper
+            bound.
+        """
+        self._view.filter_range(field, minimum, maximum)
+
+    def top(self, key, count, reverse=False):
+        """Return the first entries of this Itemdex if it were sorted on a key.
+
+        The current sorting of this Itemdex is not changed. Filtering is
+        respected.
+
+        :param key: Specifies on what criteria to rank the entries.
+        :param count: The number of entries to return.
+        :type count: int
+        :param reverse: A boolean value. If set to True, then the entries
+            ranked highest are returned instead, highest first.
+        :type reverse: bool, optional
+
+        :return: Up to ``count`` entries, in sorted order.
+        :rtype: list
+        """
+        return self._view.top(key, count, reverse)
+
+    def results(self, offset=0, limit=None):
         """Return the current state of this Itemdex, with sorting and filtering.
 
+        :param offset: The number of entries to skip.
+        :type offset: int, optional
+        :param limit: The maximum number of entries to return. If None, every
+            entry after ``offset`` is returned.
+        :type limit: int, optional
+
         :return: The current state of this Itemdex. Changes to it do not reflect 
             to the internal sorting/filtering of the Itemdex, and vice-versa.
         :rtype: list
         """
-        return [self._dex_dict[item_id] for item_id in self._dex_view]
+        return self._view.results(offset, limit)
+
+    def page(self, cursor=None, limit=DexView.PAGE_SIZE):
+        """Return a single page of the current state of this Itemdex.
+
+        :param cursor: The cursor returned with the previous page, or None
+            for the first page.
+        :type cursor: str, optional
+        :param limit: The maximum number of entries in the page.
+        :type limit: int, optional
+
+        :return: A tuple of the entries in the page, and the cursor for the
+            next page or None if this is the last page.
+        :rtype: tuple of (list, str)
+        """
+        return self._view.page(cursor, limit)
 
     def reset(self):
         """Reset any sorting and filtering done on this Itemdex."""
-        self._dex_view.clear()
-        self._dex_view.extend(sorted(self._dex_dict.keys()))
+        self._view.reset()
 
 class ItemEntry(DexEntry):
     """A single entry for an item in a Itemdex."""
@@ -165,3 +364,22 @@ class ItemEntry(DexEntry):
         # convert data to internal list
         # convert data to internal dicts
         # convert data to primative types
+        self._dex_info["purchase_price"] = self._str_to_number(self._dex_info["purchase_price"], int)
+        self._dex_info["sale_price"] = self._str_to_number(self._dex_info["sale_price"], int)
+        # columns only found in some item types
+        if "catch_rate" in self._dex_info:
+            self._dex_info["catch_rate"] = self._str_to_number(self._dex_info["catch_rate"], float)
+
+    @staticmethod
+    def _str_to_number(string, value_type):
+        """Convert a string to a number.
+
+        :param string: The string to convert.
+        :type string: str
+        :param value_type: The numeric type to convert to, such as int.
+        :type value_type: function
+
+        :return: The converted number, or None if the string is blank.
+        """
+        string = string.strip()
+        return value_type(string) if string else None
@@ -1,3 +1,15 @@
+"""Entry point of the pokemon app.
+
+Nothing beyond the standard library is imported before the window is shown.
+The Pokedex and Itemdex are loaded in background threads while the window is
+already responsive; every other subsystem is loaded the first time it is
+used. Run with --profile-startup to time the import and initialization of
+each subsystem instead of starting the app.
+"""
+import argparse
+import sys
+import time
+
 ## MAIN APP FEATURES ##
 # Pokedex
 # Custom Pokemon teams
@@ -8,14 +20,44 @@
 # IV Calculator
 # Pokemon news feed
 
-def main():
-    pokedex = Pokedex(source_file)
-    items = Itemdex(source_file)
-    trainer = PokeTrainer(source_file)
-    teams = PokeTeam(source_file)
-    gui = Gui()
+# subsystems loaded in the background as soon as the app starts
+PRELOAD = ("pokedex", "itemdex")
+
+
+def profile_startup():
+    """Time the import and initialization of the GUI and every subsystem.
+
+    :return: The report, one line for each part of the app.
+    :rtype: str
+    """
+    start = time.perf_counter()
+    import subsystems
+    import gui
+    lines = [f"{'gui':12} import {time.perf_counter() - start:8.4f}s"]
+    for name, import_seconds, init_seconds in subsystems.profile():
+        lines.append(f"{name:12} import {import_seconds:8.4f}s  "
+                     f"init {init_seconds:8.4f}s")
+    lines.append(f"{'total':12} {time.perf_counter() - start:15.4f}s")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pokemon app")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and init times of each subsystem "
+                             "and exit")
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        print(profile_startup())
+        return 0
+
+    import subsystems
+    import gui
+    for name in PRELOAD:
+        subsystems.SUBSYSTEMS[name].load_async()
+    gui.main(subsystems.SUBSYSTEMS)
+    return 0
 
-    # set up gui events
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
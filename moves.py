@@ -1,9 +1,36 @@
 """Contains classes relating to a battle moves that pokemon can use."""
+from contextlib import nullcontext
 import csv
 
 import battle_effects
 
 
+def load_moves(move_file):
+    """Read and compile every move in a move csv.
+
+    Every row is validated as it is read, so a malformed row is reported when
+    the file is loaded rather than when the move is first used.
+
+    :param move_file: The path to the csv, or a file-like object of it.
+    :type move_file: str or file-like object
+
+    :raises ValueError: If any row of the file is malformed.
+
+    :return: The compiled info of each move, keyed by move name. Create a
+        usable move from the info with :meth:`moves.Move.from_info`.
+    :rtype: dict
+    """
+    try:
+        # assume move_file is a string, the path to the file
+        fh = open(move_file, newline="")
+    except TypeError:
+        # move_file is a file-like object
+        fh = nullcontext(move_file)
+    with fh as source:
+        return {info["name"]: battle_effects.compile_move(info)
+                for info in csv.DictReader(source)}
+
+
 class Move:
     """Interface for a pokemon's battle move."""
 
@@ -15,14 +42,16 @@ class Move:
         """
         try:
             # assume move_file is a string, the path to the file
-            with open(move_file, newline="") as fh:
-                reader = csv.DictReader(fh)
-                filtered = (info for info in reader if info["name"] == name)
+            fh = open(move_file, newline="")
         except TypeError:
             # move_file is a file-like object
-            reader = csv.DictReader(move_file)
+            fh = nullcontext(move_file)
+        with fh as source:
+            reader = csv.DictReader(source)
             filtered = (info for info in reader if info["name"] == name)
-        move_info = next(filtered)
+            move_info = next(filtered, None)
+        if move_info is None:
+            raise ValueError(f"Move not found: {name}")
         self._parse_info(move_info)
 
     ########## Class Constants ##########
@@ -30,7 +59,12 @@ class Move:
     ########## Properties ##########
     @property
     def move_info(self):
-        return move_info.copy()
+        return self._move_info.copy()
+
+    @property
+    def name(self):
+        """The name of this move."""
+        return self._move_info["name"]
 
     @property
     def pp_cur(self):
@@ -44,16 +78,40 @@ class Move:
         self._move_info["pp_cur"] = value
 
 
+    @property
+    def priority(self):
+        """The priority of this move; moves with higher priority go first."""
+        return self._move_info["priority"]
+
     ########## Class/Static Methods ##########
+    @classmethod
+    def from_info(cls, move_info):
+        """Create a move with full pp from compiled move info.
+
+        :param move_info: The compiled info of the move, as returned by
+            :func:`moves.load_moves`. The info is copied, so the same info
+            can be used to create any number of moves.
+        :type move_info: dict
+
+        :rtype: :class:'moves.Move'
+        """
+        move = cls.__new__(cls)
+        move._set_info(dict(move_info))
+        return move
 
     ########## Instance Methods ##########
     def _parse_info(self, move_info):
-        """Parse the supplied dictionary for info to initialize this move."""
-        if not battle_effects.verify_move(move_info):
-            raise ValueError("Error reading move information: "
-                             f"{move_info["name"]}")
+        """Parse the supplied dictionary for info to initialize this move.
+
+        Raises ValueError, naming the malformed field, if the info is not a
+        usable move.
+        """
+        self._set_info(battle_effects.compile_move(move_info))
 
+    def _set_info(self, move_info):
+        """Initialize this move from compiled move info."""
         self._pp_up = 0
+        move_info["pp_max"] = move_info["pp"]
         self._base_pp_max = move_info["pp_max"]
         move_info["pp_cur"] = move_info["pp_max"]
         self._move_info = move_info
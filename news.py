@@ -0,0 +1,388 @@
+"""Contains the ingestion pipeline of the Pokemon news feed.
+
+A :class:`NewsFeed` polls its RSS, Atom and JSON Feed sources concurrently
+with asyncio, so one slow source doesn't hold up the others. Sources are
+polled conditionally with the ETag and Last-Modified headers of their last
+response, and a source that hasn't changed answers with an empty 304.
+
+Articles are stored in a :class:`NewsCache`, a local SQLite database. An
+article is identified by a hash of its content, so an article seen again, or
+the same story published by two sources, is only stored once. Each stored
+article is cross-linked to the Pokedex entries of the species it mentions,
+found with a :class:`SpeciesIndex` of species names.
+"""
+import asyncio
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ElementTree
+
+# kinds of feed a source can be
+RSS = "rss"
+JSON = "json"
+
+# A feed polled for articles. RSS sources may be RSS 2.0 or Atom feeds; JSON
+# sources are JSON Feed documents
+Source = namedtuple("Source", ["name", "url", "kind"], defaults=(RSS,))
+# An article of a feed. key is the hash of its content, and species the
+# Pokedex numbers of the species it mentions
+Article = namedtuple("Article", ["key", "source", "title", "link",
+                                 "published", "summary", "species"],
+                     defaults=((),))
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"[\w'’♀♂-]+")
+
+
+def content_hash(title, summary):
+    """The hash identifying an article, from its title and summary.
+
+    Case, markup and spacing are ignored, so the same story published by
+    two sources has the same hash.
+
+    :rtype: str
+    """
+    text = " ".join(_WORDS.findall(_TAGS.sub(" ", f"{title}\n{summary}")
+                                   .lower()))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _text(element, *tags):
+    """Internal function for the text of the first child with a tag."""
+    for tag in tags:
+        child = element.find(tag)
+        if child is not None:
+            return (child.text or "").strip() or child.get("href", "")
+    return ""
+
+
+def _rss_date(text):
+    """Internal function converting an RSS date to an ISO 8601 date."""
+    try:
+        return parsedate_to_datetime(text).isoformat()
+    except (TypeError, ValueError):
+        return text or None
+
+
+def parse_feed(source, body):
+    """Read the articles of a feed.
+
+    :param source: The source the feed is from.
+    :type source: :class:'news.Source'
+    :param body: The feed document.
+    :type body: bytes
+
+    :raises ValueError: If the feed is malformed.
+
+    :return: The articles, without species.
+    :rtype: list of :class:'news.Article'
+    """
+    items = list()
+    if source.kind == JSON:
+        try:
+            document = json.loads(body)
+        except ValueError as error:
+            raise ValueError(f"Malformed JSON feed {source.name}: {error}")
+        for item in document.get("items", ()):
+            items.append((item.get("title", ""),
+                          item.get("url") or item.get("external_url", ""),
+                          item.get("date_published"),
+                          item.get("summary") or item.get("content_text")
+                          or item.get("content_html", "")))
+    else:
+        try:
+            root = ElementTree.fromstring(body)
+        except ElementTree.ParseError as error:
+            raise ValueError(f"Malformed RSS feed {source.name}: {error}")
+        if root.tag == f"{_ATOM}feed":
+            for entry in root.iter(f"{_ATOM}entry"):
+                items.append((_text(entry, f"{_ATOM}title"),
+                              _text(entry, f"{_ATOM}link"),
+                              _text(entry, f"{_ATOM}published",
+                                    f"{_ATOM}updated") or None,
+                              _text(entry, f"{_ATOM}summary",
+                                    f"{_ATOM}content")))
+        else:
+            for item in root.iter("item"):
+                items.append((_text(item, "title"),
+                              _text(item, "link", "guid"),
+                              _rss_date(_text(item, "pubDate")),
+                              _text(item, "description")))
+    return [Article(content_hash(title, summary), source.name, title, link,
+                    published, summary)
+            for title, link, published, summary in items]
+
+
+class SpeciesIndex:
+    """An index of species names, for finding the species a text mentions."""
+
+    def __init__(self, pokedex):
+        """Constructor for the SpeciesIndex class.
+
+        :param pokedex: The Pokedex the species are from.
+        :type pokedex: :class:'pokedex.Pokedex'
+        """
+        # Pokedex number of each name, keyed by the words of the name
+        self._names = dict()
+        self._longest = 1
+        for number in pokedex:
+            words = tuple(_WORDS.findall(
+                pokedex[number]["name"]["English"].lower()))
+            if words:
+                self._names[words] = number
+                self._longest = max(self._longest, len(words))
+
+    def __len__(self):
+        return len(self._names)
+
+    def find(self, text):
+        """Find the species mentioned in a text.
+
+        Names are matched as whole words, ignoring case and punctuation, so
+        "Mr. Mime" and "MR MIME" both match Mr. Mime, and "Mewtwo" does not
+        match Mew.
+
+        :return: The Pokedex numbers of the species, in order of first
+            mention.
+        :rtype: tuple of str
+        """
+        words = _WORDS.findall(_TAGS.sub(" ", text).lower())
+        found = dict()
+        for start in range(len(words)):
+            # try the longest name first, so "Tapu Koko" isn't read as a
+            # species named "Tapu"
+            for length in range(min(self._longest, len(words) - start), 0,
+                                -1):
+                number = self._names.get(tuple(words[start:start + length]))
+                if number is not None:
+                    found.setdefault(number, None)
+                    break
+        return tuple(found)
+
+
+class NewsCache:
+    """A local SQLite store of news articles and feed validators."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            key TEXT PRIMARY KEY, source TEXT, title TEXT, link TEXT,
+            published TEXT, summary TEXT, fetched REAL);
+        CREATE INDEX IF NOT EXISTS articles_fetched ON articles (fetched);
+        CREATE TABLE IF NOT EXISTS article_species (
+            key TEXT, number TEXT, PRIMARY KEY (key, number));
+        CREATE INDEX IF NOT EXISTS article_species_number
+            ON article_species (number);
+        CREATE TABLE IF NOT EXISTS sources (
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT);
+    """
+
+    def __init__(self, path=":memory:"):
+        """Constructor for the NewsCache class.
+
+        :param path: The path to the database file. If ":memory:", the
+            articles are only kept until the cache is closed.
+        :type path: str
+        """
+        self._db = sqlite3.connect(path)
+        self._db.executescript(self._SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def validators(self, url):
+        """The ETag and Last-Modified headers of the last response of a feed.
+
+        :return: (etag, last modified), each None if it wasn't sent.
+        :rtype: tuple
+        """
+        row = self._db.execute(
+            "SELECT etag, last_modified FROM sources WHERE url = ?",
+            (url,)).fetchone()
+        return row if row is not None else (None, None)
+
+    def set_validators(self, url, etag, last_modified):
+        """Store the ETag and Last-Modified headers of a feed's response."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+                (url, etag, last_modified))
+
+    def add(self, articles):
+        """Store articles, skipping any already stored.
+
+        :type articles: iterable of :class:'news.Article'
+
+        :return: The articles that were not already stored.
+        :rtype: list of :class:'news.Article'
+        """
+        added = list()
+        fetched = time.time()
+        with self._db:
+            for article in articles:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?,"
+                    " ?)", (article.key, article.source, article.title,
+                            article.link, article.published, article.summary,
+                            fetched))
+                if not cursor.rowcount:
+                    continue
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO article_species VALUES (?, ?)",
+                    [(article.key, number) for number in article.species])
+                added.append(article)
+        return added
+
+    def _articles(self, where, parameters, limit):
+        rows = self._db.execute(
+            "SELECT key, source, title, link, published, summary FROM articles"
+            f" {where} ORDER BY fetched DESC, published DESC LIMIT ?",
+            (*parameters, limit)).fetchall()
+        articles = list()
+        for row in rows:
+            species = tuple(number for number, in self._db.execute(
+                "SELECT number FROM article_species WHERE key = ?",
+                (row[0],)))
+            articles.append(Article(*row, species))
+        return articles
+
+    def latest(self, limit=50):
+        """The most recently fetched articles, newest first.
+
+        :rtype: list of :class:'news.Article'
+        """
+        return self._articles("", (), limit)
+
+    def for_species(self, number, limit=50):
+        """The most recently fetched articles mentioning a species.
+
+        :param number: The Pokedex number of the species.
+        :type number: str
+
+        :rtype: list of :class:'news.Article'
+        """
+        return self._articles(
+            "WHERE key IN (SELECT key FROM article_species WHERE number = ?)",
+            (number,), limit)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+class NewsFeed:
+    """Polls news sources concurrently into a cache."""
+
+    def __init__(self, sources, cache, species=None, timeout=10,
+                 concurrency=8):
+        """Constructor for the NewsFeed class.
+
+        :param sources: The sources to poll.
+        :type sources: iterable of :class:'news.Source'
+        :param cache: The cache the articles are stored in.
+        :type cache: :class:'news.NewsCache'
+        :param species: The index articles are cross-linked to species with.
+            If None, articles are not cross-linked.
+        :type species: :class:'news.SpeciesIndex', optional
+        :param timeout: Seconds to wait for each source.
+        :type timeout: float
+        :param concurrency: The most sources fetched at the same time.
+        :type concurrency: int
+        """
+        self.sources = list(sources)
+        self._cache = cache
+        self._species = species
+        self._timeout = timeout
+        self._concurrency = concurrency
+        # the error of each source that failed in the last poll, keyed by
+        # source name
+        self.errors = dict()
+
+    def _fetch(self, source, etag, last_modified):
+        """Internal method run in a worker thread to fetch a feed.
+
+        :return: (body, etag, last modified), with a body of None if the feed
+            hasn't changed.
+        """
+        request = urllib.request.Request(source.url)
+        if etag:
+            request.add_header("If-None-Match", etag)
+        if last_modified:
+            request.add_header("If-Modified-Since", last_modified)
+        try:
+            with urllib.request.urlopen(request,
+                                        timeout=self._timeout) as response:
+                return (response.read(), response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"))
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                return None, etag, last_modified
+            raise
+
+    async def _poll_source(self, source, limit):
+        async with limit:
+            etag, last_modified = self._cache.validators(source.url)
+            body, etag, last_modified = await asyncio.to_thread(
+                self._fetch, source, etag, last_modified)
+        if body is None:
+            return list()
+        articles = parse_feed(source, body)
+        if self._species is not None:
+            articles = [article._replace(species=self._species.find(
+                f"{article.title}\n{article.summary}"))
+                for article in articles]
+        new = self._cache.add(articles)
+        # only remember the validators once the articles are stored, so a
+        # failed poll is retried in full
+        self._cache.set_validators(source.url, etag, last_modified)
+        return new
+
+    async def poll(self):
+        """Poll every source once, concurrently.
+
+        A source that fails doesn't stop the others; its error is kept in
+        :attr:`errors`.
+
+        :return: The articles not seen before, in source order.
+        :rtype: list of :class:'news.Article'
+        """
+        limit = asyncio.Semaphore(self._concurrency)
+        results = await asyncio.gather(
+            *(self._poll_source(source, limit) for source in self.sources),
+            return_exceptions=True)
+        self.errors = dict()
+        new = list()
+        for source, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                self.errors[source.name] = result
+            else:
+                new.extend(result)
+        return new
+
+    async def run(self, interval, on_articles=None):
+        """Poll every source again and again until cancelled.
+
+        :param interval: Seconds between polls.
+        :type interval: float
+        :param on_articles: Called with the new articles of each poll that
+            finds any.
+        :type on_articles: callable, optional
+        """
+        while True:
+            new = await self.poll()
+            if new and on_articles is not None:
+                on_articles(new)
+            await asyncio.sleep(interval)
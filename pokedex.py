@@ -1,15 +1,17 @@
+from array import array
+from contextlib import nullcontext
 from csv import DictReader
 from operator import itemgetter
 
 from chunks import timsort
 from dex_entry import DexEntry
+from dex_view import DexView
+import experience
 
 
 class Pokedex:
     """Interface for a Pokedex"""
-    ###--TO DO--###
-    # fix sorting on exp growth rate
-    
+
     # Sorting keys
     NAME = 0
     TYPE = 1
@@ -44,6 +46,13 @@ class Pokedex:
     ABILITIES_SECOND = 30
     ABILITIES_HIDDEN = 31
 
+    # every sort key, in order
+    SORT_KEYS = tuple(range(NAME, ABILITIES_HIDDEN + 1))
+
+    # slot in the abilities of a species of each single ability key
+    ABILITY_SLOTS = {ABILITIES_FIRST: 0, ABILITIES_SECOND: 1,
+                     ABILITIES_HIDDEN: 2}
+
     # Filtering keys
     # all sort keys also function as filter keys
 
@@ -55,12 +64,21 @@ class Pokedex:
         """
         try:
             # assume dex_file is a string, the path to the file
-            with open(dex_file, newline="") as fh:
-                reader = DictReader(fh)
+            fh = open(dex_file, newline="")
         except TypeError:
             # dex_file is a file-like object
-            reader = DictReader(dex_file)
-        self._dex_dict, self._dex_view = self._parse_info(reader)
+            fh = nullcontext(dex_file)
+        with fh as source:
+            self._dex_dict, dex_view = self._parse_info(DictReader(source))
+        # the dex itself is never reordered; sorting and filtering is done on
+        # views holding positions into this tuple
+        self._entry_ids = tuple(dex_view)
+        # cached sort orders of the whole dex and their inverses (the position
+        # of each entry within the order), keyed by (sort key, reverse)
+        self._sort_orders = dict()
+        self._sort_ranks = dict()
+        # default view used by sort(), filter(), results() and reset()
+        self._view = DexView(self)
 
     def _parse_info(self, reader):
         """Parser to read a Pokedex File.
@@ -78,10 +96,21 @@ class Pokedex:
         # list view for filtering and sorting
         dex_view = list()
         for row in reader:
-            dex_dict[row["number"]] = DexEntry(row)
+            entry = PokeEntry(row)
+            entry._on_change = self._entry_changed
+            dex_dict[row["number"]] = entry
             dex_view.append(row["number"])
         return dex_dict, dex_view
 
+    def _entry_changed(self, entry):
+        """Internal callback for an entry of this Pokedex being changed.
+
+        Any cached sort orders may no longer be valid, so they are dropped and
+        recomputed on next use. Existing views keep their current order.
+        """
+        self._sort_orders.clear()
+        self._sort_ranks.clear()
+
     def __len__(self):
         """The size of the Pokedex."""
         return len(self._dex_dict)
@@ -136,18 +165,15 @@ class Pokedex:
             return lambda entry: entry["base_egg_cycles"]
         elif field == self.ABILITIES:  # checks all 3 abilities
             return lambda entry: entry["abilities"]
-        elif field == self.ABILITIES_FIRST:
-            return lambda entry: entry["abilities"][0]
-        elif field == self.ABILITIES_SECOND:
-            return lambda entry: entry["abilities"][1]
-        elif field == self.ABILITIES_HIDDEN:
-            return lambda entry: entry["abilities"][2]
+        elif field in self.ABILITY_SLOTS:
+            slot = self.ABILITY_SLOTS[field]
+            return lambda entry: self._ability(entry, slot)
         elif field == self.EXP_YIELD:
             return lambda entry: entry["exp_yield"]
         elif field == self.EXP_GROWTH_RATE:
             return lambda entry: entry["experience_growth"]
         elif field == self.HAPPINESS:
-            return lambda entry: entry["happiness"]
+            return lambda entry: entry["base_happiness"]
         elif field == self.STATS_TOTAL:
             return lambda entry: sum(entry["base_stats"].values())
         elif field == self.STATS_HP:
@@ -185,6 +211,161 @@ class Pokedex:
         else:  # default sort order
             return lambda entry: entry["number"]
 
+    def _sort_value(self, key, reverse=False):
+        """Internal method for building a sort key.
+
+        This differs from ``_search_key`` only where the value to compare
+        differs from the value to filter on.
+
+        :param key: The sort key to build the function for.
+        :param reverse: Whether the values are sorted in reverse order.
+        :type reverse: bool, optional
+
+        :return: A single argument function that takes in one
+            :class:'pokedex.PokeEntry' object and returns the value to compare
+            it by, or None if entries can only be compared pairwise.
+        """
+        if key == self.EVOLUTION:
+            return None
+        elif key == self.NUMBER:
+            # compare numbers numerically, then by variant tag
+            return lambda entry: self._number_key(entry["number"])
+        elif key == self.EXP_GROWTH_RATE:
+            # compare growth rates by how much experience they need
+            return lambda entry: experience.growth_order(
+                entry["experience_growth"])
+        elif key in self.ABILITY_SLOTS:
+            # species without the ability sort last in either direction
+            search_key = self._search_key(key)
+
+            def sort_value(entry):
+                value = search_key(entry)
+                if reverse:
+                    return (value is not None, value or "")
+                return (value is None, value or "")
+            return sort_value
+        return self._search_key(key)
+
+    def _sort_order(self, key, reverse=False):
+        """Internal method for retrieving the sort order of the whole Pokedex.
+
+        Orders are computed on first use and cached, so every view sorting on
+        the same key shares a single order.
+
+        :param key: The sort key the order is for.
+        :param reverse: Whether the order is reversed. Entries with equal
+            values stay in the order they were loaded either way.
+        :type reverse: bool, optional
+
+        :return: The positions of every entry in this Pokedex, sorted on
+            ``key``. The returned array must not be modified.
+        :rtype: class:'array.array'
+        """
+        try:
+            return self._sort_orders[key, reverse]
+        except KeyError:
+            pass
+        entries = [self._dex_dict[entry_id] for entry_id in self._entry_ids]
+        sort_value = self._sort_value(key, reverse)
+        if sort_value is None and reverse:
+            # entries compared pairwise have no equal values to keep in order
+            order = reversed(self._sort_order(key))
+        elif sort_value is None:
+            def comp_key(elem1, elem2):
+                if elem1["evolve_to"]:  # check if has evolution
+                    return elem2["number"] in elem1["evolve_to"]
+                else:
+                    return elem1["number"] > elem2["number"]
+            order = timsort(list(range(len(entries))),
+                comp_key=lambda i, j: comp_key(entries[i], entries[j]))
+        else:
+            keys = [sort_value(entry) for entry in entries]
+            order = sorted(range(len(entries)), key=keys.__getitem__,
+                           reverse=reverse)
+        order = array(DexView.INDEX_TYPE, order)
+        self._sort_orders[key, reverse] = order
+        return order
+
+    def _sort_rank(self, key, reverse=False):
+        """Internal method for retrieving the rank of each entry for a sort key.
+
+        :param key: The sort key the ranks are for.
+        :param reverse: Whether the ranks are for the reversed order.
+        :type reverse: bool, optional
+
+        :return: For each entry position in this Pokedex, the position of that
+            entry within the sort order of ``key``. The returned array must not
+            be modified.
+        :rtype: class:'array.array'
+        """
+        try:
+            return self._sort_ranks[key, reverse]
+        except KeyError:
+            pass
+        order = self._sort_order(key, reverse)
+        rank = array(DexView.INDEX_TYPE, bytes(order.itemsize * len(order)))
+        for position, index in enumerate(order):
+            rank[index] = position
+        self._sort_ranks[key, reverse] = rank
+        return rank
+
+    @staticmethod
+    def _ability(entry, slot):
+        """Internal method for looking up a single ability of a species.
+
+        :param entry: The entry of the species.
+        :type entry: :class:'pokedex.PokeEntry'
+        :param slot: The index of the ability in the abilities of the species.
+        :type slot: int
+
+        :return: The ability, or None if the species has no ability in the
+            slot or the slot is blank.
+        :rtype: str
+        """
+        abilities = entry["abilities"]
+        if slot < len(abilities) and abilities[slot]:
+            return abilities[slot]
+        return None
+
+    @staticmethod
+    def _number_key(number):
+        """Internal method for building a sort key from a Pokedex number.
+
+        :param number: A Pokedex number in the form of int or int:var_tag
+        :type number: str
+
+        :return: A tuple of the integer number and variant tag.
+        :rtype: tuple of (int, str)
+        """
+        number, _, var_tag = number.partition(":")
+        return int(number), var_tag
+
+    def precompute_sort_orders(self, keys=SORT_KEYS):
+        """Compute and cache the sort orders for the given sort keys.
+
+        Sort orders are otherwise computed on their first use. Precomputing
+        them moves that cost to a convenient time, such as start up.
+
+        :param keys: The sort keys to precompute, in both directions. Defaults
+            to every sort key.
+        :type keys: iterable, optional
+        """
+        for key in keys:
+            self._sort_rank(key)
+            self._sort_rank(key, reverse=True)
+
+    def view(self):
+        """Create a new view over this Pokedex.
+
+        Views can be sorted and filtered independently of each other and of
+        this Pokedex, while sharing the entries of this Pokedex. Creating a
+        view is a constant time operation.
+
+        :return: A view of every entry in this Pokedex, unsorted.
+        :rtype: :class:'dex_view.DexView'
+        """
+        return DexView(self)
+
     def sort(self, key, reverse=False):
         """Sort the entries of this Pokedex based on the given sort key.
         After sorting, the results can be retrieved with
@@ -197,16 +378,7 @@ class Pokedex:
             elements are sorted in reverse order.
         :type reverse: bool, optional
         """
-        if key == EVOLUTION:
-            def comp_key(elem1, elem2):
-                if elem1["evolve_to"]:  # check if has evolution
-                    return elem2["number"] in elem1["evolve_to"]
-                else:
-                    return elem1["number"] > elem2["number"]
-            timsort(self.dex_view, comp_key=comp_key)
-        else:
-            sort_key = self._search_key(key)
-            self.dex_view.sort(key=sort_key,  reverse=reverse)
+        self._view.sort(key, reverse)
 
     def filter(self, field, criteria):
         """Filter the Pokedex based on the given set of rules.
@@ -215,31 +387,82 @@ class Pokedex:
         :param criteria: The data that i compared against the Pokedex
             for filtering.
         """
-        extractor = self._search_key(field)
-        for index, entry_number in enumerate(self._dex_view):
-                entry = self._dex_dict[entry_number]
-                try:
-                    # check if field is iterable
-                    if criteria not in extractor(entry):
-                        del self._dex_view[index]
-                except TypeError:
-                    # field is not iterable, assume primative type
-                    if criteria != extractor(entry):
-                        del self._dex_view[index]
-
-    def results(self):
+        self._view.filter(field, criteria)
+
+    def top(self, key, count, reverse=False):
+        """Return the first entries of this Pokedex if it were sorted on a key.
+
+        The current sorting of this Pokedex is not changed. Filtering is
+        respected.
+
+        :param key: Specifies on what criteria to rank the entries.
+        :param count: The number of entries to return.
+        :type count: int
+        :param reverse: A boolean value. If set to True, then the entries
+            ranked highest are returned instead, highest first.
+        :type reverse: bool, optional
+
+        :return: Up to ``count`` entries, in sorted order.
+        :rtype: list
+        """
+        return self._view.top(key, count, reverse)
+
+    def results(self, offset=0, limit=None):
         """Return the current state of this Pokedex, with sorting and filtering.
 
+        :param offset: The number of entries to skip.
+        :type offset: int, optional
+        :param limit: The maximum number of entries to return. If None, every
+            entry after ``offset`` is returned.
+        :type limit: int, optional
+
         :return: The current state of this Pokedex. Changes to it do not reflect 
             to the internal sorting/filtering of the Pokdex, and vice-versa.
         :rtype: list
         """
-        return [self._dex_dict[number] for number in self._dex_view]
+        return self._view.results(offset, limit)
+
+    def page(self, cursor=None, limit=DexView.PAGE_SIZE):
+        """Return a single page of the current state of this Pokedex.
+
+        :param cursor: The cursor returned with the previous page, or None
+            for the first page.
+        :type cursor: str, optional
+        :param limit: The maximum number of entries in the page.
+        :type limit: int, optional
+
+        :return: A tuple of the entries in the page, and the cursor for the
+            next page or None if this is the last page.
+        :rtype: tuple of (list, str)
+        """
+        return self._view.page(cursor, limit)
 
     def reset(self):
         """Reset any sorting and filtering done on this Pokedex."""
-        self._dex_view.clear()
-        self._dex_view.extend(sorted(self._dex_dict.keys()))
+        self._view.reset()
+
+    def learners(self, move):
+        """Return every entry that can learn a move, by level up, machine,
+        egg or tutor.
+
+        Sorting and filtering of this Pokedex are ignored.
+
+        :param move: The name of the move.
+        :type move: str
+
+        :return: The entries, in the order they were loaded.
+        :rtype: list
+        """
+        found = list()
+        for entry_id in self._entry_ids:
+            entry = self._dex_dict[entry_id]
+            if (move in entry["move_set_machine"]
+                    or move in entry["move_set_egg"]
+                    or move in entry["move_set_tutor"]
+                    or any(move in moves for moves
+                           in entry["move_set_level"].values())):
+                found.append(entry)
+        return found
 
 class PokeEntry(DexEntry):
     """A single entry for a Pokemon in a Pokedex."""
@@ -264,8 +487,41 @@ class PokeEntry(DexEntry):
         self._dex_info["base_stats"] = self._str_to_dict(self._dex_info["base_stats"], value_type=int)
         self._dex_info["evs"] = self._str_to_dict(self._dex_info["evs"], value_type=int)
         self._dex_info["flavor_text"] = self._str_to_dict(self._dex_info["flavor_text"])
-        self._dex_info["move_set_level"] = self._str_to_dict(self._dex_info["move_set_level"], key_type=int)
+        self._dex_info["move_set_level"] = self._str_to_level_moves(self._dex_info["move_set_level"])
+        # stats missing from the ev yield are yielded as 0
+        self._dex_info["evs"] = {stat: self._dex_info["evs"].get(stat, 0)
+                                 for stat in self._dex_info["base_stats"]}
         # convert data to primative types
+        self._dex_info["height"] = float(self._dex_info["height"].rstrip("m"))
+        self._dex_info["weight"] = float(self._dex_info["weight"].rstrip("kg"))
+        self._dex_info["capture_rate"] = int(self._dex_info["capture_rate"])
+        self._dex_info["base_egg_cycles"] = int(self._dex_info["base_egg_cycles"])
+        self._dex_info["exp_yield"] = int(self._dex_info["exp_yield"])
+        self._dex_info["base_happiness"] = int(self._dex_info["base_happiness"])
+        self._dex_info["classification"] = self._dex_info["classification"].strip()
+
+    @staticmethod
+    def _str_to_level_moves(string):
+        """Convert a level up move set string to a dict.
+
+        Several moves can be learned at the same level, so each level maps to
+        a list of moves. Levels are integers, except for the special
+        ``"evolve"`` level for moves learned on evolution.
+
+        :param string: The string to convert.
+        :type string: str
+
+        :return: The converted dict object.
+        :rtype: dict
+        """
+        results = dict()
+        for item in PokeEntry._split_items(string):
+            level, _, move = item.partition(":")
+            level = level.strip()
+            if level.isdigit():
+                level = int(level)
+            results.setdefault(level, []).append(move.strip().strip('"'))
+        return results
 
     @property
     def owned(self):
@@ -277,3 +533,4 @@ class PokeEntry(DexEntry):
         if status.lower() not in ["unknown", "seen", "owned"]:
             raise ValueError("Improper value for 'owned' attribute.")
         self._dex_info["owned"] = status.lower()
+        self._changed()
@@ -0,0 +1,375 @@
+"""Contains the PokeEarth world model of locations and their encounters.
+
+Every location has a code, such as the code kept in
+:attr:`pokemon.Pokemon.location`, a readable name and a position on the world
+map. Locations are indexed in a uniform grid of square cells, so queries for
+the locations near a point or inside the visible part of the map only look at
+the cells they overlap rather than at every location. The wild pokemon that
+can be encountered at each location are indexed by Pokedex number as well,
+for finding every location a species appears.
+"""
+from collections import namedtuple
+from contextlib import nullcontext
+import csv
+import heapq
+from itertools import repeat
+import math
+
+# A place in the world, at position (x, y) of the world map
+Location = namedtuple("Location", "code name region x y")
+# A species that can be encountered at a location, with its relative chance of
+# being encountered and the levels it is encountered at. An encounter with a
+# time of day or weather only happens at that time or in that weather
+Encounter = namedtuple("Encounter",
+                       "number weight min_level max_level time weather",
+                       defaults=(None, None))
+# times of day encounters can be limited to
+TIMES = ("morning", "day", "night")
+
+
+def _open_csv(path):
+    """Internal function for opening a csv given as a path or a file."""
+    try:
+        # assume path is a string, the path to the file
+        return open(path, newline="")
+    except TypeError:
+        # path is a file-like object
+        return nullcontext(path)
+
+
+class PokeEarth:
+    """The locations of the pokemon world, indexed by position and species."""
+
+    # width and height of each cell of the grid index, in map units
+    DEFAULT_CELL_SIZE = 64
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        """Constructor for the PokeEarth class.
+
+        :param cell_size: The width and height of each cell of the grid
+            index. Queries are fastest when a cell holds a handful of
+            locations.
+        :type cell_size: float
+        """
+        if cell_size <= 0:
+            raise ValueError("The cell size must be positive.")
+        self._cell_size = cell_size
+        self._locations = dict()
+        # codes of the locations in each cell, keyed by (column, row)
+        self._cells = dict()
+        self._encounters = dict()
+        # codes of the locations each species appears at, keyed by number
+        self._species = dict()
+        # bounds of the occupied cells, as (min column, min row, max column,
+        # max row)
+        self._bounds = None
+
+    @classmethod
+    def from_csv(cls, locations_file, encounters_file=None,
+                 cell_size=DEFAULT_CELL_SIZE):
+        """Load a world from csvs of its locations and encounters.
+
+        The locations csv has the columns code, name, region, x and y. The
+        encounters csv has the columns location, number, weight, min_level
+        and max_level, with a row for each species of each location, and
+        optionally the columns time and weather.
+
+        :param locations_file: The path to the locations csv, or a file-like
+            object of it.
+        :type locations_file: str or file-like object
+        :param encounters_file: The path to the encounters csv, or a
+            file-like object of it.
+        :type encounters_file: str or file-like object, optional
+
+        :rtype: :class:'pokeearth.PokeEarth'
+        """
+        earth = cls(cell_size)
+        with _open_csv(locations_file) as source:
+            for row in csv.DictReader(source):
+                earth.add_location(row["code"], row["name"], float(row["x"]),
+                                   float(row["y"]), row["region"] or None)
+        if encounters_file is not None:
+            with _open_csv(encounters_file) as source:
+                for row in csv.DictReader(source):
+                    earth.add_encounter(row["location"], row["number"],
+                                        float(row["weight"]),
+                                        int(row["min_level"]),
+                                        int(row["max_level"]),
+                                        row.get("time") or None,
+                                        row.get("weather") or None)
+        return earth
+
+    def __len__(self):
+        """The number of locations."""
+        return len(self._locations)
+
+    def __iter__(self):
+        """Iterate over the codes of the locations."""
+        return iter(self._locations)
+
+    def __contains__(self, code):
+        return code in self._locations
+
+    def __getitem__(self, code):
+        """Get the location of a code.
+
+        :raises KeyError: If there is no location with the code.
+
+        :rtype: :class:'pokeearth.Location'
+        """
+        return self._locations[code]
+
+    @property
+    def cell_size(self):
+        """The width and height of each cell of the grid index."""
+        return self._cell_size
+
+    def name(self, code):
+        """The readable name of a location code, such as the code of
+        :attr:`pokemon.Pokemon.location`.
+
+        :return: The name, or None if code is None.
+        :rtype: str
+        """
+        return None if code is None else self._locations[code].name
+
+    def _cell(self, x, y):
+        """Internal method for the grid cell a position is in."""
+        return (math.floor(x / self._cell_size),
+                math.floor(y / self._cell_size))
+
+    def add_location(self, code, name, x, y, region=None):
+        """Add a location, or move an existing location with the same code.
+
+        :param code: The location code.
+        :type code: str
+        :param name: The readable name of the location.
+        :type name: str
+        :param x: The horizontal position on the world map.
+        :type x: float
+        :param y: The vertical position on the world map.
+        :type y: float
+        :param region: The region the location is in.
+        :type region: str, optional
+
+        :rtype: :class:'pokeearth.Location'
+        """
+        if code in self._locations:
+            old = self._locations[code]
+            old_cell = self._cell(old.x, old.y)
+            self._cells[old_cell].remove(code)
+            # only occupied cells are kept, as their count decides how cells
+            # are searched
+            if not self._cells[old_cell]:
+                del self._cells[old_cell]
+        location = Location(code, name, region, x, y)
+        self._locations[code] = location
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, list()).append(code)
+        if self._bounds is None:
+            self._bounds = cell + cell
+        else:
+            min_col, min_row, max_col, max_row = self._bounds
+            self._bounds = (min(min_col, cell[0]), min(min_row, cell[1]),
+                            max(max_col, cell[0]), max(max_row, cell[1]))
+        return location
+
+    def add_encounter(self, code, number, weight, min_level, max_level,
+                      time=None, weather=None):
+        """Add a species to the encounter table of a location.
+
+        :param code: The location code.
+        :type code: str
+        :param number: The Pokedex number of the species.
+        :type number: str
+        :param weight: The relative chance of encountering the species,
+            compared to the other species of the location.
+        :type weight: float
+        :param min_level: The lowest level the species is encountered at.
+        :type min_level: int
+        :param max_level: The highest level the species is encountered at.
+        :type max_level: int
+        :param time: The time of day the species is limited to, one of
+            TIMES. If None, it is encountered at any time.
+        :type time: str, optional
+        :param weather: The weather the species is limited to. If None, it
+            is encountered in any weather.
+        :type weather: str, optional
+
+        :raises KeyError: If there is no location with the code.
+        :raises ValueError: If the weight, levels or time are invalid.
+
+        :rtype: :class:'pokeearth.Encounter'
+        """
+        if code not in self._locations:
+            raise KeyError(code)
+        if weight <= 0:
+            raise ValueError("An encounter's weight must be positive.")
+        if not 1 <= min_level <= max_level <= 100:
+            raise ValueError("An encounter's levels must be between 1 and 100,"
+                             " with min_level no more than max_level.")
+        if time is not None and time not in TIMES:
+            raise ValueError(f"Time of day must be one of {', '.join(TIMES)}.")
+        encounter = Encounter(number, weight, min_level, max_level, time,
+                              weather)
+        self._encounters.setdefault(code, list()).append(encounter)
+        self._species.setdefault(number, set()).add(code)
+        return encounter
+
+    def encounters(self, code):
+        """The encounter table of a location.
+
+        :rtype: list of :class:'pokeearth.Encounter'
+        """
+        if code not in self._locations:
+            raise KeyError(code)
+        return list(self._encounters.get(code, ()))
+
+    def locations_of(self, number):
+        """Every location a species can be encountered at.
+
+        :param number: The Pokedex number of the species.
+        :type number: str
+
+        :return: The locations, in code order.
+        :rtype: list of :class:'pokeearth.Location'
+        """
+        return [self._locations[code]
+                for code in sorted(self._species.get(number, ()))]
+
+    def nearest(self, x, y, count=1, max_distance=None):
+        """Find the locations closest to a point.
+
+        Cells are searched in rings around the cell of the point, stopping
+        once every unsearched cell is further away than the furthest of the
+        closest locations found. Only the part of each ring within the
+        occupied cells is searched, and once a ring would be larger than the
+        number of occupied cells, the occupied cells are searched directly.
+
+        :param x: The horizontal position of the point.
+        :type x: float
+        :param y: The vertical position of the point.
+        :type y: float
+        :param count: The most locations to find.
+        :type count: int
+        :param max_distance: Locations further than this from the point are
+            not found.
+        :type max_distance: float, optional
+
+        :return: (distance, location) of each location, closest first.
+        :rtype: list of tuples
+        """
+        if count < 1 or self._bounds is None:
+            return list()
+        col, row = self._cell(x, y)
+        min_col, min_row, max_col, max_row = self._bounds
+        # rings needed to reach the nearest and the furthest occupied cell
+        first_ring = max(min_col - col, col - max_col, min_row - row,
+                         row - max_row, 0)
+        last_ring = max(col - min_col, max_col - col, row - min_row,
+                        max_row - row)
+        # rings up to this one are entirely within the occupied bounds
+        inner_ring = min(col - min_col, max_col - col, row - min_row,
+                         max_row - row)
+        if max_distance is not None:
+            last_ring = min(last_ring,
+                            math.ceil(max_distance / self._cell_size))
+        found = list()
+        for ring in range(first_ring, last_ring + 1):
+            if ring <= inner_ring and 8 * ring <= len(self._cells):
+                cells = self._ring(col, row, ring)
+            else:
+                cells = self._clipped_ring(col, row, ring)
+            if cells is None:
+                # search the occupied cells of every remaining ring at once
+                cells = [cell for cell in self._cells
+                         if ring <= max(abs(cell[0] - col), abs(cell[1] - row))
+                         <= last_ring]
+                ring = last_ring
+            for cell in cells:
+                for code in self._cells.get(cell, ()):
+                    location = self._locations[code]
+                    distance = math.hypot(location.x - x, location.y - y)
+                    if max_distance is None or distance <= max_distance:
+                        found.append((distance, code))
+            # every cell outside this ring is at least ring cells away
+            if (ring == last_ring or len(found) >= count and
+                    heapq.nsmallest(count, found)[-1][0]
+                    <= ring * self._cell_size):
+                break
+        return [(distance, self._locations[code])
+                for distance, code in heapq.nsmallest(count, found)]
+
+    @staticmethod
+    def _ring(col, row, ring):
+        """Internal method for the cells at a ring distance from a cell."""
+        if ring == 0:
+            yield (col, row)
+            return
+        for offset in range(-ring, ring + 1):
+            yield (col + offset, row - ring)
+            yield (col + offset, row + ring)
+        for offset in range(-ring + 1, ring):
+            yield (col - ring, row + offset)
+            yield (col + ring, row + offset)
+
+    def _clipped_ring(self, col, row, ring):
+        """Internal method for the cells at a ring distance from a cell that
+        are within the bounds of the occupied cells.
+
+        :return: The cells, or None if there are more of them than occupied
+            cells.
+        :rtype: list
+        """
+        min_col, min_row, max_col, max_row = self._bounds
+        left, right = max(col - ring, min_col), min(col + ring, max_col)
+        top, bottom = max(row - ring, min_row), min(row + ring, max_row)
+        if left > right or top > bottom:
+            return list()
+        if 2 * (right - left + bottom - top + 2) > len(self._cells):
+            return None
+        cells = list()
+        # top and bottom edges, corners included
+        columns = range(left, right + 1)
+        if row - ring == top:
+            cells.extend(zip(columns, repeat(top)))
+        if ring and row + ring == bottom:
+            cells.extend(zip(columns, repeat(bottom)))
+        # left and right edges, between the corners
+        rows = range(max(top, row - ring + 1), min(bottom, row + ring - 1) + 1)
+        if col - ring == left:
+            cells.extend(zip(repeat(left), rows))
+        if ring and col + ring == right:
+            cells.extend(zip(repeat(right), rows))
+        return cells
+
+    def in_viewport(self, left, top, right, bottom):
+        """Find the locations inside a rectangle of the world map, such as
+        the part of the map on screen.
+
+        :return: The locations inside the rectangle, edges included.
+        :rtype: list of :class:'pokeearth.Location'
+        """
+        if left > right:
+            left, right = right, left
+        if top > bottom:
+            top, bottom = bottom, top
+        min_col, min_row = self._cell(left, top)
+        max_col, max_row = self._cell(right, bottom)
+        # zoomed far out, checking the occupied cells is cheaper than
+        # checking every cell of the rectangle
+        if (max_col - min_col + 1) * (max_row - min_row + 1) > len(self._cells):
+            cells = [cell for cell in self._cells
+                     if min_col <= cell[0] <= max_col
+                     and min_row <= cell[1] <= max_row]
+        else:
+            cells = [(col, row) for col in range(min_col, max_col + 1)
+                     for row in range(min_row, max_row + 1)]
+        found = list()
+        for cell in cells:
+            for code in self._cells.get(cell, ()):
+                location = self._locations[code]
+                if (left <= location.x <= right
+                        and top <= location.y <= bottom):
+                    found.append(location)
+        return found
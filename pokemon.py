@@ -1,12 +1,18 @@
 """Pokemon module. Contains classes relating to a single instance of a pokemon.
 """
+import random
+
+import events
+import experience
 
 class Pokemon:
     """Class to define a single pokemon."""
 
     def __init__(self, natl_id, location, name, types, stats, moves, ability,
                  happiness=0, ivs=None, shiny=None, level=1, ot=None,
-                 ot_id=None, nicknamed=False):
+                 ot_id=None, nicknamed=False, growth_rate="Medium Fast",
+                 exp=None, nature=None, gender=None, evs=None,
+                 pokerus=None):
         """Initialize a single Pokemon.
 
         Keyword arguments:
@@ -46,16 +52,40 @@ class Pokemon:
         ot        -- the name of the trainer who originally caught the pokemon.
                      Should be left None for wild pokemon (default None)
         ot_id     -- the id number of the original trainer (default None)
+        growth_rate -- the experience growth rate of the pokemon species
+                       (default "Medium Fast")
+        exp       -- the total experience of the pokemon. Must be within the
+                     range for the given level. If None, the pokemon starts
+                     with the least experience for its level (default None)
+        nature    -- the nature of the pokemon, one of NATURES. If None, the
+                     nature will be determined randomly (default None)
+        gender    -- the gender of the pokemon, one of "male", "female" or
+                     None for genderless pokemon (default None)
+        evs       -- effort values for each stat, keyed the same way as the
+                     evs property. If None, all evs start at 0 (default None)
+        pokerus   -- the pokerus state of the pokemon, as described by the
+                     pokerus property (default None)
         """
 
-        self._natl_id = id
+        # bus battle events are published to, set while in battle
+        self.events = None
+        # counters kept by battle effects, such as turns left asleep, keyed by
+        # the name of the effect
+        self.effect_counters = {}
+        self._natl_id = natl_id
         self._location = location
         ###--TO DO--###
         # make a trainer class
         self._original_trainer = ot
         self._original_trainer_id = ot_id
         self._name = name
-        self._level = level
+        self._growth_rate = growth_rate
+        self._set_exp(experience.exp_for_level(growth_rate, level), level)
+        if exp is not None:
+            if experience.level_for_exp(growth_rate, exp) != level:
+                raise ValueError(f"Improper value for experience at level "
+                                 f"{level}: {exp}")
+            self._exp = exp
         ###--TO DO--###
         # types should be pulled from pokedex entry for consistency
         for poke_type in types:
@@ -65,26 +95,41 @@ class Pokemon:
         ###--TO DO--###
         # neet to rework to incorporate base stats and IVs. clients should not
         # be able to directly set the stats for a pokemon
+        self._fainted = stats["cur_HP"] == 0
         self._initialize_stats(stats, ivs)
-        if self._cur_HP != 0:
-            self._fainted = False
-        else:
-            self._fainted = True
+        if evs is not None:
+            for ev_name in self._evs:
+                if not 0 <= evs[ev_name] <= 255:
+                    raise ValueError(f"Inappropriate value for evs; "
+                    f"{ev_name}: {evs[ev_name]}")
+                self._evs[ev_name] = evs[ev_name]
+            if sum(self._evs.values()) > self.MAX_EV_TOTAL:
+                raise ValueError("Total evs cannot be greater than "
+                                 f"{self.MAX_EV_TOTAL}.")
         ###--TO DO--###
         # need to add validation/initialization methods for moves
         self._moves = moves
+        self._ability = ability
+        if nature == None:
+            nature = random.choice(self.NATURES)
+        elif nature not in self.NATURES:
+            raise ValueError(f"{nature} is not a valid nature.")
+        self._nature = nature
+        if gender not in ("male", "female", None):
+            raise ValueError(f"{gender} is not a valid gender.")
+        self._gender = gender
         ###--TO DO--###
         # add base happiness value from pokemon species
         self._happiness = happiness
-        ###--TO DO--###
-        # add way to randomly set a pokemon to shiny if initial value not given
         if shiny == None:
-            self._shiny = False
+            self._shiny = random.randrange(self.SHINY_ODDS) == 0
         else:
             self._shiny = shiny
-        self.status = None
-        self.hidden_status = None
-        self._pokerus = None
+        self._status = None
+        self._hidden_status = None
+        if pokerus not in (None, True, False):
+            raise ValueError(f"Improper value for pokerus: {pokerus}")
+        self._pokerus = pokerus
 
     ########## Class Constants ##########
 
@@ -96,6 +141,30 @@ class Pokemon:
                    "Fire", "Flying", "Ghost", "Grass", "Ground", "Ice",
                    "Normal", "Poison", "Psychic", "Rock", "Steel", "Water")
 
+    # Names of the evs for each stat name used by Pokedex entries
+    EV_NAMES = {"hp": "ev_max_HP", "attack": "ev_attack",
+                "defense": "ev_defense", "sp_attack": "ev_sp_attack",
+                "sp_defense": "ev_sp_defense", "speed": "ev_speed"}
+    MAX_EV_TOTAL = 510
+
+    # Names of the ivs, in the order they are packed by pack_ivs
+    IV_NAMES = ("iv_max_HP", "iv_attack", "iv_defense", "iv_sp_attack",
+                "iv_sp_defense", "iv_speed")
+    # Bits used by a single iv when packed
+    IV_BITS = 5
+
+    # Natures, ordered so that the nature at index i raises the stat
+    # NATURE_STATS[i // 5] and lowers the stat NATURE_STATS[i % 5]
+    NATURES = ("Hardy", "Lonely", "Brave", "Adamant", "Naughty",
+               "Bold", "Docile", "Relaxed", "Impish", "Lax",
+               "Timid", "Hasty", "Serious", "Jolly", "Naive",
+               "Modest", "Mild", "Quiet", "Bashful", "Rash",
+               "Calm", "Gentle", "Sassy", "Careful", "Quirky")
+    NATURE_STATS = ("attack", "defense", "speed", "sp_attack", "sp_defense")
+
+    # A wild pokemon has a 1 in SHINY_ODDS chance of being shiny
+    SHINY_ODDS = 4096
+
     ########## Properties ##########
     @property
     def natl_id(self):
@@ -147,7 +216,8 @@ class Pokemon:
         This is a location code that defines a specific locale within the
         pokemon world where this pokemon was first encountered by its original
         trainer. This code may not be human readable; the human readable name
-        can be obtained by using this code with the PokeEarth interface.
+        can be obtained by using this code with the PokeEarth interface, see
+        :meth:`pokeearth.PokeEarth.name`.
 
         This locale is in refernce to the original trainer of this pokemon, not
         the currently owning trainer. Should be left None for wild pokemon.
@@ -174,10 +244,26 @@ class Pokemon:
 
     @level.setter
     def level(self, level):
-        if level > 100 or < 1:
+        if level > 100 or level < 1:
             raise ValueError("Pokemon's level must be between 1 and 100.")
         else:
-            self._level = level
+            self._set_exp(experience.exp_for_level(self._growth_rate, level),
+                          level)
+
+    @property
+    def exp(self):
+        """The total experience points of the pokemon.
+
+        Experience determines the level of the pokemon, according to the
+        growth rate of its species. Setting the level directly resets the
+        experience to the least needed for that level.
+        """
+        return self._exp
+
+    @property
+    def growth_rate(self):
+        """The experience growth rate of the pokemon species."""
+        return self._growth_rate
 
     @property
     def status(self):
@@ -189,13 +275,17 @@ class Pokemon:
 
     @status.setter
     def status(self, status):
-        ###--TO DO--###
-        # flesh out status system
+        previous = self._status
         self._status = status
+        if self.events and status != previous:
+            if status is None:
+                self.events.emit(events.STATUS_CURED, self, status=previous)
+            else:
+                self.events.emit(events.STATUS, self, status=status)
 
     @status.deleter
     def status(self):
-        self._status = None
+        self.status = None
 
     @property
     def hidden_status(self):
@@ -209,13 +299,19 @@ class Pokemon:
 
     @hidden_status.setter
     def hidden_status(self, hidden_status):
-        ###--TO DO--###
-        # flesh out status system
+        previous = self._hidden_status
         self._hidden_status = hidden_status
+        if self.events and hidden_status != previous:
+            if hidden_status is None:
+                self.events.emit(events.HIDDEN_STATUS_CURED, self,
+                                 status=previous)
+            else:
+                self.events.emit(events.HIDDEN_STATUS, self,
+                                 status=hidden_status)
 
     @hidden_status.deleter
     def hidden_status(self):
-        self._hidden_status = None
+        self.hidden_status = None
 
     @property
     def pokerus(self):
@@ -283,6 +379,11 @@ class Pokemon:
         self._stats["cur_HP"] = cur_HP
         self._check_fainted()
 
+    @property
+    def fainted(self):
+        """True if the pokemon has no health left; otherwise false."""
+        return self._fainted
+
     @property
     def attack(self):
         """The attack value of the pokemon."""
@@ -349,7 +450,7 @@ class Pokemon:
             iv_sp_attack    -- the special attack iv of the pokemon
             iv_sp_defense   -- the special defense iv of the pokemon
             iv_speed        -- the speed iv of the pokemon
-        All ivs must be at least 1, maxed out at 31. The ivs property returns a
+        All ivs must be at least 0, maxed out at 31. The ivs property returns a
         copy of the ivs dictionary; it cannot be used to modify the pokemon's
         ivs directly.
         """
@@ -373,6 +474,39 @@ class Pokemon:
         """
         return self._evs.copy()
 
+    @property
+    def ability(self):
+        """The ability of the pokemon."""
+        return self._ability
+
+    @property
+    def moves(self):
+        """A list of the usable moves of the pokemon.
+
+        The moves property returns a copy of the moves list; it cannot be used
+        to modify the pokemon's moves directly.
+        """
+        return list(self._moves)
+
+    @property
+    def happiness(self):
+        """The happiness value of the pokemon."""
+        return self._happiness
+
+    @property
+    def nature(self):
+        """The nature of the pokemon.
+
+        Most natures raise one stat by 10% and lower another by 10%. The nature
+        of a pokemon is determined at birth and cannot change.
+        """
+        return self._nature
+
+    @property
+    def gender(self):
+        """The gender of the pokemon; "male", "female", or None if genderless."""
+        return self._gender
+
     @property
     def shiny(self):
         """Determine if the pokemon is shiny.
@@ -385,28 +519,96 @@ class Pokemon:
     ########## Class/Static Methods ##########
     @staticmethod
     def _iv_checker(iv):
-        return True if (iv >= 1 and iv <= 31) else False
+        return True if (iv >= 0 and iv <= 31) else False
+
+    @staticmethod
+    def pack_ivs(ivs):
+        """Pack a dictionary of ivs into a single 30 bit integer.
+
+        Each iv takes 5 bits, in the order of IV_NAMES from the lowest bits.
+        """
+        packed = 0
+        for shift, iv_name in enumerate(Pokemon.IV_NAMES):
+            packed |= ivs[iv_name] << (shift * Pokemon.IV_BITS)
+        return packed
+
+    @staticmethod
+    def unpack_ivs(packed):
+        """Unpack a 30 bit integer made by pack_ivs into a dictionary of ivs."""
+        mask = (1 << Pokemon.IV_BITS) - 1
+        return {iv_name: (packed >> (shift * Pokemon.IV_BITS)) & mask
+                for shift, iv_name in enumerate(Pokemon.IV_NAMES)}
+
+    @staticmethod
+    def calculate_stats(base_stats, ivs, evs, level, nature):
+        """Calculate the stats of a pokemon.
+
+        base_stats should be the base stats of a Pokedex entry, keyed by its
+        stat names (e.g. "hp", "sp_attack"). ivs and evs should be keyed the
+        same way as the ivs and evs properties. Returns a dictionary of stats
+        keyed the same way as the stats property, at full health.
+        """
+        modifiers = dict.fromkeys(Pokemon.NATURE_STATS, 1.0)
+        raised, lowered = divmod(Pokemon.NATURES.index(nature), 5)
+        if raised != lowered:
+            modifiers[Pokemon.NATURE_STATS[raised]] = 1.1
+            modifiers[Pokemon.NATURE_STATS[lowered]] = 0.9
+        stats = {}
+        for stat, ev_name in Pokemon.EV_NAMES.items():
+            iv_name = "iv" + ev_name[2:]
+            value = 2 * base_stats[stat] + ivs[iv_name] + evs[ev_name] // 4
+            value = value * level // 100
+            if stat == "hp":
+                stats["max_HP"] = stats["cur_HP"] = value + level + 10
+            else:
+                stats[stat] = int((value + 5) * modifiers[stat])
+        return stats
+
+    @classmethod
+    def from_entry(cls, entry, level=1, ivs=None, nature=None, gender=None,
+                   shiny=None, ability=None, **kwargs):
+        """Create a new pokemon of the species described by a Pokedex entry.
+
+        Stats are calculated from the species' base stats, and the pokemon
+        knows the last 4 moves it would have learned by levelling up. Any ivs,
+        nature or shininess not given are determined randomly. If no ability is
+        given, the first standard ability of the species is used. Any further
+        keyword arguments are passed to the constructor.
+        """
+        if ivs == None:
+            ivs = cls.unpack_ivs(
+                random.getrandbits(cls.IV_BITS * len(cls.IV_NAMES)))
+        if nature == None:
+            nature = random.choice(cls.NATURES)
+        if ability == None:
+            ability = entry["abilities"][0]
+        evs = dict.fromkeys(cls.EV_NAMES.values(), 0)
+        stats = cls.calculate_stats(entry["base_stats"], ivs, evs, level,
+                                    nature)
+        level_moves = entry["move_set_level"]
+        moves = [move for move_level in sorted(
+                     key for key in level_moves
+                     if isinstance(key, int) and key <= level)
+                 for move in level_moves[move_level]][-4:]
+        return cls(entry["number"], None, entry["name"]["English"],
+                   [poke_type.capitalize() for poke_type in entry["type"]],
+                   stats, moves, ability, ivs=ivs, shiny=shiny, level=level,
+                   growth_rate=entry["experience_growth"], nature=nature,
+                   gender=gender, **kwargs)
 
     ########## Instance Methods ##########
     def _initialize_stats(self, stats, ivs):
         """Initialize the pokemon's stats with a set of given stats and ivs."""
         self._ivs = {}
         if ivs == None:
-            ###--TO DO--###
-            # create a process to randomly generate ivs if not given
-            self._ivs = {"iv_max_HP": 15, "iv_attack": 15,
-                         "iv_defense": 15, "iv_sp_attack": 15,
-                         "iv_sp_defense": 15, "iv_speed": 15}
+            self._ivs = self.unpack_ivs(
+                random.getrandbits(self.IV_BITS * len(self.IV_NAMES)))
         else:
-            iv_names = ["iv_max_HP", "iv_attack", "iv_defense",
-                        "iv_sp_attack", "iv_sp_defense", "iv_speed"]
-            for iv_name in iv_names:
+            for iv_name in self.IV_NAMES:
                 if iv_name not in ivs:
                     raise ValueError(f"iv {iv_name} not found")
                 elif ivs[iv_name] == None:
-                    ###--TO DO--###
-                    # create a process to randomly generate ivs if not given
-                    self._ivs[iv_name] = 15
+                    self._ivs[iv_name] = random.getrandbits(self.IV_BITS)
                 elif not Pokemon._iv_checker(ivs[iv_name]):
                     raise ValueError(f"Inappropriate value for ivs; "
                     f"{iv_name}: {ivs[iv_name]}")
@@ -433,35 +635,72 @@ class Pokemon:
         self._evs["ev_sp_defense"] = 0
         self._evs["ev_speed"] = 0
 
+    def _set_exp(self, exp, level):
+        """Set the total experience of the pokemon, and its matching level."""
+        self._exp = exp
+        self._level = level
+
+    def gain_exp(self, amount):
+        """Add experience to the pokemon, levelling it up if needed.
+
+        Returns the number of levels gained. Experience is capped at the amount
+        needed for level 100.
+        """
+        exps, levels = experience.gain_exp(self._growth_rate, [self._exp],
+                                           amount)
+        levels_gained = levels[0] - self._level
+        self._set_exp(exps[0], levels[0])
+        return levels_gained
+
+    def gain_evs(self, evs):
+        """Add effort values to the pokemon.
+
+        evs should be a dictionary of stat names to the effort values gained,
+        using the stat names of a Pokedex entry's ev yield (e.g. "hp",
+        "sp_attack"). Gains are doubled if the pokemon has ever had pokerus.
+        Each ev is capped at 255, and the total of all evs at 510.
+        """
+        multiplier = 1 if self._pokerus is None else 2
+        total = sum(self._evs.values())
+        for stat, amount in evs.items():
+            ev_name = Pokemon.EV_NAMES[stat]
+            amount = min(amount * multiplier, 255 - self._evs[ev_name],
+                         Pokemon.MAX_EV_TOTAL - total)
+            if amount > 0:
+                self._evs[ev_name] += amount
+                total += amount
+
     def _check_fainted(self):
         # used to check if fainted status changed
         previous_state = self._fainted
-        if self._cur_HP == 0:
+        if self.cur_HP == 0:
             self._fainted = True
-            if self._fainted != previous_state:
-                print(f"{self._name} has fainted.")
+            if self._fainted != previous_state and self.events:
+                self.events.emit(events.FAINT, self)
         else:
             self._fainted = False
-            if self._fainted != previous_state:
-                print(f"{self._name} has been revived.")
+            if self._fainted != previous_state and self.events:
+                self.events.emit(events.REVIVE, self)
 
     def lose_health(self, damage):
-        if damage >= self._cur_HP:
-            self._cur_HP = 0
+        if damage >= self.cur_HP:
+            self._stats["cur_HP"] = 0
         else:
-            self._cur_HP -= damage
-        print(f"{self._name} has taken {damage} points of damage. "
-              f"Current HP is {self._cur_HP}")
+            self._stats["cur_HP"] -= damage
+        if self.events:
+            self.events.emit(events.DAMAGE, self, amount=damage,
+                             cur_HP=self.cur_HP)
         self._check_fainted()
 
-    def gain_health(health):
-        if health + self._cur_HP >= self._max_HP:
-            self._cur_HP = self._max_HP
+    def gain_health(self, health):
+        if health + self.cur_HP >= self.max_HP:
+            self._stats["cur_HP"] = self.max_HP
         else:
-            self._cur_HP += health
+            self._stats["cur_HP"] += health
         self._check_fainted()
-        print(f"{self._name} has been restored {health} points of health. "
-              f"Current HP is {self._cur_HP}")
+        if self.events:
+            self.events.emit(events.HEAL, self, amount=health,
+                             cur_HP=self.cur_HP)
 
     def launch_attack(self, other_pokemon):
         pass
@@ -491,3 +730,23 @@ class Pokemon:
         """
         if self._pokerus == None:
             self._pokerus = True
+            if self.events:
+                self.events.emit(events.POKERUS, self)
+
+    def pokerus_cure(self):
+        """Cure the pokemon of pokerus.
+
+        Only a currently infected pokemon is cured; once cured, it can no
+        longer spread the virus or be infected again.
+        """
+        if self._pokerus == True:
+            self._pokerus = False
+
+    def _set_pokerus(self, pokerus):
+        """Internal method for setting the pokerus state when a saved state is
+        restored. Unlike :meth:`pokerus_infect` and :meth:`pokerus_cure`, it
+        can undo an infection or a cure, and it publishes no event.
+        """
+        if pokerus not in (None, True, False):
+            raise ValueError(f"Improper value for pokerus: {pokerus}")
+        self._pokerus = pokerus
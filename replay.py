@@ -0,0 +1,263 @@
+"""Contains classes for recording battles to logs and replaying them.
+
+A battle log is a JSON lines file. Each line is an object whose "type" is one
+of:
+    header   -- the first line. Holds the log version, the seed and starting
+                weather of the battle, and the full details of both teams
+    turn     -- one line for each turn played. Holds the turn number, the name
+                of the move chosen by each side (or null), and the
+                (side, move name, status code) results of the turn
+    snapshot -- the state of the battle after a turn, as given by
+                :meth:`battle.Battle.snapshot`, along with the pp left of every
+                move used so far. Written every few turns
+
+Battles are deterministic given their seed, teams and chosen moves, so a log
+only needs the choices to be replayed. Snapshots let a replay jump to any turn
+by restoring the latest snapshot at or before it and only playing the turns
+after that snapshot.
+"""
+from bisect import bisect_right
+import json
+import random
+
+from battle import Battle
+from pokemon import Pokemon
+
+LOG_VERSION = 1
+# turns played between snapshots, by default
+SNAPSHOT_INTERVAL = 10
+
+
+def pokemon_to_dict(pokemon):
+    """Convert a pokemon into a dict that can be stored as JSON.
+
+    :param pokemon: The pokemon to convert.
+    :type pokemon: :class:'pokemon.Pokemon'
+
+    :rtype: dict
+    """
+    return {"natl_id": pokemon.natl_id, "location": pokemon.location,
+            "name": pokemon.name, "types": list(pokemon.types),
+            "stats": pokemon.stats, "moves": pokemon.moves,
+            "ability": pokemon.ability, "happiness": pokemon.happiness,
+            "ivs": pokemon.ivs, "shiny": pokemon.shiny, "level": pokemon.level,
+            "ot": pokemon.original_trainer,
+            "ot_id": pokemon.original_trainer_id,
+            "growth_rate": pokemon.growth_rate, "exp": pokemon.exp,
+            "nature": pokemon.nature, "gender": pokemon.gender,
+            "evs": pokemon.evs, "pokerus": pokemon.pokerus,
+            "status": pokemon.status, "hidden_status": pokemon.hidden_status}
+
+
+def pokemon_from_dict(info):
+    """Create a pokemon from a dict made by :func:`pokemon_to_dict`.
+
+    :rtype: :class:'pokemon.Pokemon'
+    """
+    info = dict(info)
+    status = info.pop("status")
+    hidden_status = info.pop("hidden_status")
+    pokemon = Pokemon(info.pop("natl_id"), info.pop("location"),
+                      info.pop("name"), info.pop("types"), info.pop("stats"),
+                      info.pop("moves"), info.pop("ability"), **info)
+    pokemon.status = status
+    pokemon.hidden_status = hidden_status
+    return pokemon
+
+
+class BattleRecorder:
+    """Plays a battle and records it to a battle log.
+
+    Every move passed to :meth:`turn` should start with full pp and be used
+    by only one pokemon, as the replayer creates a fresh move for each move
+    of each pokemon.
+    """
+
+    def __init__(self, path, side_a, side_b, seed=None, weather=None,
+                 snapshot_interval=SNAPSHOT_INTERVAL, bus=None):
+        """Start recording a new battle.
+
+        :param path: The path of the log to write.
+        :type path: str or path-like object
+        :param side_a: The pokemon of side 0.
+        :param side_b: The pokemon of side 1.
+        :param seed: The seed of the battle. If None, a random seed is chosen
+            and recorded.
+        :type seed: int, optional
+        :param weather: The weather at the start of the battle.
+        :type weather: str, optional
+        :param snapshot_interval: Turns played between snapshots.
+        :type snapshot_interval: int
+        :param bus: The bus to publish battle events to.
+        :type bus: :class:'events.EventBus', optional
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._interval = snapshot_interval
+        self._fh = open(path, "w")
+        self._write({"type": "header", "version": LOG_VERSION, "seed": seed,
+                     "weather": weather,
+                     "teams": [[pokemon_to_dict(pokemon) for pokemon in side]
+                               for side in (side_a, side_b)]})
+        self.battle = Battle(side_a, side_b, seed, bus, weather)
+        # moves used so far, keyed by (side, pokemon index, move name)
+        self._moves = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Finish the log. No more turns can be recorded after closing."""
+        self._fh.close()
+
+    def _write(self, record):
+        """Internal method for writing a single line of the log."""
+        self._fh.write(json.dumps(record, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def turn(self, move_a, move_b):
+        """Play and record a single turn of the battle.
+
+        Takes the same arguments, and returns the same results, as
+        :meth:`battle.Battle.turn`.
+        """
+        battle = self.battle
+        for side, move in enumerate((move_a, move_b)):
+            if move is not None:
+                self._moves[side, battle.active_index(side), move.name] = move
+        results = battle.turn(move_a, move_b)
+        self._write({"type": "turn", "turn": battle.turn_number,
+                     "choices": [None if move is None else move.name
+                                 for move in (move_a, move_b)],
+                     "results": results})
+        if battle.over or battle.turn_number % self._interval == 0:
+            self._write(_snapshot(battle, self._moves))
+        return results
+
+
+def _snapshot(battle, moves):
+    """Internal function for the snapshot record of a battle."""
+    record = battle.snapshot()
+    record["type"] = "snapshot"
+    record["pp"] = [[side, index, name, move.pp_cur]
+                    for (side, index, name), move in moves.items()]
+    return record
+
+
+class Replay:
+    """A recorded battle that can be replayed to any turn."""
+
+    def __init__(self, path, move_loader):
+        """Read a battle log.
+
+        :param path: The path of the log.
+        :type path: str or path-like object
+        :param move_loader: A function called with the name of a move that
+            returns a new :class:`moves.Move` with full pp.
+        :type move_loader: callable
+        """
+        self._move_loader = move_loader
+        self._turns = list()
+        self._snapshots = dict()
+        with open(path) as fh:
+            self._header = json.loads(fh.readline())
+            if self._header.get("type") != "header":
+                raise ValueError("File is not a battle log.")
+            if self._header["version"] != LOG_VERSION:
+                raise ValueError("Unsupported battle log version: "
+                                 f"{self._header['version']}")
+            for line in fh:
+                record = json.loads(line)
+                if record["type"] == "turn":
+                    self._turns.append(record)
+                elif record["type"] == "snapshot":
+                    self._snapshots[record["turn"]] = record
+        self._snapshot_turns = sorted(self._snapshots)
+
+    def __len__(self):
+        """The number of turns recorded."""
+        return len(self._turns)
+
+    @property
+    def seed(self):
+        """The seed of the recorded battle."""
+        return self._header["seed"]
+
+    def choices(self, turn):
+        """The names of the moves chosen by each side on a turn."""
+        return tuple(self._turns[turn - 1]["choices"])
+
+    def results(self, turn):
+        """The recorded results of a turn, as returned by
+        :meth:`battle.Battle.turn`."""
+        return [tuple(result) for result in self._turns[turn - 1]["results"]]
+
+    def _new_battle(self):
+        """Internal method for setting up the battle before its first turn."""
+        sides = [[pokemon_from_dict(info) for info in team]
+                 for team in self._header["teams"]]
+        return Battle(*sides, seed=self._header["seed"],
+                      weather=self._header["weather"])
+
+    def _play(self, battle, moves, turn):
+        """Internal method for playing a recorded turn."""
+        chosen = list()
+        for side, name in enumerate(self._turns[turn - 1]["choices"]):
+            if name is None:
+                chosen.append(None)
+                continue
+            key = (side, battle.active_index(side), name)
+            try:
+                chosen.append(moves[key])
+            except KeyError:
+                moves[key] = self._move_loader(name)
+                chosen.append(moves[key])
+        return battle.turn(*chosen)
+
+    def battle_at(self, turn):
+        """Reconstruct the battle as it was after a turn.
+
+        The battle is restored from the latest snapshot at or before the turn,
+        and only the turns after the snapshot are played.
+
+        :param turn: The turn number, or 0 for the start of the battle.
+        :type turn: int
+
+        :return: The battle, and the moves used so far keyed by
+            (side, pokemon index, move name).
+        :rtype: tuple
+        """
+        if not 0 <= turn <= len(self._turns):
+            raise IndexError(f"Improper value for turn: {turn}")
+        battle = self._new_battle()
+        moves = dict()
+        position = bisect_right(self._snapshot_turns, turn)
+        if position:
+            snapshot = self._snapshots[self._snapshot_turns[position - 1]]
+            battle.restore(snapshot)
+            for side, index, name, pp in snapshot["pp"]:
+                moves[side, index, name] = self._move_loader(name)
+                moves[side, index, name].pp_cur = pp
+        for played in range(battle.turn_number + 1, turn + 1):
+            self._play(battle, moves, played)
+        return battle, moves
+
+    def verify(self):
+        """Replay the whole battle, checking it against the log.
+
+        Replaying after a change to moves or battle effects shows whether the
+        recorded battle still plays out the same way.
+
+        :return: The first turn whose results differ from the log, or None if
+            every turn matches.
+        :rtype: int
+        """
+        battle = self._new_battle()
+        moves = dict()
+        for turn in range(1, len(self._turns) + 1):
+            if self._play(battle, moves, turn) != self.results(turn):
+                return turn
+        return None
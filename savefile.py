@@ -0,0 +1,229 @@
+"""Contains functions and classes for saving pokemon to binary save files.
+
+A save file holds a list of pokemon, such as a team or the contents of a
+storage box, in the following layout (all values little-endian):
+
+    header        -- magic bytes, format version, record size, record count,
+                     string count, and the offset of the string table
+    records       -- one fixed-width record for each pokemon. Strings, such as
+                     names and moves, are stored as ids into the string table
+    string table  -- the offset of each string relative to the start of the
+                     string data, followed by the UTF-8 string data
+
+Since every record has the same width and strings can be found by id, a save
+file opened with :class:`SaveFile` is memory-mapped and only the records and
+strings actually accessed are ever decoded.
+"""
+import mmap
+import os
+import struct
+
+from box import PokemonBox, STAT_NAMES
+import experience
+from pokemon import Pokemon
+
+MAGIC = b"PKSV"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIQ")
+# species, name, 2 types, ability, 4 moves, location, original trainer,
+# original trainer id, status; level, growth rate, nature, happiness, flags;
+# exp, packed ivs; 6 evs; 7 stats
+_RECORD = struct.Struct("<13I5B2I6B7H")
+_OFFSET = struct.Struct("<I")
+
+# string id stored for a missing string
+NO_STRING = 0
+# value stored for a missing original trainer id
+NO_TRAINER_ID = 0xFFFFFFFF
+
+# positions of single fields within an unpacked record
+_SPECIES = 0
+_NAME = 1
+_LEVEL = 13
+_FLAGS = 17
+
+
+def write(path, pokemon):
+    """Write pokemon to a save file.
+
+    The file is written to a temporary file first and moved into place, so an
+    existing save file is never left partially written.
+
+    :param path: The path of the save file to write.
+    :type path: str or path-like object
+    :param pokemon: The pokemon to save, in slot order. Any objects with the
+        properties of a :class:`pokemon.Pokemon` can be saved, including
+        :class:`box.BoxedPokemon` views.
+    :type pokemon: iterable
+    """
+    strings = [None]
+    string_ids = dict()
+
+    def string_id(string):
+        if string is None:
+            return NO_STRING
+        try:
+            return string_ids[string]
+        except KeyError:
+            string_ids[string] = len(strings)
+            strings.append(string)
+            return string_ids[string]
+
+    records = list()
+    for mon in pokemon:
+        types = list(mon.types) + [None] * (2 - len(mon.types))
+        moves = list(mon.moves) + [None] * (4 - len(mon.moves))
+        ot_id = mon.original_trainer_id
+        stats = mon.stats
+        evs = mon.evs
+        records.append(_RECORD.pack(
+            string_id(str(mon.natl_id)), string_id(mon.name),
+            *[string_id(poke_type) for poke_type in types],
+            string_id(mon.ability), *[string_id(move) for move in moves],
+            string_id(mon.location), string_id(mon.original_trainer),
+            NO_TRAINER_ID if ot_id is None else ot_id, string_id(mon.status),
+            mon.level, experience.GROWTH_RATES.index(mon.growth_rate),
+            Pokemon.NATURES.index(mon.nature), mon.happiness,
+            PokemonBox._pack_flags(mon),
+            mon.exp, Pokemon.pack_ivs(mon.ivs),
+            *[evs["ev" + iv_name[2:]] for iv_name in Pokemon.IV_NAMES],
+            *[stats[stat] for stat in STAT_NAMES]))
+
+    encoded = [string.encode() for string in strings[1:]]
+    offsets = [0]
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    string_table_offset = _HEADER.size + _RECORD.size * len(records)
+    header = _HEADER.pack(MAGIC, VERSION, _RECORD.size, len(records),
+                          len(encoded), string_table_offset)
+
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as fh:
+        fh.write(header)
+        fh.writelines(records)
+        fh.writelines(_OFFSET.pack(offset) for offset in offsets)
+        fh.writelines(encoded)
+    os.replace(temp_path, path)
+
+
+class SaveFile:
+    """A memory-mapped, read-only save file.
+
+    Pokemon are read by slot; only the record of the requested slot, and the
+    strings it refers to, are decoded.
+    """
+
+    def __init__(self, path):
+        """Open a save file.
+
+        :param path: The path of the save file.
+        :type path: str or path-like object
+        """
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, record_size, self._count, string_count,
+             self._string_table) = _HEADER.unpack_from(self._map)
+        except struct.error:
+            self.close()
+            raise ValueError("File is not a pokemon save file.") from None
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("File is not a pokemon save file.")
+        if version != VERSION or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"Unsupported save file version: {version}")
+        # string data starts after the string offsets
+        self._string_data = (self._string_table
+                             + _OFFSET.size * (string_count + 1))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the save file. No pokemon can be read after closing."""
+        self._map.close()
+
+    def __len__(self):
+        """The number of pokemon in the save file."""
+        return self._count
+
+    def __getitem__(self, slot):
+        """Read the pokemon in a slot.
+
+        A new :class:`pokemon.Pokemon` is created on every access.
+
+        :param slot: The slot of the pokemon.
+        :type slot: int
+
+        :rtype: :class:'pokemon.Pokemon'
+        """
+        return self._to_pokemon(self._record(slot))
+
+    def __iter__(self):
+        """Iterate over the pokemon in the save file, reading each lazily."""
+        return (self[slot] for slot in range(self._count))
+
+    def _record(self, slot):
+        """Internal method for unpacking the record of a slot."""
+        if not 0 <= slot < self._count:
+            raise IndexError(f"Improper value for save file slot: {slot}")
+        return _RECORD.unpack_from(self._map,
+                                   _HEADER.size + _RECORD.size * slot)
+
+    def _string(self, string_id):
+        """Internal method for reading a string by id."""
+        if string_id == NO_STRING:
+            return None
+        start, end = struct.unpack_from(
+            "<2I", self._map, self._string_table + _OFFSET.size * (string_id - 1))
+        return self._map[self._string_data + start:
+                         self._string_data + end].decode()
+
+    def summary(self, slot):
+        """Read only the details of a pokemon needed to list it.
+
+        :param slot: The slot of the pokemon.
+        :type slot: int
+
+        :return: A dict with the natl_id, name, level and shiny state of the
+            pokemon.
+        :rtype: dict
+        """
+        record = self._record(slot)
+        return {"natl_id": self._string(record[_SPECIES]),
+                "name": self._string(record[_NAME]),
+                "level": record[_LEVEL],
+                "shiny": PokemonBox._unpack_flags(record[_FLAGS])[0]}
+
+    def _to_pokemon(self, record):
+        """Internal method for creating a pokemon from an unpacked record."""
+        string = self._string
+        (species, name, type_1, type_2, ability, move_1, move_2, move_3,
+         move_4, location, ot, ot_id, status, level, growth_rate, nature,
+         happiness, flags, exp, ivs) = record[:20]
+        evs = record[20:20 + len(Pokemon.IV_NAMES)]
+        stats = record[20 + len(Pokemon.IV_NAMES):]
+        shiny, gender, pokerus = PokemonBox._unpack_flags(flags)
+        pokemon = Pokemon(
+            string(species), string(location), string(name),
+            [string(type_id) for type_id in (type_1, type_2) if type_id],
+            dict(zip(STAT_NAMES, stats)),
+            [string(move_id) for move_id in (move_1, move_2, move_3, move_4)
+             if move_id],
+            string(ability), happiness=happiness,
+            ivs=Pokemon.unpack_ivs(ivs), shiny=shiny,
+            level=level, ot=string(ot),
+            ot_id=None if ot_id == NO_TRAINER_ID else ot_id,
+            growth_rate=experience.GROWTH_RATES[growth_rate], exp=exp,
+            nature=Pokemon.NATURES[nature],
+            gender=gender,
+            evs={"ev" + iv_name[2:]: ev
+                 for iv_name, ev in zip(Pokemon.IV_NAMES, evs)},
+            pokerus=pokerus)
+        pokemon.status = string(status)
+        return pokemon
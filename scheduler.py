@@ -0,0 +1,125 @@
+"""Contains classes and functions for scheduling battle actions and battles.
+
+:class:`TurnScheduler` orders the actions of a turn, for any number of
+pokemon on the field, with a heap. :func:`run_battles` plays many battles
+concurrently in a single asyncio event loop, so battles waiting on their
+players (such as clients in network mode) do not each need a thread.
+"""
+import asyncio
+import heapq
+import inspect
+from itertools import count
+
+
+class TurnScheduler:
+    """A priority queue of the actions of a turn.
+
+    Actions are taken in order of highest priority, then highest speed. Ties
+    are broken randomly.
+    """
+
+    def __init__(self, rng):
+        """Constructor for the TurnScheduler class.
+
+        :param rng: The random generator used to break ties.
+        :type rng: :class:'random.Random'
+        """
+        self._rng = rng
+        self._heap = list()
+        # insertion order, so actions themselves are never compared
+        self._counter = count()
+
+    def __len__(self):
+        """The number of actions left to take."""
+        return len(self._heap)
+
+    def push(self, action, priority, speed):
+        """Add an action to the turn.
+
+        :param action: The action to schedule; any object.
+        :param priority: The priority of the action, such as the priority of
+            a move.
+        :type priority: int
+        :param speed: The speed of the pokemon taking the action.
+        :type speed: int
+        """
+        heapq.heappush(self._heap, (-priority, -speed, self._rng.random(),
+                                    next(self._counter), action))
+
+    def pop(self):
+        """Remove and return the next action to take.
+
+        :raises IndexError: If no actions are left.
+        """
+        return heapq.heappop(self._heap)[-1]
+
+    def __iter__(self):
+        """Take every action left, in order."""
+        while self._heap:
+            yield self.pop()
+
+
+async def _choose(chooser, battle, side):
+    """Internal function for calling a chooser that may be a coroutine."""
+    choice = chooser(battle, side)
+    if inspect.isawaitable(choice):
+        choice = await choice
+    return choice
+
+
+async def play_battle(battle, choose_a, choose_b, max_turns=None):
+    """Play a battle to the end.
+
+    Both sides choose their moves concurrently each turn. The event loop is
+    given a chance to run other battles after every turn.
+
+    :param battle: The battle to play.
+    :type battle: :class:'battle.Battle'
+    :param choose_a: A function called as choose_a(battle, 0) that returns
+        the move for side 0, or a coroutine function returning it.
+    :type choose_a: callable
+    :param choose_b: As choose_a, for side 1.
+    :type choose_b: callable
+    :param max_turns: The most turns to play. If reached, the battle is left
+        unfinished.
+    :type max_turns: int, optional
+
+    :return: The winning side, or None if the battle is unfinished or a
+        draw.
+    :rtype: int
+    """
+    while not battle.over:
+        if max_turns is not None and battle.turn_number >= max_turns:
+            break
+        move_a, move_b = await asyncio.gather(
+            _choose(choose_a, battle, 0), _choose(choose_b, battle, 1))
+        battle.turn(move_a, move_b)
+        await asyncio.sleep(0)
+    return battle.winner
+
+
+async def run_battles(matches, limit=None, max_turns=None):
+    """Play many battles concurrently.
+
+    :param matches: (battle, choose_a, choose_b) for each battle, as taken by
+        :func:`play_battle`.
+    :type matches: iterable of tuples
+    :param limit: The most battles played at once. If None, every battle is
+        started at once.
+    :type limit: int, optional
+    :param max_turns: The most turns to play of each battle.
+    :type max_turns: int, optional
+
+    :return: The winner of each battle, in the order given. None stands for
+        an unfinished battle or a draw.
+    :rtype: list
+    """
+    semaphore = None if limit is None else asyncio.Semaphore(limit)
+
+    async def play(battle, choose_a, choose_b):
+        if semaphore is None:
+            return await play_battle(battle, choose_a, choose_b, max_turns)
+        async with semaphore:
+            return await play_battle(battle, choose_a, choose_b, max_turns)
+
+    return await asyncio.gather(*(play(*match) for match in matches))
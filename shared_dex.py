@@ -0,0 +1,418 @@
+"""Contains a Pokedex, Itemdex and move table shared between processes.
+
+The parent process loads the dexes once and publishes them with
+:func:`publish` into a single block of :mod:`multiprocessing.shared_memory`:
+the id of every entry as a string table, every entry serialized on its own,
+and every sort order, sort rank, numeric index and list field index as a raw
+array. Worker processes :func:`attach` to the block by name. Arrays are used
+in place through memoryviews of the block and entries are only deserialized
+when they are read, so attaching takes milliseconds and the dex data is in
+memory once however many workers there are.
+
+Attached dexes are read-only copies: changes to their entries are not seen
+by other processes.
+"""
+from array import array
+import functools
+import json
+from multiprocessing import resource_tracker, shared_memory
+import pickle
+import struct
+import threading
+
+from dex_db import ENTRY_CACHE_SIZE, LazyEntryMap
+from dex_entry import DexEntry
+from dex_view import DexView
+from itemdex import Itemdex, ItemEntry
+import moves
+from pokedex import Pokedex, PokeEntry
+
+# first bytes of a published block, and the version of its layout
+MAGIC = b"PKDEXSHM"
+LAYOUT_VERSION = 1
+# magic, layout version and manifest length at the start of a block
+_HEADER = struct.Struct("<8sII")
+# sections are aligned for any array typecode
+_ALIGNMENT = 8
+# held while this module creates or attaches to a block, since attaching
+# before Python 3.13 replaces the resource tracker's register function
+_TRACKER_LOCK = threading.Lock()
+
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class _Writer:
+    """Internal collector of the sections of a block being published."""
+
+    def __init__(self):
+        self._parts = list()
+        self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    def add(self, data):
+        """Add a section of bytes.
+
+        :return: (offset, length) of the section, from the first section.
+        :rtype: list
+        """
+        data = memoryview(data).cast("B")
+        offset = _align(self._size)
+        self._parts.append((offset, data))
+        self._size = offset + len(data)
+        return [offset, len(data)]
+
+    def add_array(self, values):
+        """Add a section of an array, recording its typecode."""
+        return self.add(values) + [values.typecode]
+
+    def add_table(self, items):
+        """Add a table of byte strings: their offsets, then their bytes."""
+        offsets = array("Q", [0])
+        blob = bytearray()
+        for item in items:
+            blob += item
+            offsets.append(len(blob))
+        return {"offsets": self.add_array(offsets), "blob": self.add(blob)}
+
+    def write(self, buffer, start):
+        for offset, data in self._parts:
+            buffer[start + offset:start + offset + len(data)] = data
+
+
+def _pickled(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _dex_sections(writer, dex, list_fields=()):
+    """Internal function adding the sections of a Pokedex or Itemdex.
+
+    :param list_fields: The fields holding a list of strings to index.
+    """
+    sections = {
+        "ids": writer.add_table(entry_id.encode()
+                                for entry_id in dex._entry_ids),
+        "entries": writer.add_table(
+            _pickled(dex._dex_dict[entry_id]._dex_info)
+            for entry_id in dex._entry_ids),
+        "orders": list(), "numeric": dict(), "lists": dict()}
+    for key in dex.SORT_KEYS:
+        for reverse in (False, True):
+            rank = dex._sort_rank(key, reverse)
+            sections["orders"].append([
+                key, reverse, writer.add_array(dex._sort_order(key, reverse)),
+                writer.add_array(rank)])
+    for key in getattr(dex, "NUMERIC_KEYS", ()):
+        values, positions = dex._numeric_index(key)
+        sections["numeric"][key] = [writer.add_array(values),
+                                    writer.add_array(positions)]
+    for field in list_fields:
+        # the positions of the entries with each value of the field, so
+        # filters never need to read the entries
+        search_key = dex._search_key(field)
+        found = dict()
+        for position, entry_id in enumerate(dex._entry_ids):
+            for value in set(search_key(dex._dex_dict[entry_id])):
+                found.setdefault(value, array(DexView.INDEX_TYPE)).append(
+                    position)
+        sections["lists"][field] = {value: writer.add_array(positions)
+                                    for value, positions in found.items()}
+    return sections
+
+
+def publish(pokedex=None, itemdex=None, move_table=None, name=None):
+    """Publish dexes into a new block of shared memory.
+
+    Every sort order of the dexes is computed first, so workers never need
+    to compute one.
+
+    :param pokedex: The Pokedex to publish.
+    :type pokedex: :class:'pokedex.Pokedex', optional
+    :param itemdex: The Itemdex to publish.
+    :type itemdex: :class:'itemdex.Itemdex', optional
+    :param move_table: The compiled info of each move, keyed by name, as
+        returned by :func:`moves.load_moves`.
+    :type move_table: dict, optional
+    :param name: The name of the block. If None, a unique name is chosen.
+    :type name: str, optional
+
+    :return: The published data. The block lasts until it is unlinked, so
+        the publisher should use it as a context manager or call
+        :meth:`SharedDexData.unlink` once the workers are done.
+    :rtype: :class:'shared_dex.SharedDexData'
+    """
+    writer = _Writer()
+    manifest = dict()
+    if pokedex is not None:
+        manifest["pokedex"] = _dex_sections(writer, pokedex,
+                                            SharedPokedex._LIST_FIELDS)
+    if itemdex is not None:
+        manifest["itemdex"] = _dex_sections(writer, itemdex)
+    if move_table is not None:
+        manifest["moves"] = {
+            "names": writer.add_table(move_name.encode()
+                                      for move_name in move_table),
+            "infos": writer.add_table(_pickled(info)
+                                      for info in move_table.values())}
+    encoded = json.dumps(manifest).encode()
+    start = _align(_HEADER.size + len(encoded))
+    with _TRACKER_LOCK:
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=max(start + writer.size, 1))
+    _HEADER.pack_into(shm.buf, 0, MAGIC, LAYOUT_VERSION, len(encoded))
+    shm.buf[_HEADER.size:_HEADER.size + len(encoded)] = encoded
+    writer.write(shm.buf, start)
+    return SharedDexData(shm, owner=True)
+
+
+def attach(name):
+    """Attach to dexes published by another process.
+
+    :param name: The name of the block, :attr:`SharedDexData.name` of the
+        published data.
+    :type name: str
+
+    Before Python 3.13, the block is kept from being registered with the
+    resource tracker by replacing the process-wide
+    ``resource_tracker.register`` while attaching. Calls to :func:`publish`
+    and :func:`attach` are serialized with a lock, but shared memory created
+    by other code in another thread during an attach is not registered with
+    the tracker either, so it is not cleaned up if that process exits
+    without unlinking it.
+
+    :raises FileNotFoundError: If there is no block with the name.
+    :raises ValueError: If the block was not published by :func:`publish`.
+
+    :rtype: :class:'shared_dex.SharedDexData'
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 attaching always registers the block with the
+        # resource tracker, which would unlink it when this process exits.
+        # Workers share the tracker of their parent, so unregistering
+        # afterwards would drop the registration of the publisher instead.
+        with _TRACKER_LOCK:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+    return SharedDexData(shm, owner=False)
+
+
+class _Table:
+    """Internal reader of a table written by :meth:`_Writer.add_table`."""
+
+    def __init__(self, data, section):
+        self._offsets = data._array(section["offsets"])
+        self._blob = data._bytes(section["blob"])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+
+class SharedDexData:
+    """Dexes published into a block of shared memory."""
+
+    def __init__(self, shm, owner):
+        """Constructor for the SharedDexData class.
+
+        Shared data is normally created by :func:`publish` or :func:`attach`
+        rather than by calling this constructor directly.
+        """
+        self._shm = shm
+        self._owner = owner
+        self._views = list()
+        magic, version, length = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            shm.close()
+            raise ValueError(f"Shared memory {shm.name} is not a published "
+                             "dex.")
+        manifest = json.loads(bytes(
+            shm.buf[_HEADER.size:_HEADER.size + length]))
+        self._start = _align(_HEADER.size + length)
+        self.pokedex = None
+        self.itemdex = None
+        self.moves = None
+        if "pokedex" in manifest:
+            self.pokedex = SharedPokedex(self, manifest["pokedex"])
+        if "itemdex" in manifest:
+            self.itemdex = SharedItemdex(self, manifest["itemdex"])
+        if "moves" in manifest:
+            self.moves = SharedMoves(self, manifest["moves"])
+
+    @property
+    def name(self):
+        """The name of the block, used by workers to attach to it."""
+        return self._shm.name
+
+    @property
+    def size(self):
+        """The size of the block, in bytes."""
+        return self._shm.size
+
+    def __reduce__(self):
+        # a copy sent to another process attaches to the same block
+        return attach, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def _bytes(self, section):
+        """Internal method for a memoryview of a section of bytes."""
+        offset, length = section[:2]
+        view = self._shm.buf[self._start + offset:
+                             self._start + offset + length]
+        self._views.append(view)
+        return view
+
+    def _array(self, section):
+        """Internal method for a memoryview of a section of an array."""
+        view = self._bytes(section).cast(section[2])
+        self._views.append(view)
+        return view
+
+    def __del__(self):
+        # the block can only be closed once no views of it are left
+        self._release()
+
+    def _release(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+
+    def close(self):
+        """Detach from the block.
+
+        The dexes of this data can't be used once it is closed, and every
+        result read from them that still refers to the block, such as the
+        sort order of a view, must be released first.
+        """
+        self.pokedex = self.itemdex = self.moves = None
+        self._release()
+        self._shm.close()
+
+    def unlink(self):
+        """Free the block once every process has closed it. Only the
+        publisher should unlink."""
+        self._shm.unlink()
+
+
+class _SharedDex:
+    """Internal base of dexes attached from shared memory.
+
+    Subclasses also inherit from the in-memory dex they share, and set
+    _ENTRY_TYPE to its entry class.
+    """
+
+    _ENTRY_TYPE = None
+
+    def __init__(self, data, sections, entry_cache_size=ENTRY_CACHE_SIZE):
+        ids = _Table(data, sections["ids"])
+        self._entry_ids = tuple(bytes(ids[index]).decode()
+                                for index in range(len(ids)))
+        self._entry_positions = {entry_id: position for position, entry_id
+                                 in enumerate(self._entry_ids)}
+        self._entries = _Table(data, sections["entries"])
+        self._dex_dict = LazyEntryMap(self)
+        self._read_entry = functools.lru_cache(entry_cache_size)(
+            self._load_entry)
+        self._sort_orders = dict()
+        self._sort_ranks = dict()
+        for key, reverse, order, rank in sections["orders"]:
+            self._sort_orders[key, reverse] = data._array(order)
+            self._sort_ranks[key, reverse] = data._array(rank)
+        # JSON keys are strings; sort keys are ints
+        self._numeric_indexes = {
+            int(key): (data._array(values), data._array(positions))
+            for key, (values, positions) in sections["numeric"].items()}
+        self._list_indexes = {
+            int(field): {value: data._array(section)
+                         for value, section in found.items()}
+            for field, found in sections["lists"].items()}
+        self._view = DexView(self)
+
+    def _load_entry(self, entry_id):
+        """Internal method for deserializing a single entry."""
+        info = pickle.loads(self._entries[self._entry_positions[entry_id]])
+        entry = self._ENTRY_TYPE.__new__(self._ENTRY_TYPE)
+        DexEntry.__init__(entry, info)
+        return entry
+
+    def _filter_positions(self, field, criteria):
+        """Internal method for finding the entries matching a filter.
+
+        :return: The positions of the matching entries, or None if the filter
+            has no published index.
+        """
+        try:
+            found = self._list_indexes[field]
+        except (KeyError, TypeError):
+            return None
+        if not isinstance(criteria, str):
+            return None
+        # lists only match whole values
+        return found.get(criteria, ())
+
+
+class SharedPokedex(_SharedDex, Pokedex):
+    """A Pokedex attached from shared memory."""
+
+    _ENTRY_TYPE = PokeEntry
+    # fields holding a list of strings, published with an index of the
+    # entries with each value
+    _LIST_FIELDS = (Pokedex.TYPE, Pokedex.ABILITIES, Pokedex.EGG_GROUPS)
+
+
+class SharedItemdex(_SharedDex, Itemdex):
+    """An Itemdex attached from shared memory."""
+
+    _ENTRY_TYPE = ItemEntry
+
+
+class SharedMoves:
+    """A move table attached from shared memory, read like the dict returned
+    by :func:`moves.load_moves`."""
+
+    def __init__(self, data, sections):
+        names = _Table(data, sections["names"])
+        self._positions = {bytes(names[index]).decode(): index
+                           for index in range(len(names))}
+        self._infos = _Table(data, sections["infos"])
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __getitem__(self, name):
+        """The compiled info of a move.
+
+        :rtype: dict
+        """
+        return pickle.loads(self._infos[self._positions[name]])
+
+    def move(self, name):
+        """Create a usable move.
+
+        :rtype: :class:'moves.Move'
+        """
+        return moves.Move.from_info(self[name])
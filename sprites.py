@@ -0,0 +1,252 @@
+"""Contains an on-demand cache of pokemon sprites for the GUI.
+
+Sprites are read from SPRITES_FOLDER the first time they are shown, never at
+startup. Reading a sprite file and preparing its data is done in a worker
+thread of a :class:`gui_worker.TkExecutor`; only the final step, turning the
+data into a Tk image, runs on the Tk thread, since Tk images can not be made
+anywhere else. Loaded sprites are kept in an :class:`LRUCache` bounded by the
+memory their images use, so scrolling through the whole Pokedex never keeps
+more than a screenful or so of sprites alive.
+"""
+from collections import OrderedDict
+import os
+
+SPRITES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "resources", "sprites")
+# memory the cached sprite images may use, in bytes
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# bytes used by each pixel of a decoded image
+BYTES_PER_PIXEL = 4
+
+
+def _sprite_id(natl_id):
+    """Internal function for the part of a sprite file name naming its
+    species, such as "025", or "025-alola" for the national id "25:alola"."""
+    number, _, var_tag = str(natl_id).partition(":")
+    if var_tag:
+        return f"{int(number):03}-{var_tag}"
+    return f"{int(number):03}"
+
+
+def sprite_path(natl_id, shiny=False, folder=SPRITES_FOLDER):
+    """The path of the sprite of a pokemon species.
+
+    Sprites are named by national id, such as "025.png", and "025-shiny.png"
+    for the shiny variant. The variant tag of a national id of the form
+    int:var_tag is added to the name, such as "025-alola.png" for "25:alola".
+
+    :param natl_id: The national pokedex id of the species.
+    :type natl_id: int or str
+    :param shiny: True for the shiny variant of the sprite.
+    :type shiny: bool
+
+    :rtype: str
+    """
+    return os.path.join(
+        folder, f"{_sprite_id(natl_id)}{'-shiny' if shiny else ''}.png")
+
+
+class LRUCache:
+    """A mapping that evicts its least recently used values once the sizes
+    of its values add up to more than a limit."""
+
+    def __init__(self, max_bytes):
+        """Constructor for the LRUCache class.
+
+        :param max_bytes: The most the sizes of the values may add up to.
+        :type max_bytes: int
+        """
+        if max_bytes < 0:
+            raise ValueError("The size limit of a cache can not be negative.")
+        self.max_bytes = max_bytes
+        # value and size of each key, least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Check if a key is cached, without counting as a use of it."""
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        """The sizes of the cached values added up."""
+        return self._bytes
+
+    def get(self, key, default=None):
+        """Get the value of a key, marking it as the most recently used.
+
+        :return: The value, or default if the key is not cached.
+        """
+        try:
+            value, size = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, size):
+        """Cache a value as the most recently used, evicting the least
+        recently used values until the cache is back under its limit.
+
+        A value larger than the whole limit is not cached.
+
+        :param size: The size of the value, in bytes.
+        :type size: int
+        """
+        self.pop(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            evicted, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove a key from the cache.
+
+        :return: The value of the key, or default if it was not cached.
+        """
+        try:
+            value, size = self._entries.pop(key)
+        except KeyError:
+            return default
+        self._bytes -= size
+        return value
+
+    def clear(self):
+        """Remove every value."""
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _read_sprite(path):
+    """Internal function run in a worker thread to read a sprite file."""
+    with open(path, "rb") as sprite_file:
+        return sprite_file.read()
+
+
+def _photo_image(data):
+    """Internal function making a Tk image from the data of a sprite."""
+    import tkinter as tk
+    return tk.PhotoImage(data=data)
+
+
+def _image_bytes(image):
+    """Internal function for the memory a decoded image uses."""
+    return image.width() * image.height() * BYTES_PER_PIXEL
+
+
+class SpriteCache:
+    """Loads pokemon sprites on demand and keeps the recently used ones."""
+
+    def __init__(self, executor, folder=SPRITES_FOLDER,
+                 max_bytes=DEFAULT_MAX_BYTES, make_image=_photo_image,
+                 image_bytes=_image_bytes):
+        """Constructor for the SpriteCache class.
+
+        :param executor: The executor sprite files are read with.
+        :type executor: :class:'gui_worker.TkExecutor'
+        :param folder: The folder the sprites are read from.
+        :type folder: str
+        :param max_bytes: The memory the cached images may use, in bytes.
+        :type max_bytes: int
+        :param make_image: Called on the Tk thread with the data of a sprite
+            file; returns the image to show.
+        :type make_image: callable
+        :param image_bytes: Called with an image; returns the memory it uses.
+        :type image_bytes: callable
+        """
+        self._executor = executor
+        self._folder = folder
+        self._make_image = make_image
+        self._image_bytes = image_bytes
+        self._cache = LRUCache(max_bytes)
+        # callbacks waiting on each sprite being read
+        self._loading = dict()
+        # sprites without a file, never read again
+        self._missing = set()
+
+    @property
+    def cache(self):
+        """The cache of loaded images, keyed by (sprite id, shiny), where the
+        sprite id is the file name of the sprite without its suffixes."""
+        return self._cache
+
+    def cached(self, natl_id, shiny=False):
+        """Get a sprite if it is loaded, without loading it.
+
+        :return: The image, or None if it is not loaded.
+        """
+        return self._cache.get((_sprite_id(natl_id), bool(shiny)))
+
+    def request(self, natl_id, shiny=False, callback=None):
+        """Get a sprite, loading it in the background if it is not cached.
+
+        :param natl_id: The national pokedex id of the species.
+        :type natl_id: int or str
+        :param shiny: True for the shiny variant of the sprite.
+        :type shiny: bool
+        :param callback: Called on the Tk thread with the image once it is
+            loaded, or with None if the sprite has no file. Not called if the
+            sprite is already cached.
+        :type callback: callable, optional
+
+        :return: The image if it is cached; otherwise None.
+        """
+        key = (_sprite_id(natl_id), bool(shiny))
+        image = self._cache.get(key)
+        if image is not None or key in self._missing:
+            return image
+        waiting = self._loading.get(key)
+        loading = waiting is not None
+        if not loading:
+            waiting = self._loading[key] = list()
+        if callback is not None:
+            waiting.append(callback)
+        if not loading:
+            self._executor.submit(
+                _read_sprite, sprite_path(natl_id, shiny, self._folder),
+                callback=lambda data: self._loaded(key, data),
+                errback=lambda error: self._failed(key))
+        return None
+
+    def request_for(self, pokemon, callback=None):
+        """Get the sprite of a pokemon, using its shiny variant if the pokemon
+        is shiny. See :meth:`request`.
+
+        :type pokemon: :class:'pokemon.Pokemon'
+        """
+        return self.request(pokemon.natl_id, pokemon.shiny, callback)
+
+    def prefetch(self, natl_ids, shiny=False):
+        """Start loading sprites that are likely to be shown soon, such as
+        those of the rows next to the visible rows of a list."""
+        for natl_id in natl_ids:
+            self.request(natl_id, shiny)
+
+    def _loaded(self, key, data):
+        """Internal method run on the Tk thread once a sprite is read."""
+        try:
+            image = self._make_image(data)
+        except Exception:
+            self._failed(key)
+            return
+        self._cache.put(key, image, self._image_bytes(image))
+        for callback in self._loading.pop(key, ()):
+            callback(image)
+
+    def _failed(self, key):
+        """Internal method run on the Tk thread if a sprite can't be read."""
+        self._missing.add(key)
+        for callback in self._loading.pop(key, ()):
+            callback(None)
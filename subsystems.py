@@ -0,0 +1,123 @@
+"""Contains the lazily loaded subsystems of the app.
+
+Each :class:`Subsystem` imports its modules and builds its data the first
+time it is used, so starting the app only pays for the subsystems the user
+actually opens. Subsystems can also be loaded ahead of time in a background
+thread, such as while the main window is already shown.
+"""
+import importlib
+import os
+import threading
+import time
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "resources")
+POKEDEX_FILE = os.path.join(RESOURCES, "pokedex", "Pokedex - national.csv")
+ITEMS_FILE = os.path.join(RESOURCES, "items", "items - pokeballs.csv")
+MOVES_FOLDER = os.path.join(RESOURCES, "moves")
+
+
+class Subsystem:
+    """A part of the app that is imported and initialized on first use."""
+
+    def __init__(self, name, modules, init):
+        """Constructor for the Subsystem class.
+
+        :param name: The name of the subsystem.
+        :type name: str
+        :param modules: The names of the modules to import.
+        :type modules: tuple of str
+        :param init: A function called with the imported modules, in order,
+            that returns the loaded subsystem.
+        :type init: callable
+        """
+        self.name = name
+        self._modules = modules
+        self._init = init
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self.import_seconds = None
+        self.init_seconds = None
+
+    @property
+    def loaded(self):
+        """True if the subsystem has been loaded; otherwise false."""
+        return self._loaded
+
+    def get(self):
+        """Return the subsystem, loading it first if needed.
+
+        If the subsystem is being loaded by another thread, waits for that
+        load to finish.
+        """
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                modules = [importlib.import_module(module)
+                           for module in self._modules]
+                imported = time.perf_counter()
+                self._value = self._init(*modules)
+                self.import_seconds = imported - start
+                self.init_seconds = time.perf_counter() - imported
+                self._loaded = True
+        return self._value
+
+    def load_async(self):
+        """Start loading the subsystem in a background thread.
+
+        :return: The loading thread.
+        :rtype: :class:'threading.Thread'
+        """
+        thread = threading.Thread(target=self.get, name=f"load-{self.name}",
+                                  daemon=True)
+        thread.start()
+        return thread
+
+
+def _data_files(folder):
+    """Internal function for the data csvs of a resource folder."""
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.endswith(".csv") and "legend" not in name]
+
+
+def _load_moves(moves):
+    table = dict()
+    for move_file in _data_files(MOVES_FOLDER):
+        table.update(moves.load_moves(move_file))
+    return table
+
+
+SUBSYSTEMS = {
+    "pokedex": Subsystem("pokedex", ("pokedex",),
+                         lambda pokedex: pokedex.Pokedex(POKEDEX_FILE)),
+    "itemdex": Subsystem("itemdex", ("itemdex",),
+                         lambda itemdex: itemdex.Itemdex(ITEMS_FILE)),
+    "moves": Subsystem("moves", ("moves",), _load_moves),
+    "battle": Subsystem("battle", ("battle", "ai", "scheduler"),
+                        lambda battle, ai, scheduler: battle),
+}
+
+
+def profile(names=None):
+    """Load subsystems one at a time, timing each.
+
+    Subsystems already loaded are not loaded again, and report the times of
+    their first load. Modules shared between subsystems are only imported,
+    and timed, once.
+
+    :param names: The names of the subsystems to load. If None, every
+        subsystem is loaded.
+    :type names: iterable of str, optional
+
+    :return: (name, import seconds, init seconds) of each subsystem.
+    :rtype: list of tuples
+    """
+    report = list()
+    for name in (SUBSYSTEMS if names is None else names):
+        subsystem = SUBSYSTEMS[name]
+        subsystem.get()
+        report.append((name, subsystem.import_seconds, subsystem.init_seconds))
+    return report
@@ -0,0 +1,154 @@
+"""Tests of the news feed ingestion pipeline, against a local HTTP server."""
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import unittest
+
+import news
+from pokedex import Pokedex
+
+POKEDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "resources", "pokedex",
+    "Pokedex - national.csv")
+
+RSS_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Galar Times</title>
+<item><title>Corviknight taxis grounded</title>
+<link>http://example.com/taxis</link>
+<pubDate>Mon, 19 Oct 2026 09:00:00 GMT</pubDate>
+<description>The &lt;b&gt;flying taxis&lt;/b&gt; of Galar are grounded by
+fog.</description></item>
+<item><title>Gym challenge opens</title>
+<link>http://example.com/gyms</link>
+<pubDate>Mon, 19 Oct 2026 10:00:00 GMT</pubDate>
+<description>Eight gyms open their doors.</description></item>
+</channel></rss>"""
+
+# the same taxi story as the RSS feed, with different case, markup and
+# spacing, and a story of its own
+JSON_FEED = json.dumps({"version": "https://jsonfeed.org/version/1.1",
+                        "items": [
+    {"title": "CORVIKNIGHT taxis grounded",
+     "url": "http://example.org/taxis",
+     "summary": "The flying   taxis of Galar are grounded by fog."},
+    {"title": "Wild area report", "url": "http://example.org/wild",
+     "summary": "A Corviknight was seen near the lake."},
+]}).encode()
+
+ETAG = '"v1"'
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    """Serves the test feeds, answering 304 to a matching If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path,
+                                     self.headers.get("If-None-Match")))
+        if self.path == "/rss":
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send(RSS_FEED, ETag=ETAG)
+        elif self.path == "/json":
+            self._send(JSON_FEED)
+        elif self.path == "/malformed":
+            self._send(b"<rss><channel><item>")
+        else:
+            self.send_error(500)
+
+    def _send(self, body, **headers):
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NewsFeedTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        cls.server.requests = list()
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+        cls.species = news.SpeciesIndex(Pokedex(POKEDEX_FILE))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self):
+        self.server.requests.clear()
+        self.cache = news.NewsCache()
+        self.addCleanup(self.cache.close)
+
+    def _source(self, name, path, kind=news.RSS):
+        host, port = self.server.server_address
+        return news.Source(name, f"http://{host}:{port}{path}", kind)
+
+    def _feed(self, *sources):
+        return news.NewsFeed(sources, self.cache, self.species, timeout=5)
+
+    def test_unchanged_feed_answers_304(self):
+        feed = self._feed(self._source("rss", "/rss"))
+        first = asyncio.run(feed.poll())
+        second = asyncio.run(feed.poll())
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, [])
+        self.assertEqual(feed.errors, {})
+        self.assertEqual(self.server.requests,
+                         [("/rss", None), ("/rss", ETAG)])
+        self.assertEqual(self.cache.validators(feed.sources[0].url),
+                         (ETAG, None))
+        self.assertEqual(len(self.cache), 2)
+
+    def test_same_story_from_two_sources_is_stored_once(self):
+        feed = self._feed(self._source("rss", "/rss"),
+                          self._source("json", "/json", news.JSON))
+        new = asyncio.run(feed.poll())
+        self.assertEqual(feed.errors, {})
+        self.assertEqual(len(new), 3)
+        self.assertEqual(len(self.cache), 3)
+        # whichever source is fetched first stores the shared story
+        taxis = [article for article in self.cache.latest()
+                 if "taxis" in article.title.lower()]
+        self.assertEqual(len(taxis), 1)
+        self.assertEqual(asyncio.run(feed.poll()), [])
+
+    def test_articles_are_linked_to_species(self):
+        feed = self._feed(self._source("json", "/json", news.JSON))
+        asyncio.run(feed.poll())
+        titles = {article.title: article.species
+                  for article in self.cache.latest()}
+        self.assertEqual(titles, {"CORVIKNIGHT taxis grounded": ("823",),
+                                  "Wild area report": ("823",)})
+        self.assertEqual(len(self.cache.for_species("823")), 2)
+        self.assertEqual(self.cache.for_species("1"), [])
+
+    def test_failing_sources_do_not_stop_the_others(self):
+        feed = self._feed(self._source("broken", "/broken"),
+                          self._source("malformed", "/malformed"),
+                          self._source("rss", "/rss"))
+        new = asyncio.run(feed.poll())
+        self.assertEqual(len(new), 2)
+        self.assertEqual(set(feed.errors), {"broken", "malformed"})
+        self.assertEqual(feed.errors["broken"].code, 500)
+        self.assertIsInstance(feed.errors["malformed"], ValueError)
+        # a failed source keeps no validators, so it is retried in full
+        self.assertEqual(self.cache.validators(feed.sources[0].url),
+                         (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
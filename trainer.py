@@ -0,0 +1,233 @@
+"""Contains classes relating to a pokemon trainer and the pokemon they own."""
+from bisect import bisect_left, insort
+
+from box import PokemonBox
+
+
+class PokeTrainer:
+    """A pokemon trainer, with a party and storage boxes of pokemon.
+
+    Stored pokemon are kept in a :class:`box.PokemonBox`, with indexes by
+    species, original trainer id, type, shininess and level that are updated
+    whenever a pokemon is stored or withdrawn. Queries over the storage boxes
+    look pokemon up in these indexes rather than checking every stored
+    pokemon.
+    """
+
+    # most pokemon a party can hold
+    PARTY_SIZE = 6
+    # number of slots in each storage box
+    BOX_SIZE = 30
+
+    def __init__(self, name, trainer_id):
+        """Constructor for the PokeTrainer class.
+
+        :param name: The name of the trainer.
+        :type name: str
+        :param trainer_id: The id number of the trainer.
+        :type trainer_id: int
+        """
+        self._name = name
+        self._trainer_id = trainer_id
+        self._party = list()
+        self._storage = PokemonBox()
+        # storage slots, keyed by the indexed value
+        self._by_species = dict()
+        self._by_ot_id = dict()
+        self._by_type = dict()
+        self._shiny = set()
+        # sorted (level, slot) pairs of every stored pokemon
+        self._by_level = list()
+
+    @property
+    def name(self):
+        """The name of the trainer."""
+        return self._name
+
+    @property
+    def trainer_id(self):
+        """The id number of the trainer."""
+        return self._trainer_id
+
+    @property
+    def party(self):
+        """A list of the pokemon in the trainer's party.
+
+        The party property returns a copy of the party list; it cannot be used
+        to add or remove party pokemon directly.
+        """
+        return list(self._party)
+
+    @property
+    def storage(self):
+        """The box all of the trainer's stored pokemon are kept in.
+
+        The storage should not be modified directly, or the indexes of this
+        trainer will no longer match it.
+        """
+        return self._storage
+
+    def box(self, number):
+        """Return views of the pokemon in a single storage box.
+
+        :param number: The number of the box, starting from 0.
+        :type number: int
+
+        :rtype: list of :class:'box.BoxedPokemon'
+        """
+        start = number * self.BOX_SIZE
+        return [self._storage[slot]
+                for slot in range(start, start + self.BOX_SIZE)
+                if slot in self._storage]
+
+    def _index(self, slot, pokemon):
+        """Internal method for adding a stored pokemon to the indexes."""
+        self._by_species.setdefault(str(pokemon.natl_id), set()).add(slot)
+        self._by_ot_id.setdefault(pokemon.original_trainer_id, set()).add(slot)
+        for poke_type in pokemon.types:
+            self._by_type.setdefault(poke_type, set()).add(slot)
+        if pokemon.shiny:
+            self._shiny.add(slot)
+        insort(self._by_level, (pokemon.level, slot))
+
+    def _unindex(self, slot, pokemon):
+        """Internal method for removing a stored pokemon from the indexes."""
+        for index, key in ((self._by_species, str(pokemon.natl_id)),
+                           (self._by_ot_id, pokemon.original_trainer_id),
+                           *((self._by_type, poke_type)
+                             for poke_type in pokemon.types)):
+            index[key].discard(slot)
+            if not index[key]:
+                del index[key]
+        self._shiny.discard(slot)
+        del self._by_level[bisect_left(self._by_level, (pokemon.level, slot))]
+
+    def catch(self, pokemon):
+        """Take ownership of a newly caught pokemon.
+
+        The trainer becomes the original trainer of the pokemon if it does not
+        have one. The pokemon joins the party, or is stored if the party is
+        full.
+
+        :param pokemon: The pokemon caught.
+        :type pokemon: :class:'pokemon.Pokemon'
+
+        :return: The storage slot of the pokemon, or None if it joined the
+            party.
+        :rtype: int
+        """
+        if pokemon.original_trainer is None:
+            pokemon.set_original_trainer(self._name, self._trainer_id)
+        if len(self._party) < self.PARTY_SIZE:
+            self._party.append(pokemon)
+            return None
+        return self.store(pokemon)
+
+    def store(self, pokemon):
+        """Put a pokemon into storage.
+
+        :param pokemon: The pokemon to store.
+        :type pokemon: :class:'pokemon.Pokemon'
+
+        :return: The storage slot of the pokemon.
+        :rtype: int
+        """
+        slot = self._storage.add(pokemon)
+        self._index(slot, pokemon)
+        return slot
+
+    def deposit(self, party_index):
+        """Move a pokemon from the party into storage.
+
+        The last pokemon in a party cannot be deposited.
+
+        :param party_index: The index of the pokemon in the party.
+        :type party_index: int
+
+        :return: The storage slot of the pokemon.
+        :rtype: int
+        """
+        if len(self._party) <= 1:
+            raise ValueError("The last pokemon in a party cannot be deposited.")
+        pokemon = self._party[party_index]
+        slot = self.store(pokemon)
+        del self._party[party_index]
+        return slot
+
+    def withdraw(self, slot):
+        """Move a pokemon from storage into the party.
+
+        :param slot: The storage slot of the pokemon.
+        :type slot: int
+
+        :return: The withdrawn pokemon.
+        :rtype: :class:'pokemon.Pokemon'
+        """
+        if len(self._party) >= self.PARTY_SIZE:
+            raise ValueError("The party is full.")
+        pokemon = self.release(slot)
+        self._party.append(pokemon)
+        return pokemon
+
+    def release(self, slot):
+        """Remove a pokemon from storage.
+
+        :param slot: The storage slot of the pokemon.
+        :type slot: int
+
+        :return: The removed pokemon.
+        :rtype: :class:'pokemon.Pokemon'
+        """
+        view = self._storage[slot]
+        self._unindex(slot, view)
+        pokemon = view.to_pokemon()
+        del self._storage[slot]
+        return pokemon
+
+    def find(self, species=None, ot_id=None, poke_type=None, shiny=None,
+             min_level=None, max_level=None):
+        """Find stored pokemon matching every given criteria.
+
+        Only pokemon in storage are searched, not the party.
+
+        :param species: The national pokedex id of the pokemon.
+        :param ot_id: The id number of the original trainer.
+        :param poke_type: A type the pokemon must have.
+        :type poke_type: str, optional
+        :param shiny: Whether the pokemon must, or must not, be shiny.
+        :type shiny: bool, optional
+        :param min_level: The lowest level to include.
+        :type min_level: int, optional
+        :param max_level: The highest level to include.
+        :type max_level: int, optional
+
+        :return: Views of the matching pokemon, in slot order.
+        :rtype: list of :class:'box.BoxedPokemon'
+        """
+        candidates = list()
+        if species is not None:
+            candidates.append(self._by_species.get(str(species), set()))
+        if ot_id is not None:
+            candidates.append(self._by_ot_id.get(ot_id, set()))
+        if poke_type is not None:
+            candidates.append(self._by_type.get(poke_type, set()))
+        if shiny is True:
+            candidates.append(self._shiny)
+        if min_level is not None or max_level is not None:
+            start = 0 if min_level is None else bisect_left(
+                self._by_level, (min_level, -1))
+            stop = len(self._by_level) if max_level is None else bisect_left(
+                self._by_level, (max_level + 1, -1))
+            candidates.append({slot for _, slot in self._by_level[start:stop]})
+
+        if candidates:
+            # intersect starting from the smallest set of candidates
+            candidates.sort(key=len)
+            slots = set(candidates[0])
+            for other in candidates[1:]:
+                slots.intersection_update(other)
+        else:
+            slots = set(self._storage.slots())
+        if shiny is False:
+            slots.difference_update(self._shiny)
+        return [self._storage[slot] for slot in sorted(slots)]
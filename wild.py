@@ -0,0 +1,226 @@
+"""Contains classes for generating large populations of wild pokemon.
+
+Wild pokemon are generated in bulk from a seeded random generator. All of the
+random state for a population is drawn as a few large blocks of random bytes,
+rather than with a call to the generator for every pokemon, and stored in
+compact arrays. :class:`pokemon.Pokemon` objects are only created when a
+single pokemon of the population is accessed.
+"""
+from array import array
+import random
+
+from pokemon import Pokemon
+
+# gender codes stored in a population, and the gender each code stands for
+MALE = 0
+FEMALE = 1
+GENDERLESS = 2
+GENDERS = ("male", "female", None)
+
+
+class WildPopulation:
+    """A population of wild pokemon stored as compact columns.
+
+    Each column is an array with one value for each pokemon:
+        species   -- the position of the species in the Pokedex
+        levels    -- the level
+        ivs       -- the ivs, packed with :meth:`pokemon.Pokemon.pack_ivs`
+        natures   -- the index of the nature in ``Pokemon.NATURES``
+        genders   -- the gender code: MALE, FEMALE or GENDERLESS
+        shiny     -- 1 if the pokemon is shiny, otherwise 0
+        abilities -- the index of the ability in the species' abilities
+    """
+
+    def __init__(self, pokedex, species, levels, ivs, natures, genders, shiny,
+                 abilities):
+        """Constructor for the WildPopulation class.
+
+        Populations are normally created by :class:`wild.WildGenerator`
+        rather than by calling this constructor directly.
+        """
+        self._pokedex = pokedex
+        self.species = species
+        self.levels = levels
+        self.ivs = ivs
+        self.natures = natures
+        self.genders = genders
+        self.shiny = shiny
+        self.abilities = abilities
+
+    def __len__(self):
+        """The number of pokemon in the population."""
+        return len(self.species)
+
+    def __getitem__(self, index):
+        """Create the pokemon at the given index of the population.
+
+        A new :class:`pokemon.Pokemon` is created on every access.
+
+        :param index: The index of the pokemon.
+        :type index: int
+
+        :rtype: :class:'pokemon.Pokemon'
+        """
+        entry = self._pokedex[self.number(index)]
+        return Pokemon.from_entry(
+            entry, self.levels[index],
+            ivs=Pokemon.unpack_ivs(self.ivs[index]),
+            nature=Pokemon.NATURES[self.natures[index]],
+            gender=GENDERS[self.genders[index]],
+            shiny=bool(self.shiny[index]),
+            ability=entry["abilities"][self.abilities[index]])
+
+    def __iter__(self):
+        """Iterate over the pokemon of the population, creating each lazily."""
+        return (self[index] for index in range(len(self)))
+
+    def number(self, index):
+        """The Pokedex number of the species of the pokemon at an index.
+
+        :param index: The index of the pokemon.
+        :type index: int
+
+        :rtype: str
+        """
+        return self._pokedex._entry_ids[self.species[index]]
+
+
+class WildGenerator:
+    """A seeded generator for populations of wild pokemon."""
+
+    def __init__(self, pokedex, seed=None):
+        """Constructor for the WildGenerator class.
+
+        :param pokedex: The Pokedex the generated species are from.
+        :type pokedex: :class:'pokedex.Pokedex'
+        :param seed: The seed for the random generator. Generators with the
+            same seed and Pokedex generate the same populations, in order. If
+            None, the generator is seeded from the operating system.
+        :type seed: int, optional
+        """
+        self._pokedex = pokedex
+        self._rng = random.Random(seed)
+        self._positions = {number: index for index, number
+                           in enumerate(pokedex._entry_ids)}
+        # chance out of 65536 of each species being female, or None if it is
+        # genderless, keyed by position in the Pokedex
+        self._female_odds = dict()
+        # indexes of the regular abilities of each species in its abilities,
+        # keyed by position in the Pokedex
+        self._ability_slots = dict()
+
+    def _female_threshold(self, position):
+        """Internal method for looking up the female chance of a species.
+
+        :return: The chance out of 65536 of the species being female, or None
+            if the species is genderless.
+        """
+        try:
+            return self._female_odds[position]
+        except KeyError:
+            pass
+        number = self._pokedex._entry_ids[position]
+        # gender ratios are given as male percent:female percent
+        male, _, female = self._pokedex[number]["gender_ratio"].partition(":")
+        try:
+            threshold = round(float(female) / 100 * 65536)
+        except ValueError:
+            threshold = None
+        self._female_odds[position] = threshold
+        return threshold
+
+    def _regular_abilities(self, position):
+        """Internal method for looking up the regular abilities of a species.
+
+        The last of several abilities is the hidden ability, which wild
+        pokemon never have, and blank abilities are skipped.
+
+        :return: The indexes of the regular abilities in the abilities of the
+            species.
+        :rtype: tuple
+        """
+        try:
+            return self._ability_slots[position]
+        except KeyError:
+            pass
+        number = self._pokedex._entry_ids[position]
+        abilities = self._pokedex[number]["abilities"]
+        regular = abilities[:-1] if len(abilities) > 1 else abilities
+        slots = tuple(index for index, ability in enumerate(regular)
+                      if ability)
+        # species without a regular ability fall back to the first ability
+        slots = slots or (0,)
+        self._ability_slots[position] = slots
+        return slots
+
+    def _random_words(self, typecode, count):
+        """Internal method for drawing an array of random integers.
+
+        :param typecode: The typecode of the array, which sets the size of
+            each random integer.
+        :param count: The number of integers to draw.
+
+        :rtype: class:'array.array'
+        """
+        words = array(typecode)
+        words.frombytes(self._rng.randbytes(words.itemsize * count))
+        return words
+
+    def generate(self, species, levels, count=None):
+        """Generate a population of wild pokemon.
+
+        :param species: The Pokedex number of the species of every pokemon, or
+            a sequence with the number for each pokemon.
+        :type species: str or sequence of str
+        :param levels: The level of every pokemon, or a sequence with the
+            level of each pokemon.
+        :type levels: int or sequence of int
+        :param count: The number of pokemon to generate. Only needed if neither
+            species nor levels is a sequence.
+        :type count: int, optional
+
+        :rtype: :class:'wild.WildPopulation'
+        """
+        if isinstance(species, str):
+            species = [species]
+        if isinstance(levels, int):
+            levels = [levels]
+        if count is None:
+            count = max(len(species), len(levels))
+        if len(species) == 1:
+            species = species * count
+        if len(levels) == 1:
+            levels = levels * count
+        if len(species) != count or len(levels) != count:
+            raise ValueError("species and levels must each have 1 or count "
+                             "values.")
+        if any(level > 100 or level < 1 for level in levels):
+            raise ValueError("Pokemon's level must be between 1 and 100.")
+
+        species = array("I", [self._positions[number] for number in species])
+        levels = array("B", levels)
+        # 30 bits of ivs per pokemon, with the top bit used to pick one of
+        # the regular abilities of the species
+        iv_bits = self._random_words("I", count)
+        ivs = array("I", [bits & 0x3FFFFFFF for bits in iv_bits])
+        abilities = array("B")
+        for position, bits in zip(species, iv_bits):
+            slots = self._regular_abilities(position)
+            abilities.append(slots[(bits >> 31) % len(slots)])
+        # 65536 isn't a multiple of 25, so taking 16 random bits modulo 25
+        # makes 11 natures 2622/2621 as likely as the others, a bias of about
+        # 0.038%
+        natures = array("B", [bits % len(Pokemon.NATURES)
+                              for bits in self._random_words("H", count)])
+        shiny_odds = 65536 // Pokemon.SHINY_ODDS
+        shiny = array("B", [bits < shiny_odds
+                            for bits in self._random_words("H", count)])
+        genders = array("B")
+        for position, bits in zip(species, self._random_words("H", count)):
+            threshold = self._female_threshold(position)
+            if threshold is None:
+                genders.append(GENDERLESS)
+            else:
+                genders.append(FEMALE if bits < threshold else MALE)
+        return WildPopulation(self._pokedex, species, levels, ivs, natures,
+                              genders, shiny, abilities)